@@ -37,14 +37,14 @@ CONF = cfg.CONF
 
 class NovaAction(base.OpenStackAction):
     _client_class = novaclient.Client
+    _service_name = 'nova'
 
-    def _get_client(self):
+    def _create_client(self, nova_endpoint):
         ctx = context.ctx()
 
         LOG.debug("Nova action security context: %s" % ctx)
 
         keystone_endpoint = keystone_utils.get_keystone_endpoint_v2()
-        nova_endpoint = keystone_utils.get_endpoint_for_project('nova')
 
         client = self._client_class(
             username=None,
@@ -67,14 +67,13 @@ class NovaAction(base.OpenStackAction):
 
 class GlanceAction(base.OpenStackAction):
     _client_class = glanceclient.Client
+    _service_name = 'glance'
 
-    def _get_client(self):
+    def _create_client(self, glance_endpoint):
         ctx = context.ctx()
 
         LOG.debug("Glance action security context: %s" % ctx)
 
-        glance_endpoint = keystone_utils.get_endpoint_for_project('glance')
-
         return self._client_class(
             glance_endpoint.url,
             region_name=glance_endpoint.region,
@@ -89,7 +88,7 @@ class GlanceAction(base.OpenStackAction):
 class KeystoneAction(base.OpenStackAction):
     _client_class = keystoneclient.Client
 
-    def _get_client(self):
+    def _create_client(self, endpoint):
         ctx = context.ctx()
 
         LOG.debug("Keystone action security context: %s" % ctx)
@@ -128,14 +127,13 @@ class KeystoneAction(base.OpenStackAction):
 
 class HeatAction(base.OpenStackAction):
     _client_class = heatclient.Client
+    _service_name = 'heat'
 
-    def _get_client(self):
+    def _create_client(self, heat_endpoint):
         ctx = context.ctx()
 
         LOG.debug("Heat action security context: %s" % ctx)
 
-        heat_endpoint = keystone_utils.get_endpoint_for_project('heat')
-
         endpoint_url = keystone_utils.format_url(
             heat_endpoint.url,
             {'tenant_id': ctx.project_id}
@@ -160,20 +158,21 @@ class HeatAction(base.OpenStackAction):
                 return [v for v in result]
             return result
         except Exception as e:
+            self._on_client_error(e)
+
             raise exc.ActionException("%s failed: %s"
                                       % (self.__class__.__name__, e))
 
 
 class NeutronAction(base.OpenStackAction):
     _client_class = neutronclient.Client
+    _service_name = 'neutron'
 
-    def _get_client(self):
+    def _create_client(self, neutron_endpoint):
         ctx = context.ctx()
 
         LOG.debug("Neutron action security context: %s" % ctx)
 
-        neutron_endpoint = keystone_utils.get_endpoint_for_project('neutron')
-
         return self._client_class(
             endpoint_url=neutron_endpoint.url,
             region_name=neutron_endpoint.region,
@@ -184,16 +183,13 @@ class NeutronAction(base.OpenStackAction):
 
 class CinderAction(base.OpenStackAction):
     _client_class = cinderclient.Client
+    _service_type = 'volume'
 
-    def _get_client(self):
+    def _create_client(self, cinder_endpoint):
         ctx = context.ctx()
 
         LOG.debug("Cinder action security context: %s" % ctx)
 
-        cinder_endpoint = keystone_utils.get_endpoint_for_project(
-            service_type='volume'
-        )
-
         cinder_url = keystone_utils.format_url(
             cinder_endpoint.url,
             {'tenant_id': ctx.project_id}
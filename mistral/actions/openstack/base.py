@@ -14,8 +14,48 @@
 
 import abc
 
+from oslo.config import cfg
+
 from mistral.actions import base
+from mistral import context
 from mistral import exceptions as exc
+from mistral.utils import cache
+from mistral.utils.openstack import keystone as keystone_utils
+
+
+CONF = cfg.CONF
+
+_CLIENT_CACHE = None
+
+
+def _get_client_cache():
+    global _CLIENT_CACHE
+
+    if not _CLIENT_CACHE:
+        _CLIENT_CACHE = cache.LRUCache(
+            CONF.openstack_actions.client_cache_size,
+            ttl=CONF.openstack_actions.client_cache_ttl
+        )
+
+    return _CLIENT_CACHE
+
+
+def get_client_cache_stats():
+    """Returns client cache size, hit and miss counters."""
+    return _get_client_cache().get_stats()
+
+
+def clear_client_cache():
+    if _CLIENT_CACHE:
+        _CLIENT_CACHE.clear()
+
+
+def _is_unauthorized(e):
+    for attr in ('http_status', 'status_code', 'code'):
+        if getattr(e, attr, None) == 401:
+            return True
+
+    return False
 
 
 class OpenStackAction(base.Action):
@@ -26,21 +66,66 @@ class OpenStackAction(base.Action):
     """
     _kwargs_for_run = {}
     _client_class = None
+    _service_name = None
+    _service_type = None
     client_method_name = None
 
     def __init__(self, **kwargs):
         self._kwargs_for_run = kwargs
+        self._client_key = None
 
     @abc.abstractmethod
-    def _get_client(self):
-        """Returns python-client instance
+    def _create_client(self, endpoint):
+        """Creates python-client instance
 
-        Gets client instance according to specific OpenStack Service
+        Creates client instance according to specific OpenStack Service
         (e.g. Nova, Glance, Heat, Keystone etc)
 
+        :param endpoint: Service endpoint found by service name or type
+            of the action or None if the action doesn't define them.
         """
         pass
 
+    def _get_endpoint(self):
+        if not self._service_name and not self._service_type:
+            return None
+
+        return keystone_utils.get_endpoint_for_project(
+            service_name=self._service_name,
+            service_type=self._service_type
+        )
+
+    def _get_client(self):
+        """Returns python-client instance
+
+        Clients are cached per security token, project and endpoint so
+        that actions run on behalf of the same user share them along with
+        their HTTP connections.
+        """
+        endpoint = self._get_endpoint()
+
+        if CONF.openstack_actions.client_cache_ttl <= 0:
+            return self._create_client(endpoint)
+
+        ctx = context.ctx()
+
+        self._client_key = (
+            self._client_class,
+            ctx.auth_token,
+            ctx.project_id,
+            endpoint.url if endpoint else None
+        )
+
+        return _get_client_cache().get_or_create(
+            self._client_key,
+            lambda key: self._create_client(endpoint)
+        )
+
+    def _on_client_error(self, e):
+        # Token of a cached client has expired or has been revoked.
+        if self._client_key and _is_unauthorized(e):
+            _get_client_cache().pop(self._client_key)
+
     @classmethod
     def _get_client_method(cls, client):
         hierarchy_list = cls.client_method_name.split('.')
@@ -71,6 +156,8 @@ class OpenStackAction(base.Action):
 
             return method(**self._kwargs_for_run)
         except Exception as e:
+            self._on_client_error(e)
+
             e_str = '%s: %s' % (type(e), e.message)
 
             raise exc.ActionException(
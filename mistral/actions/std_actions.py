@@ -17,12 +17,15 @@
 
 from email.mime import text
 import json
-import requests
 import smtplib
 
+import eventlet
+from oslo.config import cfg
+
 from mistral.actions import base
 from mistral import exceptions as exc
 from mistral.openstack.common import log as logging
+from mistral.utils import http_sessions
 from mistral.utils import javascript
 from mistral.utils import ssh_utils
 
@@ -169,7 +172,7 @@ class HTTPAction(base.Action):
                   self.verify))
 
         try:
-            resp = requests.request(
+            resp = http_sessions.get_session_pool().request(
                 self.method,
                 self.url,
                 params=self.params,
@@ -234,6 +237,13 @@ class MistralHTTPAction(HTTPAction):
             'Mistral-Task-Id': a_ctx.get('task_id'),
         })
 
+        # Iterations of 'with-items' tasks have to send their results
+        # with ids of their action executions.
+        if a_ctx.get('action_execution_id'):
+            headers['Mistral-Action-Execution-Id'] = a_ctx.get(
+                'action_execution_id'
+            )
+
         super(MistralHTTPAction, self).__init__(
             url,
             method,
@@ -331,19 +341,24 @@ class SSHAction(base.Action):
                 message += "\nException: %s" % str(parent_exc)
             raise exc.ActionException(message)
 
-        try:
-            results = []
+        def execute_command(host_name):
+            return ssh_utils.execute_command(
+                self.cmd,
+                host_name,
+                self.username,
+                self.password
+            )
 
+        try:
             if not isinstance(self.host, list):
                 self.host = [self.host]
 
-            for host_name in self.host:
-                status_code, result = ssh_utils.execute_command(
-                    self.cmd,
-                    host_name,
-                    self.username,
-                    self.password)
+            pool = eventlet.GreenPool(cfg.CONF.executor.ssh_max_parallel_hosts)
+
+            results = []
 
+            # imap() yields results in the order of hosts.
+            for status_code, result in pool.imap(execute_command, self.host):
                 if status_code > 0:
                     return raise_exc()
                 else:
@@ -144,16 +144,40 @@ class ActionsController(rest.RestController, hooks.HookController):
 
             db_api.delete_action_definition(name)
 
-    @wsme_pecan.wsexpose(Actions)
-    def get_all(self):
+    @rest_utils.wrap_wsme_controller_exception
+    @wsme_pecan.wsexpose(Actions, wtypes.text, int, wtypes.text, wtypes.text,
+                         wtypes.text)
+    def get_all(self, marker=None, limit=None, sort_keys='name',
+                sort_dirs='asc', fields=None):
         """Return all actions.
 
         Where project_id is the same as the requester or
         project_id is different but the scope is public.
+
+        :param marker: Optional. Id of the last action of the previous page.
+        :param limit: Optional. Maximum number of actions to return.
+        :param sort_keys: Optional. Comma separated list of fields to sort
+            by. Default: name.
+        :param sort_dirs: Optional. Comma separated list of sort
+            directions ('asc' or 'desc'). Default: asc.
+        :param fields: Optional. Comma separated list of fields to return.
         """
-        LOG.info("Fetch actions.")
+        LOG.info(
+            "Fetch actions [marker=%s, limit=%s, sort_keys=%s, sort_dirs=%s,"
+            " fields=%s]" % (marker, limit, sort_keys, sort_dirs, fields)
+        )
+
+        db_models = db_api.get_action_definitions(
+            **rest_utils.get_list_params(
+                marker,
+                limit,
+                sort_keys,
+                sort_dirs,
+                fields
+            )
+        )
 
         action_list = [Action.from_dict(db_model.to_dict())
-                       for db_model in db_api.get_action_definitions()]
+                       for db_model in db_models]
 
         return Actions(actions=action_list)
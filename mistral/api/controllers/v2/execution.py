@@ -195,14 +195,52 @@ class ExecutionsController(rest.RestController):
 
         return db_api.delete_workflow_execution(id)
 
-    @wsme_pecan.wsexpose(Executions)
-    def get_all(self):
-        """Return all Executions."""
-        LOG.info("Fetch executions")
+    @rest_utils.wrap_wsme_controller_exception
+    @wsme_pecan.wsexpose(Executions, wtypes.text, int, wtypes.text,
+                         wtypes.text, wtypes.text, wtypes.text, wtypes.text)
+    def get_all(self, marker=None, limit=None, sort_keys='created_at',
+                sort_dirs='asc', fields=None, state=None,
+                workflow_name=None):
+        """Return all Executions.
+
+        :param marker: Optional. Id of the last execution of the previous
+            page. Executions following it are returned.
+        :param limit: Optional. Maximum number of executions to return.
+        :param sort_keys: Optional. Comma separated list of fields to sort
+            by. Default: created_at.
+        :param sort_dirs: Optional. Comma separated list of sort
+            directions ('asc' or 'desc'). Default: asc.
+        :param fields: Optional. Comma separated list of fields to return.
+            By default all fields except 'input' and 'output' are returned.
+        :param state: Optional. Execution state to filter by.
+        :param workflow_name: Optional. Workflow name to filter by.
+        """
+        LOG.info(
+            "Fetch executions [marker=%s, limit=%s, sort_keys=%s,"
+            " sort_dirs=%s, fields=%s, state=%s, workflow_name=%s]"
+            % (marker, limit, sort_keys, sort_dirs, fields, state,
+               workflow_name)
+        )
+
+        params = rest_utils.get_list_params(
+            marker,
+            limit,
+            sort_keys,
+            sort_dirs,
+            fields,
+            state=state,
+            workflow_name=workflow_name
+        )
+
+        # 'params' field of the resource is stored as 'start_params'.
+        for key in ('sort_keys', 'fields'):
+            params[key] = [
+                'start_params' if f == 'params' else f for f in params[key]
+            ]
 
         wf_executions = [
             Execution.from_dict(db_model.to_dict())
-            for db_model in db_api.get_workflow_executions()
+            for db_model in db_api.get_workflow_executions(**params)
         ]
 
         return Executions(executions=wf_executions)
@@ -132,25 +132,78 @@ class TasksController(rest.RestController):
 
         return Task.from_dict(values)
 
-    @wsme_pecan.wsexpose(Tasks)
-    def get_all(self):
-        """Return all tasks within the execution."""
-        LOG.info("Fetch tasks")
+    @rest_utils.wrap_wsme_controller_exception
+    @wsme_pecan.wsexpose(Tasks, wtypes.text, int, wtypes.text, wtypes.text,
+                         wtypes.text, wtypes.text, wtypes.text)
+    def get_all(self, marker=None, limit=None, sort_keys='created_at',
+                sort_dirs='asc', fields=None, state=None,
+                workflow_name=None):
+        """Return all tasks.
+
+        :param marker: Optional. Id of the last task of the previous page.
+        :param limit: Optional. Maximum number of tasks to return.
+        :param sort_keys: Optional. Comma separated list of fields to sort
+            by. Default: created_at.
+        :param sort_dirs: Optional. Comma separated list of sort
+            directions ('asc' or 'desc'). Default: asc.
+        :param fields: Optional. Comma separated list of fields to return.
+            By default all fields except 'input' and 'result' are returned.
+        :param state: Optional. Task state to filter by.
+        :param workflow_name: Optional. Workflow name to filter by.
+        """
+        LOG.info(
+            "Fetch tasks [marker=%s, limit=%s, sort_keys=%s, sort_dirs=%s,"
+            " fields=%s, state=%s, workflow_name=%s]"
+            % (marker, limit, sort_keys, sort_dirs, fields, state,
+               workflow_name)
+        )
 
-        tasks = [Task.from_dict(db_model.to_dict())
-                 for db_model in db_api.get_task_executions()]
+        task_execs = db_api.get_task_executions(
+            **rest_utils.get_list_params(
+                marker,
+                limit,
+                sort_keys,
+                sort_dirs,
+                fields,
+                state=state,
+                workflow_name=workflow_name
+            )
+        )
+
+        tasks = [Task.from_dict(db_model.to_dict()) for db_model in task_execs]
 
         return Tasks(tasks=tasks)
 
 
 class ExecutionTasksController(rest.RestController):
-    @wsme_pecan.wsexpose(Tasks, wtypes.text)
-    def get_all(self, workflow_execution_id):
-        """Return all tasks within the workflow execution."""
-        LOG.info("Fetch tasks")
+    @rest_utils.wrap_wsme_controller_exception
+    @wsme_pecan.wsexpose(Tasks, wtypes.text, wtypes.text, int, wtypes.text,
+                         wtypes.text, wtypes.text, wtypes.text)
+    def get_all(self, workflow_execution_id, marker=None, limit=None,
+                sort_keys='created_at', sort_dirs='asc', fields=None,
+                state=None):
+        """Return all tasks within the workflow execution.
+
+        Paging, sorting and field parameters are the same as for
+        TasksController.get_all().
+        """
+        LOG.info(
+            "Fetch tasks [workflow_execution_id=%s, marker=%s, limit=%s,"
+            " sort_keys=%s, sort_dirs=%s, fields=%s, state=%s]"
+            % (workflow_execution_id, marker, limit, sort_keys, sort_dirs,
+               fields, state)
+        )
 
         task_execs = db_api.get_task_executions(
-            workflow_execution_id=workflow_execution_id
+            **rest_utils.get_list_params(
+                marker,
+                limit,
+                sort_keys,
+                sort_dirs,
+                fields,
+                workflow_execution_id=workflow_execution_id,
+                state=state
+            )
         )
 
         return Tasks(
@@ -49,6 +49,7 @@ from mistral.engine1 import default_executor as def_executor
 from mistral.engine1 import rpc
 from mistral.openstack.common import log as logging
 from mistral.services import scheduler
+from mistral.utils import metrics
 
 
 LOG = logging.getLogger(__name__)
@@ -171,6 +172,8 @@ def main():
 
         logging.setup('Mistral')
 
+        metrics.setup()
+
         # Please refer to the oslo.messaging documentation for transport
         # configuration. The default transport for oslo.messaging is
         # rabbitMQ. The available transport drivers are listed in the
@@ -80,7 +80,144 @@ executor_opts = [
     cfg.StrOpt('topic', default='executor',
                help='The message topic that the executor listens on.'),
     cfg.StrOpt('version', default='1.0',
-               help='The version of the executor.')
+               help='The version of the executor.'),
+    cfg.IntOpt('result_batch_size', default=1,
+               help='Maximum number of task results the executor sends '
+                    'to the engine in one request. Value 1 disables '
+                    'batching.'),
+    cfg.FloatOpt('result_batch_latency', default=0.05,
+                 help='Maximum time in seconds a task result can wait '
+                      'in the executor before it is sent to the engine.'),
+    cfg.DictOpt('action_run_modes', default={},
+                help='Maps action class paths to the way the executor runs '
+                     'them: "thread" runs an action in a native thread pool, '
+                     '"process" runs it in a pool of worker processes. '
+                     'Other actions run in green threads. Example: '
+                     'mistral.actions.std_actions.JavaScriptAction:process'),
+    cfg.IntOpt('action_process_pool_size', default=0,
+               help='Number of worker processes running actions in '
+                    '"process" mode. 0 means the number of CPUs.'),
+    cfg.IntOpt('action_process_max_tasks', default=100,
+               help='Number of actions a worker process runs before it is '
+                    'replaced with a new one.'),
+    cfg.IntOpt('action_pool_queue_size', default=100,
+               help='Maximum number of actions running or waiting in a '
+                    'thread or process pool. Further actions wait until '
+                    'others complete.'),
+    cfg.IntOpt('http_max_idle_sessions', default=10,
+               help='Maximum number of idle HTTP sessions HTTP actions keep '
+                    'per scheme, host and verify/proxy settings to reuse '
+                    'their connections. 0 disables connection reuse.'),
+    cfg.IntOpt('http_idle_timeout', default=60,
+               help='Time in seconds after which an idle HTTP session of '
+                    'HTTP actions is closed.'),
+    cfg.IntOpt('ssh_idle_timeout', default=60,
+               help='Time in seconds SSH connections opened by SSH actions '
+                    'are kept for reuse after their last command. 0 '
+                    'disables connection reuse.'),
+    cfg.IntOpt('ssh_max_parallel_hosts', default=10,
+               help='Maximum number of hosts an SSH action runs its '
+                    'command on at the same time.'),
+    cfg.IntOpt('ssh_max_output_size', default=1024 * 1024,
+               help='Maximum number of bytes of stdout and stderr of an '
+                    'SSH command kept in the action result. Longer output '
+                    'is truncated. 0 means no limit.'),
+    cfg.IntOpt('js_context_pool_size', default=4,
+               help='Number of JavaScript contexts kept for reuse by '
+                    'JavaScript actions.'),
+    cfg.FloatOpt('js_time_limit', default=30.0,
+                 help='Maximum time in seconds a JavaScript action can run. '
+                      '0 means no limit.'),
+    cfg.IntOpt('js_max_heap_size', default=0,
+               help='Maximum size in MB of the JavaScript heap of an '
+                    'executor process. V8 aborts the process once the limit '
+                    'is exceeded so the option can only be set if JavaScript '
+                    'actions run in the "process" mode. 0 means no limit.')
+]
+
+scheduler_opts = [
+    cfg.IntOpt('batch_size', default=100,
+               help='Maximum number of delayed calls a scheduler claims '
+                    'and runs at once.'),
+    cfg.IntOpt('lease_time', default=60,
+               help='Time in seconds a claimed delayed call stays assigned '
+                    'to a scheduler. The lease is renewed right before the '
+                    'call runs. If the scheduler does not complete the '
+                    'call during this time (e.g. because it crashed) the '
+                    'call can be claimed by another scheduler.'),
+    cfg.FloatOpt('reconcile_interval', default=10.0,
+                 help='Interval in seconds between checks of the database '
+                      'for delayed calls that are due or were scheduled by '
+                      'other processes. Calls scheduled within the process '
+                      'run at their due time regardless of this value, '
+                      'others may run up to this long after it.')
+]
+
+cron_trigger_opts = [
+    cfg.IntOpt('batch_size', default=100,
+               help='Maximum number of due cron triggers processed at once.'),
+    cfg.IntOpt('fire_concurrency', default=10,
+               help='Maximum number of workflows started by cron triggers '
+                    'concurrently.'),
+    cfg.StrOpt('misfire_policy', default='fire-once',
+               choices=['fire-once', 'fire-all', 'skip'],
+               help='What to do with cron trigger executions missed, for '
+                    'example, because Mistral was down. "fire-once" starts '
+                    'the workflow once for all missed executions, '
+                    '"fire-all" starts it for each missed execution and '
+                    '"skip" ignores missed executions.'),
+    cfg.IntOpt('misfire_grace_time', default=60,
+               help='Time in seconds after which a cron trigger execution '
+                    'that has not happened is considered missed.')
+]
+
+openstack_actions_opts = [
+    cfg.StrOpt('region_name',
+               help='Region of service endpoints used by OpenStack actions. '
+                    'The first endpoint found is used if not specified.'),
+    cfg.IntOpt('endpoint_cache_size', default=128,
+               help='Maximum number of service endpoints cached.'),
+    cfg.IntOpt('endpoint_cache_ttl', default=300,
+               help='Time in seconds service endpoints looked up in '
+                    'Keystone are cached for. 0 disables caching.'),
+    cfg.IntOpt('client_cache_size', default=100,
+               help='Maximum number of OpenStack clients cached.'),
+    cfg.IntOpt('client_cache_ttl', default=300,
+               help='Time in seconds OpenStack clients are cached for. It '
+                    'should not exceed lifetime of tokens the clients are '
+                    'created with. 0 disables caching.'),
+    cfg.IntOpt('token_expiry_margin', default=60,
+               help='Time in seconds before expiration of a cached token '
+                    'when it is considered expired and gets replaced.'),
+    cfg.IntOpt('trust_token_cache_size', default=1000,
+               help='Maximum number of trust-scoped tokens cached.'),
+    cfg.IntOpt('trust_token_refresh_time', default=300,
+               help='Time in seconds before expiration of a cached '
+                    'trust-scoped token when a new one is requested in '
+                    'background. It should be greater than '
+                    'token_expiry_margin.')
+]
+
+metrics_opts = [
+    cfg.StrOpt('sink',
+               help='Name of sink timing metrics of engine processing '
+                    'phases are sent to: "log", "statsd" or "prometheus". '
+                    'Metrics are not collected if not specified.'),
+    cfg.IntOpt('log_interval', default=60,
+               help='Time in seconds between logging aggregated metrics by '
+                    'the "log" sink.'),
+    cfg.StrOpt('statsd_host', default='localhost',
+               help='Host of statsd server used by the "statsd" sink.'),
+    cfg.IntOpt('statsd_port', default=8125,
+               help='UDP port of statsd server used by the "statsd" sink.'),
+    cfg.StrOpt('statsd_prefix', default='mistral.',
+               help='Prefix of metric names sent to statsd.'),
+    cfg.StrOpt('prometheus_host', default='127.0.0.1',
+               help='Host the "prometheus" sink serves metrics on.'),
+    cfg.IntOpt('prometheus_port', default=9102,
+               help='Port the "prometheus" sink serves metrics on. Every '
+                    'process serves its own metrics so processes running '
+                    'on the same host need different ports.')
 ]
 
 wf_trace_log_name_opt = cfg.StrOpt(
@@ -96,6 +233,10 @@ CONF.register_opts(api_opts, group='api')
 CONF.register_opts(engine_opts, group='engine')
 CONF.register_opts(pecan_opts, group='pecan')
 CONF.register_opts(executor_opts, group='executor')
+CONF.register_opts(scheduler_opts, group='scheduler')
+CONF.register_opts(cron_trigger_opts, group='cron_trigger')
+CONF.register_opts(openstack_actions_opts, group='openstack_actions')
+CONF.register_opts(metrics_opts, group='metrics')
 CONF.register_opt(wf_trace_log_name_opt)
 
 CONF.register_cli_opt(use_debugger)
@@ -17,10 +17,14 @@
 from oslo.config import cfg
 from oslo.db import options
 from oslo.db.sqlalchemy import session as db_session
+from sqlalchemy import event
+from sqlalchemy import pool
 
+from mistral.db.sqlalchemy import sqlite_lock
 from mistral import exceptions as exc
 from mistral.openstack.common import log as logging
 from mistral import utils
+from mistral.utils import metrics
 
 
 LOG = logging.getLogger(__name__)
@@ -46,6 +50,25 @@ def get_engine():
     return _get_facade().get_engine()
 
 
+def get_driver_name():
+    return get_engine().dialect.name
+
+
+def get_db_file_path():
+    """Returns path to SQLite database file or None if it's in memory."""
+    database = get_engine().url.database
+
+    return database if database and database != ':memory:' else None
+
+
+def is_connection_shared():
+    """Returns True if all sessions use the same DB connection.
+
+    It's the case for in-memory SQLite databases.
+    """
+    return isinstance(get_engine().pool, pool.StaticPool)
+
+
 def _get_session():
     return _get_facade().get_session()
 
@@ -96,6 +119,7 @@ def session_aware(param_name="session"):
                 if created:
                     _set_thread_local_session(None)
                     ses.close()
+                    sqlite_lock.release_locks(ses)
 
         _within_session.__doc__ = func.__doc__
 
@@ -126,7 +150,8 @@ def commit_tx():
         raise exc.DataAccessException("Nothing to commit. Database transaction"
                                       " has not been previously started.")
 
-    ses.commit()
+    with metrics.timer('db.commit'):
+        ses.commit()
 
 
 def rollback_tx():
@@ -154,6 +179,24 @@ def end_tx():
     ses.close()
     _set_thread_local_session(None)
 
+    sqlite_lock.release_locks(ses)
+
+
+def after_commit(func):
+    """Calls the given function once the current transaction is committed.
+
+    If there's no transaction in progress the function is called
+    immediately. If the transaction is rolled back it's never called.
+    """
+    ses = _get_thread_local_session()
+
+    if not ses:
+        func()
+
+        return
+
+    event.listen(ses, 'after_commit', lambda session: func(), once=True)
+
 
 @session_aware()
 def model_query(model, session=None):
@@ -21,6 +21,7 @@ from oslo.db.sqlalchemy import models as oslo_models
 import sqlalchemy as sa
 from sqlalchemy import event
 from sqlalchemy.ext import declarative
+from sqlalchemy import orm
 from sqlalchemy.orm import attributes
 
 from mistral.services import security
@@ -52,7 +53,15 @@ class _MistralModelBase(oslo_models.ModelBase, oslo_models.TimestampMixin):
         if type(self) is not type(other):
             return False
 
+        # Unloaded (deferred) columns are not compared since accessing them
+        # would load them. Note that SQLAlchemy compares objects put into
+        # its weak key dictionaries, e.g. on every object load.
+        unloaded = _get_unloaded(self) | _get_unloaded(other)
+
         for col in self.__table__.columns:
+            if col.name in unloaded:
+                continue
+
             # In case of single table inheritance a class attribute
             # corresponding to a table column may not exist so we need
             # to skip these attributes.
@@ -63,6 +72,21 @@ class _MistralModelBase(oslo_models.ModelBase, oslo_models.TimestampMixin):
 
         return True
 
+    def __iter__(self):
+        # Used by iteritems() and thus by JSON serialization. Deferred
+        # columns that haven't been loaded are skipped rather than loaded
+        # (which is not even possible if the object is detached).
+        unloaded = _get_unloaded(self)
+
+        columns = [
+            name for name in orm.object_mapper(self).columns.keys()
+            if name not in unloaded
+        ]
+
+        columns.extend(self._extra_keys)
+
+        return oslo_models.ModelIterator(self, iter(columns))
+
     def to_dict(self):
         """sqlalchemy based automatic to_dict method."""
         d = {}
@@ -85,6 +109,15 @@ class _MistralModelBase(oslo_models.ModelBase, oslo_models.TimestampMixin):
         return '%s %s' % (type(self).__name__, self.to_dict().__repr__())
 
 
+def _get_unloaded(obj):
+    """Returns names of columns of a persistent object not loaded yet."""
+    state = attributes.instance_state(obj)
+
+    # Attributes of a new object which haven't been set are 'unloaded'
+    # as well but accessing them doesn't issue any queries.
+    return state.unloaded if state.has_identity else set()
+
+
 def datetime_to_str(dct, attr_name):
     if dct.get(attr_name) is not None:
         dct[attr_name] = dct[attr_name].isoformat(' ')
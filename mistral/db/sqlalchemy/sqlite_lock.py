@@ -0,0 +1,137 @@
+# Copyright 2015 - Mirantis, Inc.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+"""Row lock emulation for SQLite which doesn't support SELECT FOR UPDATE.
+
+Object ids are hashed into a fixed number of buckets. A bucket is locked
+by an in-process semaphore and, if the database is stored in a file, by
+a byte range lock of a lock file next to it so that several processes
+sharing the same database file get serialized as well. Locks are owned
+by DB sessions and get released when the transaction ends.
+"""
+
+import errno
+import fcntl
+import os
+import threading
+import time
+import zlib
+
+BUCKET_COUNT = 1024
+
+# Interval in seconds between attempts to acquire a file lock.
+_FILE_LOCK_POLL_INTERVAL = 0.01
+
+_mutex = threading.Lock()
+
+# Bucket number -> _BucketLock.
+_buckets = {}
+
+# Session -> list of locked bucket numbers.
+_session_buckets = {}
+
+# Lock file path -> file descriptor.
+_lock_files = {}
+
+
+class _BucketLock(object):
+    def __init__(self):
+        self.semaphore = threading.Semaphore()
+        self.owner = None
+
+
+def _get_bucket(obj_id):
+    return zlib.crc32(str(obj_id)) % BUCKET_COUNT
+
+
+def _get_lock_file(db_path):
+    if not db_path:
+        return None
+
+    lock_path = db_path + '.lock'
+
+    with _mutex:
+        if lock_path not in _lock_files:
+            _lock_files[lock_path] = os.open(
+                lock_path,
+                os.O_RDWR | os.O_CREAT,
+                0o644
+            )
+
+        return _lock_files[lock_path]
+
+
+def _lock_file_range(fd, bucket):
+    while True:
+        try:
+            fcntl.lockf(fd, fcntl.LOCK_EX | fcntl.LOCK_NB, 1, bucket)
+
+            return
+        except IOError as e:
+            if e.errno not in (errno.EACCES, errno.EAGAIN):
+                raise
+
+        # Don't block the whole process while waiting for other processes.
+        time.sleep(_FILE_LOCK_POLL_INTERVAL)
+
+
+def acquire_lock(obj_id, session, db_path=None):
+    """Locks the given object id until the session releases its locks.
+
+    :param obj_id: Id of the object to lock.
+    :param session: DB session that will own the lock.
+    :param db_path: Path to database file or None for in-memory database.
+    """
+    bucket = _get_bucket(obj_id)
+
+    with _mutex:
+        lock = _buckets.setdefault(bucket, _BucketLock())
+
+        if lock.owner is session:
+            # The lock is re-entrant within a transaction.
+            return
+
+    lock.semaphore.acquire()
+
+    try:
+        fd = _get_lock_file(db_path)
+
+        if fd is not None:
+            _lock_file_range(fd, bucket)
+    except Exception:
+        lock.semaphore.release()
+
+        raise
+
+    with _mutex:
+        lock.owner = session
+
+        _session_buckets.setdefault(session, []).append((bucket, fd))
+
+
+def release_locks(session):
+    """Releases all locks owned by the given session."""
+    with _mutex:
+        locked = _session_buckets.pop(session, None)
+
+        if not locked:
+            return
+
+        for bucket, fd in locked:
+            if fd is not None:
+                fcntl.lockf(fd, fcntl.LOCK_UN, 1, bucket)
+
+            lock = _buckets[bucket]
+            lock.owner = None
+            lock.semaphore.release()
@@ -60,6 +60,14 @@ def transaction():
         yield
 
 
+def after_commit(func):
+    IMPL.after_commit(func)
+
+
+def acquire_lock(model, id):
+    IMPL.acquire_lock(model, id)
+
+
 # Workbooks.
 
 def get_workbook(name):
@@ -130,6 +138,16 @@ def delete_workflow_definitions(**kwargs):
     IMPL.delete_workflow_definitions(**kwargs)
 
 
+# Specifications.
+
+def get_specification(hash):
+    return IMPL.get_specification(hash)
+
+
+def create_specification(spec):
+    return IMPL.create_specification(spec)
+
+
 # Action definitions.
 
 def get_action_definition(name):
@@ -328,8 +346,25 @@ def delete_delayed_call(id):
     return IMPL.delete_delayed_call(id)
 
 
-def get_delayed_calls_to_start(time):
-    return IMPL.get_delayed_calls_to_start(time)
+def delete_delayed_calls(ids):
+    return IMPL.delete_delayed_calls(ids)
+
+
+def get_delayed_calls_to_start(time, limit=None):
+    return IMPL.get_delayed_calls_to_start(time, limit)
+
+
+def claim_delayed_calls(scheduler_id, time, lease_expiration, limit):
+    return IMPL.claim_delayed_calls(
+        scheduler_id,
+        time,
+        lease_expiration,
+        limit
+    )
+
+
+def renew_delayed_call_lease(id, scheduler_id, lease_expiration):
+    return IMPL.renew_delayed_call_lease(id, scheduler_id, lease_expiration)
 
 
 # Cron triggers.
@@ -347,8 +382,8 @@ def get_cron_triggers(**kwargs):
     return IMPL.get_cron_triggers(**kwargs)
 
 
-def get_next_cron_triggers(time):
-    return IMPL.get_next_cron_triggers(time)
+def get_next_cron_triggers(time, limit=None):
+    return IMPL.get_next_cron_triggers(time, limit=limit)
 
 
 def create_cron_trigger(values):
@@ -359,6 +394,14 @@ def update_cron_trigger(name, values):
     return IMPL.update_cron_trigger(name, values)
 
 
+def claim_cron_trigger(id, next_execution_time, new_next_execution_time):
+    return IMPL.claim_cron_trigger(
+        id,
+        next_execution_time,
+        new_next_execution_time
+    )
+
+
 def create_or_update_cron_trigger(name, values):
     return IMPL.create_or_update_cron_trigger(name, values)
 
@@ -14,18 +14,22 @@
 #    limitations under the License.
 
 import contextlib
+import datetime
 import sys
 
 from oslo.config import cfg
 from oslo.db import exception as db_exc
+from oslo.db.sqlalchemy import utils as db_utils
 import sqlalchemy as sa
 
 from mistral.db.sqlalchemy import base as b
 from mistral.db.sqlalchemy import model_base as mb
+from mistral.db.sqlalchemy import sqlite_lock
 from mistral.db.v2.sqlalchemy import models
 from mistral import exceptions as exc
 from mistral.openstack.common import log as logging
 from mistral.services import security
+from mistral import utils
 
 CONF = cfg.CONF
 LOG = logging.getLogger(__name__)
@@ -85,6 +89,36 @@ def transaction():
         end_tx()
 
 
+def after_commit(func):
+    b.after_commit(func)
+
+
+@b.session_aware()
+def acquire_lock(model, id, session=None):
+    """Locks DB object with the given id until the transaction ends.
+
+    SELECT ... FOR UPDATE is used for databases supporting it. For SQLite
+    the lock is emulated so that engines sharing the same database file
+    are still serialized. Objects loaded within the session before the
+    lock was taken get expired so that they're reloaded on access.
+
+    Locking is skipped if all sessions share one connection (in-memory
+    SQLite). Transactions aren't isolated from each other then anyway and
+    waiting for the lock would let other sessions commit or roll back
+    changes this session has already flushed to that connection.
+    """
+    if b.is_connection_shared():
+        return
+
+    if b.get_driver_name() == 'sqlite':
+        sqlite_lock.acquire_lock(id, session, b.get_db_file_path())
+    else:
+        b.model_query(model).filter_by(id=id).with_for_update().first()
+
+    session.flush()
+    session.expire_all()
+
+
 def _secure_query(model):
     query = b.model_query(model)
 
@@ -107,12 +141,6 @@ def _get_collection_sorted_by_name(model, **kwargs):
     return _secure_query(model).filter_by(**kwargs).order_by(model.name).all()
 
 
-def _get_collection_sorted_by_time(model, **kwargs):
-    query = _secure_query(model)
-
-    return query.filter_by(**kwargs).order_by(model.created_at).all()
-
-
 def _get_db_object_by_name(model, name):
     return _secure_query(model).filter_by(name=name).first()
 
@@ -121,6 +149,99 @@ def _get_db_object_by_id(model, id):
     return _secure_query(model).filter_by(id=id).first()
 
 
+# Relationships of executions leading to their child executions.
+_CHILD_EXECUTIONS = {
+    models.WorkflowExecution: 'task_executions',
+    models.TaskExecution: 'executions'
+}
+
+
+def _get_execution_by_id(model, id):
+    # Single executions are mostly needed along with their data so
+    # deferred data columns are loaded right away. The engine reads data
+    # of child executions too, so it's loaded along with them instead of
+    # running a query per child execution.
+    options = [sa.orm.undefer_group(models.DATA_GROUP)]
+
+    if model in _CHILD_EXECUTIONS:
+        options.append(
+            sa.orm.defaultload(
+                _CHILD_EXECUTIONS[model]
+            ).undefer_group(models.DATA_GROUP)
+        )
+
+    query = _secure_query(model).options(*options)
+
+    return query.filter_by(id=id).first()
+
+
+def _get_collection(model, limit=None, marker=None, sort_keys=None,
+                    sort_dirs=None, fields=None, **kwargs):
+    """Returns a page of DB objects matching the given filters.
+
+    :param limit: Maximum number of objects to return.
+    :param marker: Id of the last object of the previous page.
+    :param sort_keys: Columns to sort by. 'id' is always added to make
+        the order (and hence pages) stable.
+    :param sort_dirs: Sort directions ('asc' or 'desc') of sort keys.
+    :param fields: Columns to load. Only these (plus primary key) are
+        loaded if given, otherwise deferred columns are not loaded.
+    :param kwargs: Column values to filter by.
+    """
+    sort_keys = list(sort_keys or ['created_at'])
+    sort_dirs = list(sort_dirs or [])
+
+    if len(sort_dirs) > len(sort_keys):
+        raise exc.InputException(
+            "Number of sort directions exceeds number of sort keys: %s, %s"
+            % (sort_dirs, sort_keys)
+        )
+
+    sort_dirs += ['asc'] * (len(sort_keys) - len(sort_dirs))
+
+    if 'id' not in sort_keys:
+        sort_keys.append('id')
+        sort_dirs.append('asc')
+
+    column_names = sa.inspect(model).column_attrs.keys()
+
+    for key in sort_keys + list(fields or []):
+        if key not in column_names:
+            raise exc.InputException(
+                "Unknown field of %s: %s" % (model.__name__, key)
+            )
+
+    query = _secure_query(model).filter_by(**kwargs)
+
+    if fields:
+        query = query.options(sa.orm.load_only(*fields))
+
+    marker_obj = None
+
+    if marker:
+        marker_obj = _get_db_object_by_id(model, marker)
+
+        if not marker_obj:
+            raise exc.NotFoundException(
+                "Marker not found [model=%s, id=%s]"
+                % (model.__name__, marker)
+            )
+
+    try:
+        query = db_utils.paginate_query(
+            query,
+            model,
+            limit,
+            sort_keys,
+            marker=marker_obj,
+            sort_dirs=sort_dirs
+        )
+    except (db_exc.InvalidSortKey, ValueError) as e:
+        raise exc.InputException("Invalid sort parameters: %s" % e)
+
+    return query.all()
+
+
 # Workbook definitions.
 
 def get_workbook(name):
@@ -223,7 +344,7 @@ def get_workflow_definitions(**kwargs):
 def create_workflow_definition(values, session=None):
     wf = models.WorkflowDefinition()
 
-    wf.update(values.copy())
+    wf.update(_with_spec_hash(values))
 
     try:
         wf.save(session=session)
@@ -243,7 +364,7 @@ def update_workflow_definition(name, values, session=None):
         raise exc.NotFoundException(
             "Workflow not found [workflow_name=%s]" % name)
 
-    wf.update(values.copy())
+    wf.update(_with_spec_hash(values))
 
     return wf
 
@@ -277,6 +398,62 @@ def _get_workflow_definition(name):
     return _get_db_object_by_name(models.WorkflowDefinition, name)
 
 
+def _with_spec_hash(values):
+    values = values.copy()
+
+    if values.get('spec'):
+        values['spec_hash'] = create_specification(values['spec']).hash
+
+    return values
+
+
+# Specifications.
+
+def get_specification(hash):
+    spec = _get_specification(hash)
+
+    if not spec:
+        raise exc.NotFoundException(
+            "Specification not found [hash=%s]" % hash
+        )
+
+    return spec
+
+
+@b.session_aware()
+def create_specification(spec, session=None):
+    """Stores the given specification unless it's already stored.
+
+    :param spec: Specification dictionary.
+    :return: Specification DB model.
+    """
+    spec_hash = utils.get_json_hash(spec)
+
+    spec_db = _get_specification(spec_hash)
+
+    if spec_db:
+        return spec_db
+
+    spec_db = models.Specification()
+
+    spec_db.update({'hash': spec_hash, 'spec': spec})
+
+    try:
+        # Savepoint keeps the transaction usable if the same
+        # specification has been stored concurrently.
+        with session.begin_nested():
+            spec_db.save(session=session)
+    except db_exc.DBDuplicateEntry:
+        spec_db = _get_specification(spec_hash)
+
+    return spec_db
+
+
+@b.session_aware()
+def _get_specification(hash, session=None):
+    return b.model_query(models.Specification).filter_by(hash=hash).first()
+
+
 # Action definitions.
 
 def get_action_definition(name):
@@ -295,7 +472,9 @@ def load_action_definition(name):
 
 
 def get_action_definitions(**kwargs):
-    return _get_collection_sorted_by_name(models.ActionDefinition, **kwargs)
+    kwargs.setdefault('sort_keys', ['name'])
+
+    return _get_collection(models.ActionDefinition, **kwargs)
 
 
 @b.session_aware()
@@ -436,11 +615,11 @@ def delete_executions(**kwargs):
 
 
 def _get_executions(**kwargs):
-    return _get_collection_sorted_by_time(models.Execution, **kwargs)
+    return _get_collection(models.Execution, **kwargs)
 
 
 def _get_execution(id):
-    return _get_db_object_by_id(models.Execution, id)
+    return _get_execution_by_id(models.Execution, id)
 
 
 # Action executions.
@@ -523,11 +702,11 @@ def delete_action_executions(**kwargs):
 
 
 def _get_action_executions(**kwargs):
-    return _get_collection_sorted_by_time(models.ActionExecution, **kwargs)
+    return _get_collection(models.ActionExecution, **kwargs)
 
 
 def _get_action_execution(id):
-    return _get_db_object_by_id(models.ActionExecution, id)
+    return _get_execution_by_id(models.ActionExecution, id)
 
 
 # Workflow executions.
@@ -605,11 +784,11 @@ def delete_workflow_executions(**kwargs):
 
 
 def _get_workflow_executions(**kwargs):
-    return _get_collection_sorted_by_time(models.WorkflowExecution, **kwargs)
+    return _get_collection(models.WorkflowExecution, **kwargs)
 
 
 def _get_workflow_execution(id):
-    return _get_db_object_by_id(models.WorkflowExecution, id)
+    return _get_execution_by_id(models.WorkflowExecution, id)
 
 
 # Tasks executions.
@@ -683,11 +862,11 @@ def delete_task_executions(**kwargs):
 
 
 def _get_task_execution(id):
-    return _get_db_object_by_id(models.TaskExecution, id)
+    return _get_execution_by_id(models.TaskExecution, id)
 
 
 def _get_task_executions(**kwargs):
-    return _get_collection_sorted_by_time(models.TaskExecution, **kwargs)
+    return _get_collection(models.TaskExecution, **kwargs)
 
 
 # Delayed calls.
@@ -719,15 +898,96 @@ def delete_delayed_call(id, session=None):
 
 
 @b.session_aware()
-def get_delayed_calls_to_start(time, session=None):
+def delete_delayed_calls(ids, session=None):
+    if not ids:
+        return
+
+    query = b.model_query(models.DelayedCall)
+
+    query.filter(models.DelayedCall.id.in_(ids)).delete(
+        synchronize_session=False
+    )
+
+
+@b.session_aware()
+def get_delayed_calls_to_start(time, limit=None, session=None):
     query = b.model_query(models.DelayedCall)
 
     query = query.filter(models.DelayedCall.execution_time < time)
     query = query.order_by(models.DelayedCall.execution_time)
 
+    if limit:
+        query = query.limit(limit)
+
     return query.all()
 
 
+@b.session_aware()
+def claim_delayed_calls(scheduler_id, time, lease_expiration, limit,
+                        session=None):
+    """Assigns a batch of due delayed calls to the given scheduler.
+
+    Calls that are not claimed yet or whose lease has expired are
+    claimed. Claiming is done with a conditional update so if several
+    schedulers compete for the same call only one of them gets it.
+
+    :param scheduler_id: Id of the claiming scheduler.
+    :param time: Calls with execution time earlier than this are claimed.
+    :param lease_expiration: Time until which the calls are assigned
+        to the scheduler.
+    :param limit: Maximum number of calls to claim.
+    :return: List of claimed delayed calls.
+    """
+    model = models.DelayedCall
+
+    not_leased = sa.or_(
+        model.lease_expiration.is_(None),
+        model.lease_expiration < datetime.datetime.now()
+    )
+
+    query = session.query(model.id).filter(model.execution_time < time)
+    query = query.filter(not_leased).order_by(model.execution_time)
+
+    ids = [row.id for row in query.limit(limit)]
+
+    if not ids:
+        return []
+
+    query = b.model_query(model).filter(model.id.in_(ids))
+
+    query.filter(not_leased).update(
+        {'scheduler_id': scheduler_id, 'lease_expiration': lease_expiration},
+        synchronize_session=False
+    )
+
+    query = query.filter_by(scheduler_id=scheduler_id)
+
+    return query.order_by(model.execution_time).all()
+
+
+@b.session_aware()
+def renew_delayed_call_lease(id, scheduler_id, lease_expiration,
+                             session=None):
+    """Extends the lease of a delayed call held by the given scheduler.
+
+    :param id: Delayed call id.
+    :param scheduler_id: Id of the scheduler holding the lease.
+    :param lease_expiration: New time until which the call is assigned
+        to the scheduler.
+    :return: False if the call is not assigned to the scheduler anymore
+        (e.g. it was claimed by another scheduler after the lease had
+        expired), True otherwise.
+    """
+    query = b.model_query(models.DelayedCall)
+
+    count = query.filter_by(id=id, scheduler_id=scheduler_id).update(
+        {'lease_expiration': lease_expiration},
+        synchronize_session=False
+    )
+
+    return count > 0
+
+
 @b.session_aware()
 def _get_delayed_call(id, session=None):
     query = b.model_query(models.DelayedCall)
@@ -756,11 +1016,17 @@ def get_cron_triggers(**kwargs):
 
 
 @b.session_aware()
-def get_next_cron_triggers(time, session=None):
+def get_next_cron_triggers(time, limit=None, session=None):
     query = b.model_query(models.CronTrigger)
 
     query = query.filter(models.CronTrigger.next_execution_time < time)
-    query = query.order_by(models.CronTrigger.next_execution_time)
+    query = query.order_by(
+        models.CronTrigger.next_execution_time,
+        models.CronTrigger.id
+    )
+
+    if limit:
+        query = query.limit(limit)
 
     return query.all()
 
@@ -794,6 +1060,30 @@ def update_cron_trigger(name, values, session=None):
     return cron_trigger
 
 
+@b.session_aware()
+def claim_cron_trigger(id, next_execution_time, new_next_execution_time,
+                       session=None):
+    """Moves next execution time of a cron trigger forward.
+
+    The update is conditional on the trigger still having the given
+    next execution time so that only one of several processes handling
+    the same trigger succeeds.
+
+    :return: True if the trigger has been claimed, False otherwise.
+    """
+    query = b.model_query(models.CronTrigger).filter_by(
+        id=id,
+        next_execution_time=next_execution_time
+    )
+
+    updated = query.update(
+        {'next_execution_time': new_next_execution_time},
+        synchronize_session=False
+    )
+
+    return updated == 1
+
+
 @b.session_aware()
 def create_or_update_cron_trigger(name, values, session=None):
     cron_trigger = _get_cron_trigger(name)
@@ -59,6 +59,9 @@ class WorkflowDefinition(Definition):
         sa.UniqueConstraint('name', 'project_id'),
     )
 
+    # Hash of the specification stored in 'specifications_v2' table.
+    spec_hash = sa.Column(sa.CHAR(64), nullable=True)
+
 
 class ActionDefinition(Definition):
     """Contains info about registered Actions."""
@@ -81,11 +84,26 @@ class ActionDefinition(Definition):
 
 # Execution objects.
 
+# Group of large JSON columns of executions. They are loaded only when
+# one of them is accessed or when the query asks to undefer the group.
+DATA_GROUP = 'data'
+
+
+def _data_column(column):
+    return sa.orm.deferred(column, group=DATA_GROUP)
+
+
 class Execution(mb.MistralSecureModelBase):
     """Abstract execution object."""
 
     __tablename__ = 'executions_v2'
 
+    __table_args__ = (
+        sa.Index('executions_v2_project_id_created_at_idx',
+                 'project_id', 'created_at'),
+        sa.Index('executions_v2_state_idx', 'state'),
+    )
+
     type = sa.Column(sa.String(50))
 
     __mapper_args__ = {
@@ -97,7 +115,10 @@ class Execution(mb.MistralSecureModelBase):
     id = mb.id_column()
 
     workflow_name = sa.Column(sa.String(80))
-    spec = sa.Column(st.JsonDictType())
+    # Executions normally refer to a workflow specification stored in
+    # 'specifications_v2' table by its hash and don't keep a copy of it.
+    spec = _data_column(sa.Column(st.JsonDictType()))
+    spec_hash = sa.Column(sa.CHAR(64), nullable=True)
     state = sa.Column(sa.String(20))
     state_info = sa.Column(sa.String(1024), nullable=True)
     tags = sa.Column(st.JsonListType())
@@ -114,20 +135,24 @@ class ActionExecution(Execution):
     definition_name = sa.Column(sa.String(80))
     accepted = sa.Column(sa.Boolean(), default=False)
 
+    # Index of the iteration if the action is run by 'with-items' task.
+    iteration_index = sa.Column(sa.Integer(), nullable=True)
+
     # TODO(rakhmerov): We have to use @declared_attr here temporarily to
     # resolve naming conflict with TaskExecution.
     @declared_attr
     def input(cls):
         "'input' column, if not present already."
-        return Execution.__table__.c.get(
-            'input',
-            sa.Column(st.JsonDictType(), nullable=True)
+        return _data_column(
+            Execution.__table__.c.get(
+                'input',
+                sa.Column(st.JsonDictType(), nullable=True)
+            )
         )
 
     # Note: Corresponds to MySQL 'LONGTEXT' type which is of unlimited size.
     # TODO(rakhmerov): Change to LongText after refactoring.
-    output = sa.Column(st.JsonDictType(), nullable=True)
-    # output = sa.orm.deferred(sa.Column(st.LongText(), nullable=True))
+    output = _data_column(sa.Column(st.JsonDictType(), nullable=True))
 
 
 class WorkflowExecution(ActionExecution):
@@ -141,7 +166,7 @@ class WorkflowExecution(ActionExecution):
     start_params = sa.Column(st.JsonDictType())
 
     # TODO(rakhmerov): We need to get rid of this field at all.
-    context = sa.Column(st.JsonDictType())
+    context = _data_column(sa.Column(st.JsonDictType()))
 
 
 class TaskExecution(Execution):
@@ -153,7 +178,7 @@ class TaskExecution(Execution):
 
     # Main properties.
     name = sa.Column(sa.String(80))
-    action_spec = sa.Column(st.JsonDictType())
+    action_spec = _data_column(sa.Column(st.JsonDictType()))
 
     # Data Flow properties.
 
@@ -161,15 +186,17 @@ class TaskExecution(Execution):
     @declared_attr
     def input(cls):
         "'input' column, if not present already."
-        return Execution.__table__.c.get(
-            'input',
-            sa.Column(st.JsonDictType(), nullable=True)
+        return _data_column(
+            Execution.__table__.c.get(
+                'input',
+                sa.Column(st.JsonDictType(), nullable=True)
+            )
         )
 
-    in_context = sa.Column(st.JsonDictType())
+    in_context = _data_column(sa.Column(st.JsonDictType()))
     # TODO(rakhmerov): We need to use action executions in the future.
-    result = sa.Column(st.JsonDictType())
-    published = sa.Column(st.JsonDictType())
+    result = _data_column(sa.Column(st.JsonDictType()))
+    published = _data_column(sa.Column(st.JsonDictType()))
 
     # Runtime context like iteration_no of a repeater.
     # Effectively internal engine properties which will be used to determine
@@ -217,15 +244,54 @@ WorkflowExecution.task_executions = relationship(
     lazy='select'
 )
 
+# Indexes for looking up tasks of a workflow execution by name and state.
+
+sa.Index(
+    'executions_v2_workflow_execution_id_name_idx',
+    Execution.__table__.c.workflow_execution_id,
+    Execution.__table__.c.name
+)
+
+sa.Index(
+    'executions_v2_workflow_execution_id_state_idx',
+    Execution.__table__.c.workflow_execution_id,
+    Execution.__table__.c.state
+)
+
+# Index for looking up iterations of 'with-items' tasks.
+
+sa.Index(
+    'executions_v2_task_execution_id_iteration_index_idx',
+    Execution.__table__.c.task_execution_id,
+    Execution.__table__.c.iteration_index
+)
+
 
 # Other objects.
 
 
+class Specification(mb.MistralModelBase):
+    """Contains specification content addressed by its hash.
+
+    Workflow definitions and executions refer to specifications by hash
+    so that the same specification is stored only once.
+    """
+
+    __tablename__ = 'specifications_v2'
+
+    hash = sa.Column(sa.CHAR(64), primary_key=True)
+    spec = sa.Column(st.JsonDictType())
+
+
 class DelayedCall(mb.MistralModelBase):
     """Contains info about delayed calls."""
 
     __tablename__ = 'delayed_calls_v2'
 
+    __table_args__ = (
+        sa.Index('delayed_calls_v2_execution_time_idx', 'execution_time'),
+    )
+
     id = mb.id_column()
     factory_method_path = sa.Column(sa.String(200), nullable=True)
     target_method_name = sa.Column(sa.String(80), nullable=False)
@@ -234,6 +300,11 @@ class DelayedCall(mb.MistralModelBase):
     auth_context = sa.Column(st.JsonDictType())
     execution_time = sa.Column(sa.DateTime, nullable=False)
 
+    # Scheduler that claimed the call and time until which the claim
+    # is valid.
+    scheduler_id = sa.Column(sa.String(36), nullable=True)
+    lease_expiration = sa.Column(sa.DateTime, nullable=True)
+
 
 class Environment(mb.MistralSecureModelBase):
     """Contains environment variables for workflow execution."""
@@ -266,6 +337,10 @@ class CronTrigger(mb.MistralSecureModelBase):
         sa.UniqueConstraint('name', 'project_id'),
         sa.UniqueConstraint(
             'workflow_input_hash', 'workflow_name', 'pattern', 'project_id'
+        ),
+        sa.Index(
+            'cron_triggers_v2_next_execution_time_idx',
+            'next_execution_time'
         )
     )
 
@@ -45,13 +45,24 @@ class Engine(object):
 
         Task result here is a result which comes from a action/workflow
         associated which the task.
-        :param task_id: Task id.
+        :param task_id: Task id or id of action execution of 'with-items'
+            task iteration.
         :param result: Action/workflow result. Instance of
             mistral.workflow.base.TaskResult
         :return:
         """
         raise NotImplementedError
 
+    @abc.abstractmethod
+    def on_task_results(self, results):
+        """Accepts a batch of task results and continues the workflows.
+
+        :param results: List of (task_id, result) tuples where result is
+            an instance of mistral.workflow.utils.TaskResult.
+        :return: List of tasks.
+        """
+        raise NotImplementedError
+
     @abc.abstractmethod
     def run_task(self, task_id):
         """Runs task with given id..
@@ -110,7 +121,8 @@ class Executor(object):
                    action_params):
         """Runs action.
 
-        :param task_id: Corresponding task id.
+        :param task_id: Corresponding task id or id of action execution
+            of 'with-items' task iteration.
         :param action_class_str: Path to action class in dot notation.
         :param attributes: Attributes of action class which will be set to.
         :param action_params: Action parameters.
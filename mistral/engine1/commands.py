@@ -14,7 +14,6 @@
 #    limitations under the License.
 
 import abc
-import copy
 import six
 
 from mistral.db.v2 import api as db_api
@@ -86,6 +85,10 @@ class RunTask(EngineCommand):
         self.task_spec = task_spec
         self.task_ex = task_ex
 
+        # Indexes and action execution ids of 'with-items' iterations
+        # to dispatch.
+        self._iterations = None
+
         if task_ex:
             self.wf_ex = task_ex.workflow_execution
 
@@ -94,6 +97,8 @@ class RunTask(EngineCommand):
             LOG.debug('Resuming workflow task: %s' % self.task_spec)
             self.task_ex.state = states.RUNNING
 
+            self._reserve_iterations()
+
             return True
 
         LOG.debug('Running workflow task: %s' % self.task_spec)
@@ -102,10 +107,49 @@ class RunTask(EngineCommand):
         self._before_task_start(wf_handler.wf_spec)
 
         if wf_ex.state == states.RUNNING:
+            if self.task_ex.state == states.RUNNING:
+                self._reserve_iterations()
+
             return True
 
         return False
 
+    def _reserve_iterations(self):
+        """Creates action executions for iterations that can run now.
+
+        Failed iterations that need to run again go first. The cursor of
+        'with-items' is stored in the task runtime context so it has to be
+        moved within the transaction the command runs locally in.
+        """
+        if not self.task_spec.get_with_items():
+            return
+
+        start, end = with_items.get_indexes_for_loop(
+            self.task_ex,
+            self.task_spec
+        )
+
+        with_items.move_cursor(self.task_ex, end)
+
+        indexes = (
+            with_items.pop_retries(self.task_ex) +
+            list(six.moves.range(start, end))
+        )
+
+        self._iterations = [
+            (index, self._create_db_iteration(index).id) for index in indexes
+        ]
+
+    def _create_db_iteration(self, index):
+        return db_api.create_action_execution({
+            'task_execution_id': self.task_ex.id,
+            'definition_name': self.task_spec.get_action_name(),
+            'iteration_index': index,
+            'state': states.RUNNING,
+            'workflow_name': self.task_ex.workflow_name,
+            'project_id': self.task_ex.project_id
+        })
+
     def _prepare_task(self, wf_ex, wf_handler, cause_task_ex):
         if self.task_ex:
             return
@@ -128,11 +172,16 @@ class RunTask(EngineCommand):
             p.before_task_start(self.task_ex, self.task_spec)
 
     def _create_db_task(self, wf_ex):
+        # Task specification is resolved through the workflow specification
+        # if the workflow execution refers to it by hash.
+        spec = None if wf_ex.spec_hash else self.task_spec.to_dict()
+
         return db_api.create_task_execution({
             'workflow_execution_id': wf_ex.id,
             'name': self.task_spec.get_name(),
             'state': states.RUNNING,
-            'spec': self.task_spec.to_dict(),
+            'spec': spec,
+            'spec_hash': wf_ex.spec_hash,
             'input': None,
             'in_context': None,
             'output': None,
@@ -178,7 +227,7 @@ class RunTask(EngineCommand):
 
     def _run_action(self):
         wf_ex = self.wf_ex
-        wf_spec = spec_parser.get_workflow_spec(wf_ex.spec)
+        wf_spec = spec_parser.get_workflow_spec_by_execution(wf_ex)
 
         action_spec_name = self.task_spec.get_action_name()
 
@@ -193,7 +242,7 @@ class RunTask(EngineCommand):
 
         if action_db.spec:
             # Ad-hoc action.
-            action_spec = spec_parser.get_action_spec(action_db.spec)
+            action_spec = spec_parser.get_action_spec_by_definition(action_db)
 
             base_name = action_spec.get_base()
 
@@ -213,11 +262,10 @@ class RunTask(EngineCommand):
             else:
                 action_input = {}
 
-        target = expr.evaluate_recursively(
-            self.task_spec.get_target(),
-            utils.merge_dicts(
-                copy.copy(self.task_ex.input),
-                copy.copy(self.task_ex.in_context)
+        target = self.task_spec.get_target_template().evaluate(
+            data_flow.merge_contexts(
+                self.task_ex.input,
+                self.task_ex.in_context
             )
         )
 
@@ -229,21 +277,30 @@ class RunTask(EngineCommand):
 
         if with_items_spec:
             action_context = action_input.pop('action_context', None)
-            action_input_collection = with_items.calc_input(action_input)
 
-            for a_input in action_input_collection:
-                evaluated_input = expr.evaluate_recursively(
-                    self.task_spec.get_input(),
-                    utils.merge_dicts(
-                        copy.copy(a_input),
-                        copy.copy(self.task_ex.in_context))
+            with_items.validate_input(action_input)
+
+            input_template = self.task_spec.get_input_template()
+
+            for index, action_ex_id in self._iterations:
+                a_input = with_items.get_iteration_input(action_input, index)
+
+                evaluated_input = input_template.evaluate(
+                    data_flow.merge_contexts(a_input, self.task_ex.in_context)
                 )
 
+                # Asynchronous actions send results of iterations with
+                # ids of their action executions.
                 if action_context:
-                    evaluated_input['action_context'] = action_context
+                    evaluated_input['action_context'] = dict(
+                        action_context,
+                        action_execution_id=action_ex_id
+                    )
 
+                # Iterations run with ids of their action executions so
+                # that their results can be told apart.
                 rpc.get_executor_client().run_action(
-                    self.task_ex.id,
+                    action_ex_id,
                     action_db.action_class,
                     action_db.attributes or {},
                     utils.merge_dicts(
@@ -269,7 +326,9 @@ class RunTask(EngineCommand):
 
     def _run_workflow(self):
         parent_wf_ex = self.wf_ex
-        parent_wf_spec = spec_parser.get_workflow_spec(parent_wf_ex.spec)
+        parent_wf_spec = spec_parser.get_workflow_spec_by_execution(
+            parent_wf_ex
+        )
 
         wf_spec_name = self.task_spec.get_workflow_name()
 
@@ -279,7 +338,7 @@ class RunTask(EngineCommand):
             wf_spec_name
         )
 
-        wf_spec = spec_parser.get_workflow_spec(wf_db.spec)
+        wf_spec = spec_parser.get_workflow_spec_by_definition(wf_db)
 
         wf_input = self.task_ex.input
 
@@ -301,6 +360,26 @@ class RunTask(EngineCommand):
         )
 
 
+class RunNextIterations(RunTask):
+    """Dispatches next 'with-items' iterations of a running task.
+
+    The command is issued every time a result of an iteration arrives so
+    that new iterations are dispatched as the previous ones complete.
+    """
+
+    def run_local(self, wf_ex, wf_handler, cause_task_ex=None):
+        if self.task_ex.state == states.RUNNING:
+            self._reserve_iterations()
+
+        return True
+
+    def run_remote(self, wf_ex, wf_handler, cause_task_ex=None):
+        if self._iterations and self.task_spec.get_action_name():
+            self._run_action()
+
+        return True
+
+
 class FailWorkflow(EngineCommand):
     def run_local(self, wf_ex, wf_handler, cause_task_ex=None):
         wf_handler.stop_workflow(states.ERROR)
@@ -13,20 +13,24 @@
 #    See the License for the specific language governing permissions and
 #    limitations under the License.
 
+import collections
 import copy
 import traceback
 
 from mistral.db.v2 import api as db_api
+from mistral.db.v2.sqlalchemy import models as db_models
 from mistral.engine1 import base
 from mistral.engine1 import commands
 from mistral.engine1 import policies
 from mistral.engine1 import utils
 from mistral.openstack.common import log as logging
 from mistral import utils as u
+from mistral.utils import metrics
 from mistral.workbook import parser as spec_parser
 from mistral.workflow import data_flow
 from mistral.workflow import states
 from mistral.workflow import utils as wf_utils
+from mistral.workflow import with_items
 from mistral.workflow import workflow_handler_factory as wfh_factory
 
 
@@ -51,7 +55,7 @@ class DefaultEngine(base.Engine):
             with db_api.transaction():
                 wf_db = db_api.get_workflow_definition(workflow_name)
 
-                wf_spec = spec_parser.get_workflow_spec(wf_db.spec)
+                wf_spec = spec_parser.get_workflow_spec_by_definition(wf_db)
 
                 utils.validate_workflow_input(wf_db, wf_spec, workflow_input)
 
@@ -91,42 +95,43 @@ class DefaultEngine(base.Engine):
         return wf_ex
 
     @u.log_exec(LOG)
+    @metrics.timed('engine.on_task_result')
     def on_task_result(self, task_id, result):
         task_name = "Unknown"
         exec_id = None
 
         try:
             with db_api.transaction():
-                task_ex = db_api.get_task_execution(task_id)
-                task_name = task_ex.name
-                wf_ex = db_api.get_workflow_execution(
-                    task_ex.workflow_execution_id
-                )
-                exec_id = wf_ex.id
+                with metrics.timer('engine.db_load'):
+                    task_id, action_ex_id = self._resolve_result_id(task_id)
 
-                result = utils.transform_result(wf_ex, task_ex, result)
-                wf_handler = wfh_factory.create_workflow_handler(wf_ex)
+                    task_ex = db_api.get_task_execution(task_id)
+                    task_name = task_ex.name
+                    exec_id = task_ex.workflow_execution_id
 
-                self._after_task_complete(
-                    task_ex,
-                    spec_parser.get_task_spec(task_ex.spec),
-                    result,
-                    wf_handler.wf_spec
-                )
+                    # Serialize processing of the same workflow execution
+                    # across engines.
+                    self._lock_workflow_execution(exec_id)
 
-                if task_ex.state == states.DELAYED:
-                    return task_ex
+                    # Reload task execution since it might have been
+                    # changed while the lock was being acquired.
+                    task_ex = db_api.get_task_execution(task_id)
+                    wf_ex = db_api.get_workflow_execution(exec_id)
 
-                # Calculate commands to process next.
-                cmds = wf_handler.on_task_result(task_ex, result)
+                with metrics.timer('engine.spec_parse'):
+                    wf_handler = wfh_factory.create_workflow_handler(wf_ex)
 
-                self._run_local_commands(
-                    cmds,
+                cmds = self._process_task_result(
+                    task_ex,
+                    result,
                     wf_ex,
                     wf_handler,
-                    task_ex
+                    action_ex_id
                 )
 
+                if task_ex.state == states.DELAYED:
+                    return task_ex
+
             self._run_remote_commands(cmds, wf_ex, wf_handler)
             self._check_subworkflow_completion(wf_ex)
 
@@ -141,6 +146,146 @@ class DefaultEngine(base.Engine):
 
         return task_ex
 
+    @u.log_exec(LOG)
+    @metrics.timed('engine.on_task_results')
+    def on_task_results(self, results):
+        task_exs = []
+
+        for exec_id, group in self._group_task_results(results).items():
+            task_exs.extend(self._on_task_results_group(exec_id, group))
+
+        return task_exs
+
+    @classmethod
+    def _group_task_results(cls, results):
+        """Groups task results by workflow execution id preserving order."""
+        groups = collections.OrderedDict()
+
+        with db_api.transaction():
+            for id, result in results:
+                task_id, action_ex_id = cls._resolve_result_id(id)
+
+                exec_id = db_api.get_task_execution(
+                    task_id
+                ).workflow_execution_id
+
+                groups.setdefault(exec_id, []).append(
+                    (task_id, action_ex_id, result)
+                )
+
+        return groups
+
+    def _on_task_results_group(self, exec_id, results):
+        """Handles results of tasks belonging to one workflow execution.
+
+        All results are processed within one transaction using the same
+        workflow handler. A failure fails the corresponding workflow
+        execution only so that the rest of the batch still gets processed.
+        """
+        task_exs = []
+        task_id = None
+
+        try:
+            with db_api.transaction():
+                with metrics.timer('engine.db_load'):
+                    self._lock_workflow_execution(exec_id)
+
+                    wf_ex = db_api.get_workflow_execution(exec_id)
+
+                with metrics.timer('engine.spec_parse'):
+                    wf_handler = wfh_factory.create_workflow_handler(wf_ex)
+
+                cmds = []
+
+                for task_id, action_ex_id, result in results:
+                    with metrics.timer('engine.db_load'):
+                        task_ex = db_api.get_task_execution(task_id)
+
+                    cmds.extend(
+                        self._process_task_result(
+                            task_ex,
+                            result,
+                            wf_ex,
+                            wf_handler,
+                            action_ex_id
+                        )
+                    )
+
+                    task_exs.append(task_ex)
+
+            self._run_remote_commands(cmds, wf_ex, wf_handler)
+            self._check_subworkflow_completion(wf_ex)
+
+        except Exception as e:
+            LOG.error(
+                "Failed to handle results for task id=%s, execution id=%s:"
+                " %s\n%s", task_id, exec_id, e, traceback.format_exc()
+            )
+            self._fail_workflow(exec_id, e)
+
+        return task_exs
+
+    def _process_task_result(self, task_ex, result, wf_ex, wf_handler,
+                             action_ex_id=None):
+        """Applies task result and runs resulting local commands.
+
+        :param action_ex_id: Id of action execution of 'with-items'
+            iteration the result belongs to if known.
+        :return: List of commands to run remotely after the transaction.
+        """
+        if self._is_result_applied(task_ex, action_ex_id):
+            # Executor may send a result again if it's not sure the
+            # engine has got it.
+            LOG.warn(
+                "Ignoring result of task '%s' id=%s since it's already"
+                " been applied." % (task_ex.name, task_ex.id)
+            )
+
+            return []
+
+        result = utils.transform_result(wf_ex, task_ex, result)
+
+        with metrics.timer('engine.spec_parse'):
+            task_spec = spec_parser.get_task_spec_by_execution(task_ex)
+
+        with metrics.timer('engine.policies'):
+            self._after_task_complete(
+                task_ex,
+                task_spec,
+                result,
+                wf_handler.wf_spec
+            )
+
+        if task_ex.state == states.DELAYED:
+            return []
+
+        if (task_spec.get_with_items() and
+                not states.is_completed(task_ex.state)):
+            action_ex = self._get_db_iteration(task_ex, action_ex_id)
+
+            if not action_ex:
+                return []
+
+            if self._retry_iteration(task_ex, task_spec, action_ex, result):
+                # Iterations aren't dispatched while workflow is paused.
+                if wf_handler.is_paused_or_completed():
+                    return []
+
+                cmds = [commands.RunNextIterations(task_spec, task_ex)]
+
+                self._run_local_commands(cmds, wf_ex, wf_handler, task_ex)
+
+                return cmds
+
+        # Calculate commands to process next.
+        with metrics.timer('engine.wf_handler'):
+            cmds = wf_handler.on_task_result(task_ex, result)
+
+        with metrics.timer('engine.run_local'):
+            self._run_local_commands(cmds, wf_ex, wf_handler, task_ex)
+
+        return cmds
+
     @u.log_exec(LOG)
     def run_task(self, task_id):
         task_name = "Unknown"
@@ -150,6 +295,9 @@ class DefaultEngine(base.Engine):
             with db_api.transaction():
                 task_ex = db_api.get_task_execution(task_id)
                 task_name = task_ex.name
+                exec_id = task_ex.workflow_execution_id
+
+                self._lock_workflow_execution(exec_id)
 
                 u.wf_trace.info(
                     task_ex,
@@ -162,10 +310,9 @@ class DefaultEngine(base.Engine):
                     {'state': states.RUNNING}
                 )
 
-                task_spec = spec_parser.get_task_spec(task_ex.spec)
+                task_spec = spec_parser.get_task_spec_by_execution(task_ex)
 
                 wf_ex = task_ex.workflow_execution
-                exec_id = wf_ex.id
 
                 wf_handler = wfh_factory.create_workflow_handler(wf_ex)
 
@@ -186,6 +333,8 @@ class DefaultEngine(base.Engine):
     @u.log_exec(LOG)
     def pause_workflow(self, execution_id):
         with db_api.transaction():
+            self._lock_workflow_execution(execution_id)
+
             wf_ex = db_api.get_workflow_execution(execution_id)
 
             wf_handler = wfh_factory.create_workflow_handler(wf_ex)
@@ -198,6 +347,8 @@ class DefaultEngine(base.Engine):
     def resume_workflow(self, execution_id):
         try:
             with db_api.transaction():
+                self._lock_workflow_execution(execution_id)
+
                 wf_ex = db_api.get_workflow_execution(execution_id)
 
                 wf_handler = wfh_factory.create_workflow_handler(wf_ex)
@@ -220,6 +371,8 @@ class DefaultEngine(base.Engine):
     @u.log_exec(LOG)
     def stop_workflow(self, execution_id, state, message=None):
         with db_api.transaction():
+            self._lock_workflow_execution(execution_id)
+
             wf_ex = db_api.get_execution(execution_id)
             wf_handler = wfh_factory.create_workflow_handler(wf_ex)
 
@@ -235,6 +388,8 @@ class DefaultEngine(base.Engine):
         with db_api.transaction():
             err_msg = str(err)
 
+            self._lock_workflow_execution(execution_id)
+
             wf_ex = db_api.load_workflow_execution(execution_id)
 
             if wf_ex is None:
@@ -254,6 +409,104 @@ class DefaultEngine(base.Engine):
                     wf_utils.TaskResult(error=err_msg)
                 )
 
+    @staticmethod
+    def _resolve_result_id(id):
+        """Returns ids of task execution and action execution of a result.
+
+        Iterations of 'with-items' tasks run with ids of their action
+        executions so that results of different iterations can be told
+        apart. Other results are sent with ids of task executions.
+        """
+        if db_api.load_task_execution(id):
+            return id, None
+
+        action_ex = db_api.load_action_execution(id)
+
+        if not action_ex:
+            # Raises NotFoundException.
+            db_api.get_task_execution(id)
+
+        return action_ex.task_execution_id, id
+
+    @staticmethod
+    def _is_result_applied(task_ex, action_ex_id):
+        if states.is_completed(task_ex.state):
+            return True
+
+        if not action_ex_id:
+            return False
+
+        action_ex = db_api.get_action_execution(action_ex_id)
+
+        return states.is_completed(action_ex.state)
+
+    @staticmethod
+    def _get_db_iteration(task_ex, action_ex_id):
+        if action_ex_id:
+            action_ex = db_api.get_action_execution(action_ex_id)
+        else:
+            # Asynchronous actions may send results with task id. Such a
+            # result is taken as a result of the oldest running iteration.
+            # Results of iterations should be sent with ids of their
+            # action executions to be matched exactly.
+            action_exs = db_api.get_action_executions(
+                task_execution_id=task_ex.id,
+                state=states.RUNNING,
+                sort_keys=['created_at', 'iteration_index'],
+                limit=1
+            )
+
+            action_ex = action_exs[0] if action_exs else None
+
+        if not action_ex or action_ex.state != states.RUNNING:
+            LOG.warn(
+                "Ignoring result of task '%s' id=%s since it has no"
+                " running iteration." % (task_ex.name, task_ex.id)
+            )
+
+            return None
+
+        return action_ex
+
+    @staticmethod
+    def _retry_iteration(task_ex, task_spec, action_ex, result):
+        """Stores result of 'with-items' iteration.
+
+        :return: True if the iteration failed and needs to run again
+            according to task retry policy, False otherwise.
+        """
+        action_ex.state = states.ERROR if result.is_error() else states.SUCCESS
+        action_ex.output = with_items.get_iteration_output(result)
+
+        if not result.is_error():
+            return False
+
+        attempt_count = len(
+            db_api.get_action_executions(
+                task_execution_id=task_ex.id,
+                iteration_index=action_ex.iteration_index,
+                state=states.ERROR
+            )
+        )
+
+        if attempt_count >= with_items.get_retry_count(task_spec):
+            return False
+
+        u.wf_trace.info(
+            task_ex,
+            "Iteration %s of task '%s' failed, running it again"
+            " [attempt=%s]" % (action_ex.iteration_index, task_ex.name,
+                               attempt_count + 1)
+        )
+
+        with_items.add_retry(task_ex, action_ex.iteration_index)
+
+        return True
+
+    @staticmethod
+    def _lock_workflow_execution(execution_id):
+        db_api.acquire_lock(db_models.WorkflowExecution, execution_id)
+
     @staticmethod
     def _canonize_workflow_params(params):
         # Resolve environment parameter.
@@ -294,9 +547,13 @@ class DefaultEngine(base.Engine):
 
     @staticmethod
     def _create_db_execution(wf_db, wf_spec, wf_input, params):
+        # Workflow specification is referred to by its hash. A copy of it
+        # is stored only for definitions created before specifications got
+        # stored separately.
         wf_ex = db_api.create_workflow_execution({
             'workflow_name': wf_db.name,
-            'spec': wf_spec.to_dict(),
+            'spec': None if wf_db.spec_hash else wf_spec.to_dict(),
+            'spec_hash': wf_db.spec_hash,
             'start_params': params or {},
             'state': states.RUNNING,
             'input': wf_input or {},
@@ -14,10 +14,14 @@
 #    See the License for the specific language governing permissions and
 #    limitations under the License.
 
+import threading
+
+import eventlet
 from oslo.config import cfg
 
 from mistral.actions import action_factory as a_f
 from mistral.engine1 import base
+from mistral.engine1 import pools
 from mistral import exceptions as exc
 from mistral.openstack.common import log as logging
 from mistral.utils import inspect_utils as i_u
@@ -27,11 +31,178 @@ from mistral.workflow import utils as wf_utils
 LOG = logging.getLogger(__name__)
 WORKFLOW_TRACE = logging.getLogger(cfg.CONF.workflow_trace_log_name)
 
+JAVASCRIPT_ACTION = 'mistral.actions.std_actions.JavaScriptAction'
+
+
+class TaskResultBuffer(object):
+    """Coalesces task results to send them to engine in batches.
+
+    Buffered results are sent once their number reaches max_size or
+    when the oldest of them has been waiting for max_latency seconds.
+    If a batch can't be sent its results are sent one by one so that
+    they don't get lost. The engine ignores results it has already
+    applied so results of a batch that reached the engine despite the
+    error aren't applied twice.
+    """
+
+    def __init__(self, engine_client, max_size, max_latency):
+        self._engine_client = engine_client
+        self.max_size = max_size
+        self.max_latency = max_latency
+
+        self._results = []
+        self._lock = threading.Lock()
+        self._timer = None
+
+    def add(self, task_id, result):
+        with self._lock:
+            self._results.append((task_id, result))
+
+            if len(self._results) < self.max_size:
+                if not self._timer:
+                    self._timer = eventlet.spawn_after(
+                        self.max_latency,
+                        self._flush_on_timer
+                    )
+
+                return
+
+        self.flush()
+
+    def flush(self):
+        with self._lock:
+            results = self._results
+            self._results = []
+
+            if self._timer:
+                self._timer.cancel()
+                self._timer = None
+
+        if not results:
+            return
+
+        try:
+            self._engine_client.on_task_results(results)
+        except Exception as e:
+            LOG.warning(
+                "Failed to send %s task results to engine in a batch,"
+                " sending them one by one: %s" % (len(results), e)
+            )
+
+            self._send_one_by_one(results)
+
+    def _send_one_by_one(self, results):
+        for task_id, result in results:
+            try:
+                self._engine_client.on_task_result(task_id, result)
+            except Exception as e:
+                LOG.exception(
+                    "Failed to send result of task %s to engine: %s"
+                    % (task_id, e)
+                )
+
+    def _flush_on_timer(self):
+        try:
+            self.flush()
+        except Exception as e:
+            LOG.exception("Failed to send task results to engine: %s" % e)
+
+
+def _run_action(action_cls, action_params):
+    action = action_cls(**action_params)
+
+    return action.run(), action.is_sync()
+
+
+def _construct_and_run_action(action_class_str, attributes, action_params):
+    # Action classes with attributes are created dynamically and can't be
+    # pickled so worker processes construct them on their own.
+    return _run_action(
+        a_f.construct_action_class(action_class_str, attributes),
+        action_params
+    )
+
+
+def _create_pool(mode):
+    queue_size = cfg.CONF.executor.action_pool_queue_size
+
+    if mode == 'thread':
+        return pools.ThreadPool(queue_size)
+
+    if mode == 'process':
+        return pools.ProcessPool(
+            cfg.CONF.executor.action_process_pool_size,
+            cfg.CONF.executor.action_process_max_tasks,
+            queue_size
+        )
+
+    raise exc.MistralException("Unknown action run mode: %s" % mode)
+
+
+def _check_js_max_heap_size():
+    # The limit applies to the whole process and V8 aborts the process
+    # once it's exceeded, so only worker processes may have it.
+    if not cfg.CONF.executor.js_max_heap_size:
+        return
+
+    if cfg.CONF.executor.action_run_modes.get(JAVASCRIPT_ACTION) != 'process':
+        raise exc.MistralException(
+            "Option 'js_max_heap_size' requires %s to run in 'process'"
+            " mode, see option 'action_run_modes'." % JAVASCRIPT_ACTION
+        )
+
 
 class DefaultExecutor(base.Executor):
     def __init__(self, engine_client):
+        _check_js_max_heap_size()
+
         self._engine_client = engine_client
 
+        # Run mode -> pool.
+        self._pools = {}
+
+        batch_size = cfg.CONF.executor.result_batch_size
+
+        self._result_buffer = (
+            TaskResultBuffer(
+                engine_client,
+                batch_size,
+                cfg.CONF.executor.result_batch_latency
+            )
+            if batch_size > 1 else None
+        )
+
+    def _send_result_to_engine(self, task_id, result):
+        if self._result_buffer:
+            self._result_buffer.add(task_id, result)
+        else:
+            self._engine_client.on_task_result(task_id, result)
+
+    def _get_pool(self, mode):
+        if mode not in self._pools:
+            self._pools[mode] = _create_pool(mode)
+
+        return self._pools[mode]
+
+    def _execute_action(self, action_cls, action_class_str, attributes,
+                        action_params):
+        mode = cfg.CONF.executor.action_run_modes.get(action_class_str)
+
+        if not mode:
+            return _run_action(action_cls, action_params)
+
+        pool = self._get_pool(mode)
+
+        if mode == 'process':
+            return pool.execute(
+                _construct_and_run_action,
+                action_class_str,
+                attributes,
+                action_params
+            )
+
+        return pool.execute(_run_action, action_cls, action_params)
+
     def run_action(self, task_id, action_class_str, attributes, action_params):
         """Runs action.
 
@@ -42,18 +213,22 @@ class DefaultExecutor(base.Executor):
         """
 
         def send_error_to_engine(error_msg):
-            self._engine_client.on_task_result(
+            self._send_result_to_engine(
                 task_id, wf_utils.TaskResult(error=error_msg)
             )
 
         action_cls = a_f.construct_action_class(action_class_str, attributes)
 
         try:
-            action = action_cls(**action_params)
-            result = action.run()
+            result, is_sync = self._execute_action(
+                action_cls,
+                action_class_str,
+                attributes,
+                action_params
+            )
 
-            if action.is_sync():
-                self._engine_client.on_task_result(
+            if is_sync:
+                self._send_result_to_engine(
                     task_id,
                     wf_utils.TaskResult(data=result)
                 )
@@ -281,6 +281,10 @@ class RetryPolicy(base.TaskPolicy):
             task_ex, task_spec, result
         )
 
+        # Iterations of 'with-items' tasks are retried one by one by engine.
+        if task_spec.get_with_items():
+            return
+
         context_key = 'retry_task_policy'
 
         runtime_context = _ensure_context_has_key(
@@ -0,0 +1,193 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2015 - Mirantis, Inc.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+"""Pools running functions outside of the eventlet hub.
+
+Functions run by these pools don't block other green threads of the
+process even if they're CPU bound. Both pools limit the number of
+functions running or waiting in them: callers block once the limit is
+reached.
+"""
+
+import fcntl
+import multiprocessing
+import os
+
+from eventlet import queue
+from eventlet import semaphore
+from eventlet import tpool
+
+from mistral import exceptions as exc
+from mistral.openstack.common import log as logging
+
+
+LOG = logging.getLogger(__name__)
+
+
+class ThreadPool(object):
+    """Runs functions in native threads of eventlet.tpool."""
+
+    def __init__(self, max_queue_size):
+        self._semaphore = semaphore.Semaphore(max_queue_size)
+
+    def execute(self, func, *args):
+        with self._semaphore:
+            return tpool.execute(func, *args)
+
+    def stop(self):
+        pass
+
+
+def _set_blocking(conn):
+    # With eventlet monkey patching multiprocessing builds pipes from green
+    # sockets which are non-blocking. Both ends are used by native threads
+    # and processes so they have to block.
+    fd = conn.fileno()
+    flags = fcntl.fcntl(fd, fcntl.F_GETFL)
+
+    fcntl.fcntl(fd, fcntl.F_SETFL, flags & ~os.O_NONBLOCK)
+
+
+def _worker_loop(conn):
+    while True:
+        try:
+            task = conn.recv()
+        except EOFError:
+            break
+
+        if task is None:
+            break
+
+        func, args = task
+
+        try:
+            result = (True, func(*args))
+        except Exception as e:
+            result = (False, e)
+
+        try:
+            conn.send(result)
+        except Exception as e:
+            # Result or exception couldn't be pickled.
+            conn.send(
+                (False, exc.MistralException(
+                    "Failed to send result of %s: %s" % (func.__name__, e)
+                ))
+            )
+
+
+class _Worker(object):
+    def __init__(self):
+        self._conn, child_conn = multiprocessing.Pipe()
+
+        _set_blocking(self._conn)
+        _set_blocking(child_conn)
+
+        self._process = multiprocessing.Process(
+            target=_worker_loop,
+            args=(child_conn,)
+        )
+        self._process.daemon = True
+        self._process.start()
+
+        child_conn.close()
+
+        self.task_count = 0
+
+    def execute(self, func, args):
+        self.task_count += 1
+
+        # Pipe operations block so they're done in native threads.
+        try:
+            tpool.execute(self._conn.send, (func, args))
+
+            succeeded, value = tpool.execute(self._conn.recv)
+        except (EOFError, IOError) as e:
+            raise exc.MistralException(
+                "Worker process %s died: %s" % (self._process.pid, e)
+            )
+
+        if not succeeded:
+            raise value
+
+        return value
+
+    def is_alive(self):
+        return self._process.is_alive()
+
+    def stop(self):
+        try:
+            self._conn.send(None)
+        except (EOFError, IOError):
+            pass
+
+        self._conn.close()
+        self._process.join(1)
+
+        if self._process.is_alive():
+            self._process.terminate()
+
+
+class ProcessPool(object):
+    """Runs functions in worker processes.
+
+    Functions and their arguments must be picklable. Workers are started
+    on demand and replaced with new ones after running max_tasks_per_worker
+    functions to release memory they might have accumulated.
+    """
+
+    def __init__(self, size, max_tasks_per_worker, max_queue_size):
+        self.size = size or multiprocessing.cpu_count()
+        self.max_tasks_per_worker = max_tasks_per_worker
+
+        self._semaphore = semaphore.Semaphore(max_queue_size)
+        self._idle_workers = queue.LightQueue()
+        self._worker_count = 0
+
+    def execute(self, func, *args):
+        with self._semaphore:
+            worker = self._get_worker()
+
+            try:
+                return worker.execute(func, args)
+            finally:
+                self._release_worker(worker)
+
+    def _get_worker(self):
+        if self._idle_workers.empty() and self._worker_count < self.size:
+            self._worker_count += 1
+
+            return _Worker()
+
+        return self._idle_workers.get()
+
+    def _release_worker(self, worker):
+        if (worker.task_count >= self.max_tasks_per_worker
+                or not worker.is_alive()):
+            LOG.debug("Recycling worker process after %s tasks."
+                      % worker.task_count)
+
+            worker.stop()
+
+            worker = _Worker()
+
+        self._idle_workers.put(worker)
+
+    def stop(self):
+        while not self._idle_workers.empty():
+            self._idle_workers.get().stop()
+
+            self._worker_count -= 1
@@ -19,6 +19,7 @@ from oslo import messaging
 from mistral import context as auth_ctx
 from mistral.engine1 import base
 from mistral.openstack.common import log as logging
+from mistral.utils import metrics
 from mistral.workflow import utils as wf_utils
 
 LOG = logging.getLogger(__name__)
@@ -98,6 +99,26 @@ class EngineServer(object):
 
         return self._engine.on_task_result(task_id, task_result)
 
+    def on_task_results(self, rpc_ctx, results):
+        """Receives calls over RPC to communicate a batch of task results.
+
+        :param rpc_ctx: RPC request context.
+        :param results: List of dictionaries with keys 'task_id',
+            'result_data' and 'result_error'.
+        :return: List of tasks.
+        """
+
+        LOG.info(
+            "Received RPC request 'on_task_results'[rpc_ctx=%s,"
+            " task_ids=%s]" % (rpc_ctx, [r['task_id'] for r in results])
+        )
+
+        return self._engine.on_task_results(
+            [(r['task_id'],
+              wf_utils.TaskResult(r['result_data'], r['result_error']))
+             for r in results]
+        )
+
     def run_task(self, rpc_ctx, task_id):
         """Runs task with given id..
 
@@ -231,6 +252,29 @@ class EngineClient(base.Engine):
             result_error=result.error
         )
 
+    def on_task_results(self, results):
+        """Conveys a batch of task results to Mistral Engine.
+
+        Unlike calling on_task_result() for every result it lets engine
+        process results of the same workflow execution at once.
+
+        :param results: List of (task_id, result) tuples.
+        :return: List of tasks.
+        """
+
+        return self._client.call(
+            auth_ctx.ctx(),
+            'on_task_results',
+            results=[
+                {
+                    'task_id': task_id,
+                    'result_data': result.data,
+                    'result_error': result.error
+                }
+                for task_id, result in results
+            ]
+        )
+
     def run_task(self, task_id):
         """Runs task with given id.
 
@@ -341,6 +385,7 @@ class ExecutorClient(base.Executor):
             serializer=serializer
         )
 
+    @metrics.timed('rpc.run_action')
     def run_action(self, task_id, action_class_str, attributes,
                    action_params, target=None):
         """Sends a request to run action to executor."""
@@ -119,10 +119,11 @@ def transform_result(wf_ex, task_ex, result):
     if result.is_error():
         return result
 
-    action_spec_name = spec_parser.get_task_spec(
-        task_ex.spec).get_action_name()
+    action_spec_name = spec_parser.get_task_spec_by_execution(
+        task_ex).get_action_name()
 
-    wf_spec_name = spec_parser.get_workflow_spec(wf_ex.spec).get_name()
+    wf_spec_name = spec_parser.get_workflow_spec_by_execution(
+        wf_ex).get_name()
 
     if action_spec_name:
         return transform_action_result(
@@ -146,7 +147,8 @@ def transform_action_result(wf_name, wf_spec_name, action_spec_name,
     if not action_db.spec:
         return result
 
-    transformer = spec_parser.get_action_spec(action_db.spec).get_output()
+    transformer = spec_parser.get_action_spec_by_definition(
+        action_db).get_output()
 
     if transformer is None:
         return result
@@ -18,12 +18,51 @@ import copy
 import re
 import six
 import yaql
+from yaql import context as yaql_context
 
 from mistral.openstack.common import log as logging
+from mistral.utils import cache
 from mistral import yaql_utils
 
 LOG = logging.getLogger(__name__)
 
+# Maximum number of distinct expression strings whose parsed form is
+# kept in memory. Workflows normally use a few hundred expressions at most
+# so the cache rarely needs to evict anything.
+PARSED_EXPRESSION_CACHE_SIZE = 2048
+
+# Function loading a workflow specification dictionary by its hash. The
+# '__execution' context entry keeps only the hash of the specification so
+# the specification is loaded only for expressions referring to it.
+_execution_spec_loader = None
+
+
+def set_execution_spec_loader(loader):
+    global _execution_spec_loader
+
+    _execution_spec_loader = loader
+
+
+def _add_execution_spec(expression, context):
+    if '__execution' not in expression or not isinstance(context, dict):
+        return context
+
+    execution = context.get('__execution')
+
+    if (not isinstance(execution, dict) or 'spec' in execution or
+            not execution.get('spec_hash') or not _execution_spec_loader):
+        return context
+
+    # The given context is not changed since it may be stored in DB.
+    context = dict(context)
+
+    context['__execution'] = dict(
+        execution,
+        spec=_execution_spec_loader(execution['spec_hash'])
+    )
+
+    return context
+
 
 class Evaluator(object):
     """Expression evaluator interface.
@@ -55,14 +94,21 @@ class Evaluator(object):
 
 
 class YAQLEvaluator(Evaluator):
+    # Parsed expressions are immutable so they can be safely shared.
+    _parsed_cache = cache.LRUCache(PARSED_EXPRESSION_CACHE_SIZE)
+
+    # Context with all Mistral functions registered. Every evaluation
+    # gets its own child context so the prototype itself never changes.
+    _root_context = yaql_utils.create_yaql_context()
+
     @classmethod
     def evaluate(cls, expression, data_context):
         LOG.debug("Evaluating YAQL expression [expression='%s', context=%s]"
                   % (expression, data_context))
 
-        result = yaql.parse(expression).evaluate(
-            data=data_context,
-            context=yaql_utils.create_yaql_context()
+        result = cls._parse(expression).evaluate(
+            data=_add_execution_spec(expression, data_context),
+            context=yaql_context.Context(cls._root_context)
         )
 
         LOG.debug("YAQL expression result: %s" % result)
@@ -75,6 +121,10 @@ class YAQLEvaluator(Evaluator):
         # Treat any string as a YAQL expression.
         return isinstance(s, six.string_types)
 
+    @classmethod
+    def _parse(cls, expression):
+        return cls._parsed_cache.get_or_create(expression, yaql.parse)
+
 
 INLINE_YAQL_REGEXP = '<%.*?%>'
 
@@ -84,6 +134,8 @@ class InlineYAQLEvaluator(YAQLEvaluator):
     # expressions in '<% %>' (i.e. <% any_symbols %>) within a string.
     find_expression_pattern = re.compile(INLINE_YAQL_REGEXP)
 
+    _found_expressions_cache = cache.LRUCache(PARSED_EXPRESSION_CACHE_SIZE)
+
     @classmethod
     def evaluate(cls, expression, data_context):
         LOG.debug(
@@ -113,13 +165,27 @@ class InlineYAQLEvaluator(YAQLEvaluator):
 
     @classmethod
     def find_inline_expressions(cls, s):
-        return cls.find_expression_pattern.findall(s)
+        return cls._found_expressions_cache.get_or_create(
+            s,
+            lambda x: tuple(cls.find_expression_pattern.findall(x))
+        )
 
 
 # TODO(rakhmerov): Make it configurable.
 _EVALUATOR = InlineYAQLEvaluator
 
 
+def get_cache_stats():
+    """Returns statistics of expression caches.
+
+    :return: Dictionary with 'parsed' and 'inline' cache statistics.
+    """
+    return {
+        'parsed': YAQLEvaluator._parsed_cache.get_stats(),
+        'inline': InlineYAQLEvaluator._found_expressions_cache.get_stats()
+    }
+
+
 def evaluate(expression, context):
     # Check if the passed value is expression so we don't need to do this
     # every time on a caller side.
@@ -142,6 +208,120 @@ def _evaluate_item(item, context):
         return evaluate_recursively(item, context)
 
 
+class Template(object):
+    """Data structure with inline expressions compiled for evaluation.
+
+    Compilation walks the given data once and splits it into literal
+    leaves, leaves consisting of a single expression and strings with
+    interpolated expressions. Evaluation then only calculates expressions
+    and reuses literal leaves as is. Containers are rebuilt on every
+    evaluation because callers are allowed to modify evaluation results.
+
+    The result of evaluation is equal to the result of
+    evaluate_recursively() called with the same data and context.
+    """
+
+    def __init__(self, data):
+        self._data = data
+        self._root = _compile_node(data)
+
+    def is_static(self):
+        """Returns True if the template contains no expressions."""
+        return self._root.static
+
+    def evaluate(self, context):
+        if not context:
+            return copy.copy(self._data)
+
+        return self._root.evaluate(context)
+
+
+class _LiteralNode(object):
+    static = True
+
+    def __init__(self, value):
+        self.value = value
+
+    def evaluate(self, context):
+        return self.value
+
+
+class _StringNode(object):
+    static = False
+
+    def __init__(self, value, found_expressions):
+        self.value = value
+        self.expressions = [
+            (e, e.strip("<%>")) for e in found_expressions
+        ]
+        self.whole = (
+            len(found_expressions) == 1 and
+            len(found_expressions[0]) == len(value)
+        )
+
+    def evaluate(self, context):
+        try:
+            if self.whole:
+                return YAQLEvaluator.evaluate(self.expressions[0][1], context)
+
+            result = self.value
+
+            for expr, trim_expr in self.expressions:
+                evaluated = YAQLEvaluator.evaluate(trim_expr, context)
+
+                result = result.replace(expr, str(evaluated))
+
+            return result
+        except AttributeError as e:
+            LOG.debug("Expression %s is not evaluated, [context=%s]: %s"
+                      % (self.value, context, e))
+
+            return self.value
+
+
+class _DictNode(object):
+    def __init__(self, items):
+        self.items = items
+        self.static = all(n.static for _, n in items)
+
+    def evaluate(self, context):
+        return dict((k, n.evaluate(context)) for k, n in self.items)
+
+
+class _ListNode(object):
+    def __init__(self, items):
+        self.items = items
+        self.static = all(n.static for n in items)
+
+    def evaluate(self, context):
+        return [n.evaluate(context) for n in self.items]
+
+
+def _compile_node(data):
+    if isinstance(data, dict):
+        return _DictNode([(k, _compile_node(v)) for k, v in data.items()])
+
+    if isinstance(data, list):
+        return _ListNode([_compile_node(item) for item in data])
+
+    if isinstance(data, six.string_types) and data:
+        found = InlineYAQLEvaluator.find_inline_expressions(data)
+
+        if found:
+            return _StringNode(data, found)
+
+    return _LiteralNode(data)
+
+
+def compile_template(data):
+    """Compiles data structure with inline expressions into a template.
+
+    :param data: Arbitrary data structure (dicts, lists, strings etc.).
+    :return: Template instance.
+    """
+    return Template(data)
+
+
 def evaluate_recursively(data, context):
     data = copy.copy(data)
 
@@ -14,6 +14,11 @@
 #    See the License for the specific language governing permissions and
 #    limitations under the License.
 
+import datetime
+
+import eventlet
+from oslo.config import cfg
+
 from mistral import context as auth_ctx
 from mistral.db.v1 import api as db_api_v1
 from mistral.db.v2 import api as db_api_v2
@@ -28,6 +33,49 @@ from mistral.workbook import parser as spec_parser
 
 LOG = log.getLogger(__name__)
 
+# Maximum number of executions of a single cron trigger handled at once.
+# Limits the number of workflows started after long downtime with
+# 'fire-all' misfire policy.
+MAX_MISSED_FIRES = 100
+
+
+def _get_fire_count(cron_trigger, due_time):
+    """Returns how many times the workflow of a due trigger is started."""
+    policy = cfg.CONF.cron_trigger.misfire_policy
+
+    due_times = triggers.get_due_execution_times(
+        cron_trigger.pattern,
+        cron_trigger.next_execution_time,
+        due_time,
+        limit=MAX_MISSED_FIRES
+    )
+
+    grace_time = datetime.datetime.now() - datetime.timedelta(
+        seconds=cfg.CONF.cron_trigger.misfire_grace_time
+    )
+
+    missed_count = len([t for t in due_times if t < grace_time])
+
+    if not missed_count:
+        return len(due_times)
+
+    LOG.warning(
+        "Cron trigger missed %s execution(s), applying misfire policy"
+        " '%s' [name=%s, next_execution_time=%s]"
+        % (missed_count, policy, cron_trigger.name,
+           cron_trigger.next_execution_time)
+    )
+
+    if policy == 'fire-all':
+        return len(due_times)
+
+    on_time_count = len(due_times) - missed_count
+
+    if policy == 'skip':
+        return on_time_count
+
+    return max(on_time_count, 1)
+
 
 class MistralPeriodicTasks(periodic_task.PeriodicTasks):
 
@@ -67,31 +115,88 @@ class MistralPeriodicTasks(periodic_task.PeriodicTasks):
 
     @periodic_task.periodic_task(spacing=1, run_immediately=True)
     def process_cron_triggers_v2(self, ctx):
-        for t in triggers.get_next_cron_triggers():
-            LOG.debug("Processing cron trigger: %s" % t)
-            # Setup admin context before schedule triggers.
-            ctx = security.create_context(t.trust_id, t.project_id)
-            auth_ctx.set_ctx(ctx)
+        batch_size = cfg.CONF.cron_trigger.batch_size
 
-            LOG.debug("Cron trigger security context: %s" % ctx)
+        pool = eventlet.GreenPool(cfg.CONF.cron_trigger.fire_concurrency)
 
-            try:
-                rpc.get_engine_client().start_workflow(
-                    t.workflow.name,
-                    t.workflow_input
-                )
-            finally:
+        while True:
+            due_time = datetime.datetime.now() + datetime.timedelta(0, 2)
+
+            cron_triggers = triggers.get_next_cron_triggers(
+                due_time,
+                limit=batch_size
+            )
+
+            for t in self._claim_cron_triggers(cron_triggers, due_time):
+                fire_count = _get_fire_count(t, due_time)
+
+                if fire_count:
+                    pool.spawn_n(self._fire_cron_trigger, t, fire_count)
+
+            if len(cron_triggers) < batch_size:
+                break
+
+        pool.waitall()
+
+    @staticmethod
+    def _claim_cron_triggers(cron_triggers, due_time):
+        """Moves next execution time of due cron triggers forward.
+
+        Triggers are claimed before their workflows are started so that
+        several processes never start the same workflows. Workflows of a
+        trigger are therefore started at most once per execution time:
+        if the process stops after claiming a trigger its workflows
+        aren't started until the next execution time.
+
+        :return: List of claimed cron triggers.
+        """
+        claimed = []
+
+        with db_api_v2.transaction():
+            for t in cron_triggers:
                 next_time = triggers.get_next_execution_time(
                     t.pattern,
-                    t.next_execution_time
+                    due_time
                 )
 
-                db_api_v2.update_cron_trigger(
-                    t.name,
-                    {'next_execution_time': next_time}
-                )
+                if db_api_v2.claim_cron_trigger(
+                        t.id, t.next_execution_time, next_time):
+                    claimed.append(t)
+                else:
+                    LOG.debug(
+                        "Cron trigger has been processed by another"
+                        " process: %s" % t
+                    )
 
-                auth_ctx.set_ctx(None)
+        return claimed
+
+    @staticmethod
+    def _fire_cron_trigger(cron_trigger, fire_count):
+        LOG.debug("Processing cron trigger: %s" % cron_trigger)
+
+        try:
+            # Setup admin context before schedule triggers.
+            ctx = security.create_context(
+                cron_trigger.trust_id,
+                cron_trigger.project_id
+            )
+
+            auth_ctx.set_ctx(ctx)
+
+            LOG.debug("Cron trigger security context: %s" % ctx)
+
+            for _ in range(fire_count):
+                rpc.get_engine_client().start_workflow(
+                    cron_trigger.workflow.name,
+                    cron_trigger.workflow_input
+                )
+        except Exception as e:
+            LOG.exception(
+                "Failed to process cron trigger [name=%s]: %s"
+                % (cron_trigger.name, e)
+            )
+        finally:
+            auth_ctx.set_ctx(None)
 
 
 def setup(transport):
@@ -14,18 +14,39 @@
 
 import copy
 import datetime
+import functools
+import heapq
+import threading
+import uuid
+
+import eventlet
+from eventlet import event
+from oslo.config import cfg
 
 from mistral import context
 from mistral.db.v2 import api as db_api
 from mistral import exceptions as exc
 from mistral.openstack.common import importutils
 from mistral.openstack.common import log
-from mistral.openstack.common import periodic_task
 from mistral.openstack.common import threadgroup
+from mistral.utils import cache
 
 
 LOG = log.getLogger(__name__)
 
+CLASS_CACHE_SIZE = 128
+
+# Factories, target methods and serializers are referenced by a small
+# number of class paths so there's no need to import them over and over.
+_CLASS_CACHE = cache.LRUCache(CLASS_CACHE_SIZE)
+
+# Scheduler running in this process, if any.
+_scheduler = None
+
+
+def _import_class(path):
+    return _CLASS_CACHE.get_or_create(path, importutils.import_class)
+
 
 def schedule_call(factory_method_path, target_method_name,
                   run_after, serializers=None, **method_args):
@@ -58,7 +79,7 @@ def schedule_call(factory_method_path, target_method_name,
                                            " not found in method_args=%s"
                                            % (arg_name, method_args))
             try:
-                serializer = importutils.import_class(serializer_path)()
+                serializer = _import_class(serializer_path)()
             except ImportError as e:
                 raise ImportError("Cannot import class %s: %s"
                                   % (serializer_path, e))
@@ -76,61 +97,215 @@ def schedule_call(factory_method_path, target_method_name,
         'method_arguments': method_args
     }
 
-    db_api.create_delayed_call(values)
+    call = db_api.create_delayed_call(values)
+
+    scheduler = _scheduler
+
+    if scheduler:
+        # The call can't be claimed until its DB record is visible.
+        db_api.after_commit(
+            functools.partial(scheduler.add_timer, call.id, execution_time)
+        )
+
+
+class CallScheduler(object):
+    """Runs delayed calls that are due.
+
+    Calls scheduled in this process are kept in an in-memory timer heap
+    and run at their due time. The database remains the durable store of
+    calls: it is checked every [scheduler]/reconcile_interval seconds for
+    calls that are due (e.g. left by a process that died) or upcoming
+    calls scheduled by other processes. Calls scheduled by processes
+    that don't run a scheduler may therefore run up to reconcile_interval
+    seconds late.
+
+    Due calls are claimed in batches for a limited lease time so that
+    several schedulers working with the same database never run the same
+    call. The lease of each call is renewed right before it runs, calls
+    claimed by another scheduler meanwhile are skipped. Calls claimed by
+    a scheduler that crashed are picked up by others once their lease
+    expires.
+    """
+
+    def __init__(self):
+        self._id = str(uuid.uuid4())
+
+        # Heap of (execution_time, call_id) tuples.
+        self._timers = []
+        self._timer_ids = set()
+        self._lock = threading.Lock()
+
+        self._wakeup = event.Event()
+
+        # Time of the next check of the database, None if it's due.
+        self._next_reconcile = None
+
+    def add_timer(self, call_id, execution_time):
+        with self._lock:
+            if call_id in self._timer_ids:
+                return
+
+            heapq.heappush(self._timers, (execution_time, call_id))
+
+            self._timer_ids.add(call_id)
+
+        if not self._wakeup.ready():
+            self._wakeup.send()
+
+    def loop(self):
+        while True:
+            self._wakeup = event.Event()
+
+            wakeup_time = self.run_due_calls(datetime.datetime.now())
+
+            timeout = (wakeup_time - datetime.datetime.now()).total_seconds()
+
+            if timeout > 0:
+                with eventlet.Timeout(timeout, False):
+                    self._wakeup.wait()
+
+    def run_due_calls(self, now):
+        """Runs calls that are due at the given time.
+
+        :param now: Current time.
+        :return: Time when calls need to be checked next time.
+        """
+        try:
+            if not self._next_reconcile or now >= self._next_reconcile:
+                interval = datetime.timedelta(
+                    seconds=cfg.CONF.scheduler.reconcile_interval
+                )
+
+                self._reconcile(now, now + interval)
 
+                self._next_reconcile = now + interval
+            elif self._pop_due_timers(now):
+                self.run_delayed_calls(now)
+        except Exception as e:
+            LOG.exception("Failed to run delayed calls: %s" % e)
 
-class CallScheduler(periodic_task.PeriodicTasks):
-    @periodic_task.periodic_task(spacing=1)
-    def run_delayed_calls(self, ctx=None):
+        return min([self._next_reconcile] + [t for t, _ in self._timers[:1]])
 
-        datetime_filter = (datetime.datetime.now() +
-                           datetime.timedelta(seconds=1))
-        delayed_calls = db_api.get_delayed_calls_to_start(datetime_filter)
+    def run_delayed_calls(self, now=None):
+        batch_size = cfg.CONF.scheduler.batch_size
 
-        for call in delayed_calls:
-            LOG.debug('Processing next delayed call: %s', call)
+        while True:
+            delayed_calls = self._claim_delayed_calls(
+                batch_size,
+                now or datetime.datetime.now()
+            )
+
+            for call in delayed_calls:
+                # The whole batch is claimed at once so the lease of calls
+                # at the end of the batch may expire while others run.
+                if not self._renew_lease(call):
+                    LOG.debug(
+                        'Delayed call was claimed by another scheduler: %s',
+                        call
+                    )
+
+                    continue
+
+                self._run_delayed_call(call)
+
+                # Delete the call right away so that it doesn't run again
+                # if the scheduler stops before the whole batch is done.
+                db_api.delete_delayed_calls([call.id])
+
+            if len(delayed_calls) < batch_size:
+                break
+
+    def _reconcile(self, now, time):
+        self._pop_due_timers(now)
+
+        self.run_delayed_calls(now)
+
+        # Calls scheduled by other processes get into the heap so that
+        # they run in time as well. Calls that don't fit into the batch
+        # get there with one of the next reconciliations.
+        calls = db_api.get_delayed_calls_to_start(
+            time,
+            cfg.CONF.scheduler.batch_size
+        )
+
+        for call in calls:
+            self.add_timer(call.id, call.execution_time)
+
+    def _pop_due_timers(self, time):
+        popped = False
+
+        with self._lock:
+            # Calls are claimed if they're due before the given time.
+            while self._timers and self._timers[0][0] < time:
+                _, call_id = heapq.heappop(self._timers)
+
+                self._timer_ids.discard(call_id)
+
+                popped = True
+
+        return popped
+
+    def _claim_delayed_calls(self, batch_size, now):
+        return db_api.claim_delayed_calls(
+            self._id,
+            now,
+            now + datetime.timedelta(seconds=cfg.CONF.scheduler.lease_time),
+            batch_size
+        )
+
+    def _renew_lease(self, call):
+        return db_api.renew_delayed_call_lease(
+            call.id,
+            self._id,
+            datetime.datetime.now() +
+            datetime.timedelta(seconds=cfg.CONF.scheduler.lease_time)
+        )
+
+    @staticmethod
+    def _run_delayed_call(call):
+        LOG.debug('Processing next delayed call: %s', call)
+
+        try:
             context.set_ctx(context.MistralContext(call.auth_context))
 
             if call.factory_method_path:
-                factory = importutils.import_class(call.factory_method_path)
+                factory = _import_class(call.factory_method_path)
 
                 target_method = getattr(factory(), call.target_method_name)
             else:
-                target_method = importutils.import_class(
-                    call.target_method_name
-                )
+                target_method = _import_class(call.target_method_name)
 
             method_args = copy.copy(call.method_arguments)
 
             if call.serializers:
                 # Deserialize arguments.
                 for arg_name, serializer_path in call.serializers.items():
-                    serializer = importutils.import_class(serializer_path)()
+                    serializer = _import_class(serializer_path)()
 
                     deserialized = serializer.deserialize(
                         method_args[arg_name])
 
                     method_args[arg_name] = deserialized
-            try:
-                # Call the method.
-                target_method(**method_args)
-            except Exception as e:
-                LOG.debug(
-                    "Delayed call failed [call=%s, exception=%s]", call, e
-                )
-            finally:
-                # After call, delete this delayed call from DB.
-                db_api.delete_delayed_call(call.id)
+
+            # Call the method.
+            target_method(**method_args)
+        except Exception as e:
+            LOG.debug(
+                "Delayed call failed [call=%s, exception=%s]", call, e
+            )
+
+
+def clear_caches():
+    _CLASS_CACHE.clear()
 
 
 def setup():
+    global _scheduler
+
+    _scheduler = CallScheduler()
+
     tg = threadgroup.ThreadGroup()
 
-    tg.add_dynamic_timer(
-        CallScheduler().run_periodic_tasks,
-        initial_delay=None,
-        periodic_interval_max=1,
-        context=None
-    )
+    tg.add_thread(_scheduler.loop)
 
     return tg
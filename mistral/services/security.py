@@ -65,12 +65,12 @@ def create_context(trust_id, project_id):
         return
 
     if CONF.pecan.auth_enable:
-        client = keystone.client_for_trusts(trust_id)
+        token = keystone.get_trust_token(trust_id)
 
         return auth_ctx.MistralContext(
-            user_id=client.user_id,
+            user_id=token.user_id,
             project_id=project_id,
-            auth_token=client.auth_token,
+            auth_token=token.auth_token,
             is_trust_scoped=True,
         )
 
@@ -89,6 +89,8 @@ def delete_trust(workbook):
     keystone_client = keystone.client_for_trusts(workbook.trust_id)
     keystone_client.trusts.delete(workbook.trust_id)
 
+    keystone.forget_trust_token(workbook.trust_id)
+
 
 def add_trust_id(secure_object_values):
     if cfg.CONF.pecan.auth_enable:
@@ -25,6 +25,28 @@ def get_next_execution_time(pattern, start_time):
     return croniter(pattern, start_time).get_next(datetime.datetime)
 
 
+def get_due_execution_times(pattern, first_time, due_time, limit=None):
+    """Returns execution times of a trigger that are due by the given time.
+
+    :param pattern: Cron pattern of the trigger.
+    :param first_time: Earliest execution time that hasn't been processed.
+    :param due_time: Execution times earlier than this one are due.
+    :param limit: Maximum number of execution times to return.
+    :return: List of execution times in ascending order.
+    """
+    itr = croniter(pattern, first_time)
+
+    times = []
+    next_time = first_time
+
+    while next_time < due_time and (limit is None or len(times) < limit):
+        times.append(next_time)
+
+        next_time = itr.get_next(datetime.datetime)
+
+    return times
+
+
 # Triggers v1.
 
 def get_next_triggers_v1():
@@ -74,10 +96,11 @@ def create_associated_triggers(db_workbook):
 
 # Triggers v2.
 
-def get_next_cron_triggers():
-    return db_api_v2.get_next_cron_triggers(
-        datetime.datetime.now() + datetime.timedelta(0, 2)
-    )
+def get_next_cron_triggers(due_time=None, limit=None):
+    if not due_time:
+        due_time = datetime.datetime.now() + datetime.timedelta(0, 2)
+
+    return db_api_v2.get_next_cron_triggers(due_time, limit=limit)
 
 
 def create_cron_trigger(name, pattern, workflow_name, workflow_input,
@@ -61,6 +61,12 @@ def update_workflows(definition, scope='private'):
 
 
 def _get_workflow_values(wf_spec, definition, scope):
+    # Compile expression templates once while the workflow is uploaded
+    # so that they're ready when the specification gets used at runtime.
+    wf_spec.compile_templates()
+
+    spec_parser.cache_workflow_spec(wf_spec)
+
     values = {
         'name': wf_spec.get_name(),
         'tags': wf_spec.get_tags(),
@@ -34,6 +34,7 @@ from mistral.engine import executor
 from mistral.openstack.common import log as logging
 from mistral.services import action_manager
 from mistral import version
+from mistral.workbook import parser as spec_parser
 
 RESOURCES_PATH = 'tests/resources/'
 LOG = logging.getLogger(__name__)
@@ -230,6 +231,7 @@ class DbTestCase(BaseTest):
 
         self.addCleanup(auth_context.set_ctx, None)
         self.addCleanup(self._clean_db)
+        self.addCleanup(spec_parser.clear_caches)
 
     def is_db_session_open(self):
         return db_sa_base._get_thread_local_session() is not None
@@ -0,0 +1,173 @@
+# Copyright 2015 - Mirantis, Inc.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+"""Generators of workbooks used by the benchmark.
+
+Each generator takes a size, the meaning of which depends on the scenario,
+and returns a Scenario. All tasks run 'std.noop' so that the benchmark
+measures the engine rather than actions.
+"""
+
+import collections
+
+import yaml
+
+
+Scenario = collections.namedtuple(
+    'Scenario',
+    ['workbook', 'workflow_name', 'workflow_input', 'params']
+)
+
+
+def _workbook(name, workflows):
+    return yaml.safe_dump(
+        {'version': '2.0', 'name': name, 'workflows': workflows},
+        default_flow_style=False
+    )
+
+
+def linear(size):
+    """Direct workflow running 'size' tasks one after another."""
+    tasks = {}
+
+    for i in range(size):
+        task = {'action': 'std.noop'}
+
+        if i < size - 1:
+            task['on-success'] = ['task%s' % (i + 1)]
+
+        tasks['task%s' % i] = task
+
+    return Scenario(
+        _workbook('bench_linear', {'wf': {'type': 'direct', 'tasks': tasks}}),
+        'bench_linear.wf',
+        {},
+        {}
+    )
+
+
+def parallel(size):
+    """Direct workflow running 'size' tasks in parallel and joining them."""
+    branches = ['branch%s' % i for i in range(size)]
+
+    tasks = {
+        'start': {'action': 'std.noop', 'on-success': branches},
+        'join': {'action': 'std.noop', 'join': 'all'}
+    }
+
+    for name in branches:
+        tasks[name] = {'action': 'std.noop', 'on-success': ['join']}
+
+    return Scenario(
+        _workbook(
+            'bench_parallel',
+            {'wf': {'type': 'direct', 'tasks': tasks}}
+        ),
+        'bench_parallel.wf',
+        {},
+        {}
+    )
+
+
+def reverse(size):
+    """Reverse workflow with 'size' tasks forming a binary tree.
+
+    Each task requires its two children so all of them have to run before
+    the root task.
+    """
+    tasks = {}
+
+    for i in range(size):
+        task = {'action': 'std.noop'}
+
+        requires = [
+            'task%s' % c for c in (2 * i + 1, 2 * i + 2) if c < size
+        ]
+
+        if requires:
+            task['requires'] = requires
+
+        tasks['task%s' % i] = task
+
+    return Scenario(
+        _workbook(
+            'bench_reverse',
+            {'wf': {'type': 'reverse', 'tasks': tasks}}
+        ),
+        'bench_reverse.wf',
+        {},
+        {'task_name': 'task0'}
+    )
+
+
+def nested(size):
+    """Chain of 'size' workflows, each one calling the next as subworkflow."""
+    workflows = {}
+
+    for i in range(size):
+        task = (
+            {'workflow': 'wf%s' % (i + 1)} if i < size - 1
+            else {'action': 'std.noop'}
+        )
+
+        workflows['wf%s' % i] = {'type': 'direct', 'tasks': {'task': task}}
+
+    return Scenario(
+        _workbook('bench_nested', workflows),
+        'bench_nested.wf0',
+        {},
+        {}
+    )
+
+
+def with_items(size):
+    """Single task iterating over 'size' items."""
+    tasks = {
+        'task': {
+            'action': 'std.noop',
+            'with-items': 'i in <% $.items %>'
+        }
+    }
+
+    return Scenario(
+        _workbook(
+            'bench_with_items',
+            {'wf': {'type': 'direct', 'input': ['items'], 'tasks': tasks}}
+        ),
+        'bench_with_items.wf',
+        {'items': list(range(size))},
+        {}
+    )
+
+
+SCENARIOS = collections.OrderedDict([
+    ('linear', linear),
+    ('parallel', parallel),
+    ('reverse', reverse),
+    ('nested', nested),
+    ('with-items', with_items)
+])
+
+
+def get_scenario(name, size):
+    if name not in SCENARIOS:
+        raise ValueError(
+            "Unknown scenario: %s. Available scenarios: %s"
+            % (name, ', '.join(SCENARIOS))
+        )
+
+    if size < 1:
+        raise ValueError("Scenario size must be positive: %s" % size)
+
+    return SCENARIOS[name](size)
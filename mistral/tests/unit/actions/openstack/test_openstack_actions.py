@@ -16,6 +16,10 @@ import mock
 from oslotest import base
 
 from mistral.actions.openstack import actions
+from mistral.actions.openstack import base as os_base
+from mistral import context as auth_context
+from mistral.tests import base as tests_base
+from mistral.utils.openstack import keystone as keystone_utils
 
 
 class OpenStackActionTest(base.BaseTestCase):
@@ -90,3 +94,61 @@ class OpenStackActionTest(base.BaseTestCase):
 
         self.assertTrue(mocked().volumes.get.called)
         mocked().volumes.get.assert_called_once_with(volume="1234-abcd")
+
+
+class Unauthorized(Exception):
+    http_status = 401
+
+
+@mock.patch.object(
+    keystone_utils,
+    'get_endpoint_for_project',
+    mock.MagicMock(return_value=mock.MagicMock(url='http://nova'))
+)
+@mock.patch.object(actions.NovaAction, '_create_client')
+class OpenStackClientCacheTest(tests_base.BaseTest):
+    def setUp(self):
+        super(OpenStackClientCacheTest, self).setUp()
+
+        self._set_token('token1')
+
+        self.addCleanup(auth_context.set_ctx, None)
+        self.addCleanup(os_base.clear_client_cache)
+
+        actions.NovaAction.client_method_name = 'servers.get'
+
+    @staticmethod
+    def _set_token(token):
+        auth_context.set_ctx(
+            auth_context.MistralContext(
+                project_id='project',
+                auth_token=token
+            )
+        )
+
+    def test_client_reused_for_same_token(self, create_client):
+        actions.NovaAction(server='1').run()
+        actions.NovaAction(server='2').run()
+
+        self.assertEqual(1, create_client.call_count)
+
+        self._set_token('token2')
+
+        actions.NovaAction(server='1').run()
+
+        self.assertEqual(2, create_client.call_count)
+
+        stats = os_base.get_client_cache_stats()
+
+        self.assertEqual(1, stats['hits'])
+        self.assertEqual(2, stats['misses'])
+
+    def test_client_evicted_on_unauthorized(self, create_client):
+        create_client.return_value.servers.get.side_effect = Unauthorized()
+
+        action = actions.NovaAction(server='1')
+
+        self.assertRaises(Exception, action.run)
+        self.assertRaises(Exception, action.run)
+
+        self.assertEqual(2, create_client.call_count)
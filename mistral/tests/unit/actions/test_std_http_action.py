@@ -47,7 +47,7 @@ def get_fake_response():
 
 
 class HTTPActionTest(base.BaseTest):
-    @mock.patch.object(requests, "request")
+    @mock.patch.object(requests.Session, "request")
     def test_http_action(self, mocked_method):
         mocked_method.return_value = get_fake_response()
 
@@ -84,7 +84,7 @@ class HTTPActionTest(base.BaseTest):
             verify=None
         )
 
-    @mock.patch.object(requests, "request")
+    @mock.patch.object(requests.Session, "request")
     def test_http_action_with_auth(self, mocked_method):
         mocked_method.return_value = get_fake_response()
 
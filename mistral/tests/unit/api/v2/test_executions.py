@@ -179,3 +179,26 @@ class TestExecutionsController(base.FunctionalTest):
         self.assertEqual(resp.status_int, 200)
 
         self.assertEqual(len(resp.json['executions']), 0)
+
+    @mock.patch.object(db_api, 'get_workflow_executions', MOCK_WF_EXECUTIONS)
+    def test_get_all_paginated(self):
+        resp = self.app.get(
+            '/v2/executions?marker=123&limit=10&sort_keys=created_at,params'
+            '&sort_dirs=desc&fields=id,params&state=RUNNING'
+        )
+
+        self.assertEqual(resp.status_int, 200)
+
+        MOCK_WF_EXECUTIONS.assert_called_with(
+            marker='123',
+            limit=10,
+            sort_keys=['created_at', 'start_params'],
+            sort_dirs=['desc'],
+            fields=['id', 'start_params'],
+            state='RUNNING'
+        )
+
+    def test_get_all_invalid_limit(self):
+        resp = self.app.get('/v2/executions?limit=0', expect_errors=True)
+
+        self.assertEqual(resp.status_int, 400)
@@ -0,0 +1,169 @@
+# Copyright 2015 - Mirantis, Inc.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+import multiprocessing
+import os
+import shutil
+import tempfile
+
+import eventlet
+import mock
+from oslo.config import cfg
+
+from mistral import context as auth_context
+from mistral.db.sqlalchemy import base as db_sa_base
+from mistral.db.sqlalchemy import sqlite_lock
+from mistral.db.v2 import api as db_api
+from mistral.db.v2.sqlalchemy import models as db_models
+from mistral.tests import base as test_base
+
+
+WF_EXEC = {
+    'id': '1',
+    'spec': {},
+    'start_params': {},
+    'state': 'RUNNING',
+    'state_info': None,
+    'input': {},
+    'output': {},
+    'context': {'counter': 0},
+    'task_execution_id': None
+}
+
+PROCESS_COUNT = 4
+ITERATION_COUNT = 25
+
+
+def _increment_counter(ctx):
+    # Running in a forked process so a new DB engine is needed.
+    db_sa_base._facade = None
+
+    auth_context.set_ctx(ctx)
+
+    for _ in range(ITERATION_COUNT):
+        with db_api.transaction():
+            db_api.acquire_lock(db_models.WorkflowExecution, WF_EXEC['id'])
+
+            wf_ex = db_api.get_workflow_execution(WF_EXEC['id'])
+
+            context = dict(wf_ex.context)
+            context['counter'] += 1
+
+            # Give other processes a chance to interfere.
+            eventlet.sleep(0.001)
+
+            db_api.update_workflow_execution(
+                WF_EXEC['id'],
+                {'context': context}
+            )
+
+
+class SQLiteLockTest(test_base.BaseTest):
+    def test_lock_is_reentrant(self):
+        session = object()
+
+        sqlite_lock.acquire_lock('id1', session)
+        sqlite_lock.acquire_lock('id1', session)
+
+        sqlite_lock.release_locks(session)
+
+    def test_lock_blocks_other_session(self):
+        session1 = object()
+        session2 = object()
+        acquired = []
+
+        def _acquire():
+            sqlite_lock.acquire_lock('id1', session2)
+
+            acquired.append(True)
+
+            sqlite_lock.release_locks(session2)
+
+        sqlite_lock.acquire_lock('id1', session1)
+
+        thread = eventlet.spawn(_acquire)
+
+        eventlet.sleep(0.05)
+
+        self.assertEqual([], acquired)
+
+        sqlite_lock.release_locks(session1)
+
+        thread.wait()
+
+        self.assertEqual([True], acquired)
+
+
+class AcquireLockTest(test_base.DbTestCase):
+    @mock.patch.object(sqlite_lock, 'acquire_lock')
+    def test_lock_skipped_for_shared_connection(self, acquire_lock):
+        # Unit tests use in-memory SQLite served by a single connection.
+        self.assertTrue(db_sa_base.is_connection_shared())
+
+        with db_api.transaction():
+            db_api.acquire_lock(db_models.WorkflowExecution, WF_EXEC['id'])
+
+        self.assertFalse(acquire_lock.called)
+
+
+class LockingStressTest(test_base.DbTestCase):
+    """Checks that engines sharing one database file don't lose updates."""
+
+    def setUp(self):
+        super(LockingStressTest, self).setUp()
+
+        tmp_dir = tempfile.mkdtemp()
+
+        self.addCleanup(shutil.rmtree, tmp_dir)
+
+        self._switch_db('sqlite:///%s' % os.path.join(tmp_dir, 'test.db'))
+
+        db_api.setup_db()
+
+        db_api.create_workflow_execution(WF_EXEC)
+
+    def _switch_db(self, connection):
+        facade = db_sa_base._facade
+
+        def _restore():
+            db_sa_base._facade = facade
+
+            cfg.CONF.clear_override('connection', group='database')
+
+        self.addCleanup(_restore)
+
+        db_sa_base._facade = None
+
+        cfg.CONF.set_override('connection', connection, group='database')
+
+    def test_concurrent_updates(self):
+        processes = [
+            multiprocessing.Process(
+                target=_increment_counter,
+                args=(self.ctx,)
+            )
+            for _ in range(PROCESS_COUNT)
+        ]
+
+        [p.start() for p in processes]
+        [p.join() for p in processes]
+
+        self.assertEqual([0] * PROCESS_COUNT, [p.exitcode for p in processes])
+
+        wf_ex = db_api.get_workflow_execution(WF_EXEC['id'])
+
+        self.assertEqual(
+            PROCESS_COUNT * ITERATION_COUNT,
+            wf_ex.context['counter']
+        )
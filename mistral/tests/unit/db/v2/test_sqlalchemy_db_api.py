@@ -18,9 +18,12 @@
 import copy
 import datetime
 
+import mock
 from oslo.config import cfg
+from sqlalchemy import event
 
 from mistral import context as auth_context
+from mistral.db.sqlalchemy import base as db_sa_base
 from mistral.db.v2.sqlalchemy import api as db_api
 from mistral.db.v2.sqlalchemy import models as db_models
 from mistral import exceptions as exc
@@ -434,6 +437,56 @@ class WorkflowDefinitionTest(SQLAlchemyTest):
         self.assertIn("'name': 'my_wf1'", s)
 
 
+class SpecificationTest(SQLAlchemyTest):
+    def test_create_and_get_specification(self):
+        created = db_api.create_specification({'name': 'wf', 'tasks': {}})
+
+        self.assertEqual(64, len(created.hash))
+
+        fetched = db_api.get_specification(created.hash)
+
+        self.assertEqual(created.spec, fetched.spec)
+
+    def test_create_specification_twice(self):
+        created1 = db_api.create_specification({'name': 'wf', 'tasks': {}})
+        created2 = db_api.create_specification({'tasks': {}, 'name': 'wf'})
+
+        self.assertEqual(created1.hash, created2.hash)
+
+    def test_create_specification_concurrently(self):
+        spec = {'name': 'wf', 'tasks': {}}
+
+        created = db_api.create_specification(spec)
+
+        # Emulate another transaction storing the same specification
+        # after this one has checked it's not stored yet.
+        get_spec = mock.MagicMock(side_effect=[None, created])
+
+        with mock.patch.object(db_api, '_get_specification', get_spec):
+            with db_api.transaction():
+                spec_db = db_api.create_specification(spec)
+
+        self.assertEqual(created.hash, spec_db.hash)
+        self.assertEqual(2, get_spec.call_count)
+
+    def test_get_specification_not_found(self):
+        self.assertRaises(
+            exc.NotFoundException,
+            db_api.get_specification,
+            'not-existing-hash'
+        )
+
+    def test_workflow_definitions_share_specification(self):
+        spec = {'name': 'wf', 'tasks': {}}
+
+        wf1 = db_api.create_workflow_definition({'name': 'wf1', 'spec': spec})
+        wf2 = db_api.create_workflow_definition({'name': 'wf2', 'spec': spec})
+
+        self.assertIsNotNone(wf1.spec_hash)
+        self.assertEqual(wf1.spec_hash, wf2.spec_hash)
+        self.assertEqual(spec, db_api.get_specification(wf1.spec_hash).spec)
+
+
 ACTION_DEFINITIONS = [
     {
         'name': 'action1',
@@ -796,6 +849,55 @@ class WorkflowExecutionTest(SQLAlchemyTest):
         self.assertEqual(1, len(fetched))
         self.assertEqual(created0, fetched[0])
 
+    def test_get_workflow_executions_paginated(self):
+        created = [
+            db_api.create_workflow_execution(WF_EXECS[i % 2])
+            for i in range(5)
+        ]
+
+        ids = sorted(wf_ex.id for wf_ex in created)
+
+        page1 = db_api.get_workflow_executions(limit=2, sort_keys=['id'])
+        page2 = db_api.get_workflow_executions(
+            limit=2,
+            marker=page1[-1].id,
+            sort_keys=['id']
+        )
+
+        self.assertEqual(ids[:2], [wf_ex.id for wf_ex in page1])
+        self.assertEqual(ids[2:4], [wf_ex.id for wf_ex in page2])
+
+        fetched = db_api.get_workflow_executions(
+            sort_keys=['id'],
+            sort_dirs=['desc']
+        )
+
+        self.assertEqual(list(reversed(ids)), [wf_ex.id for wf_ex in fetched])
+
+        fetched = db_api.get_workflow_executions(state='RUNNING', limit=10)
+
+        self.assertEqual(2, len(fetched))
+
+    def test_get_workflow_executions_invalid_params(self):
+        self.assertRaises(
+            exc.InputException,
+            db_api.get_workflow_executions,
+            sort_keys=['not_a_column']
+        )
+
+        self.assertRaises(
+            exc.InputException,
+            db_api.get_workflow_executions,
+            sort_keys=['id'],
+            sort_dirs=['up']
+        )
+
+        self.assertRaises(
+            exc.NotFoundException,
+            db_api.get_workflow_executions,
+            marker='not-existing-id'
+        )
+
     def test_delete_workflow_execution(self):
         created = db_api.create_workflow_execution(WF_EXECS[0])
 
@@ -932,6 +1034,108 @@ class TaskExecutionTest(SQLAlchemyTest):
 
         self.assertIsNone(db_api.load_task_execution("not-existing-id"))
 
+    def test_task_execution_data_columns_deferred(self):
+        wf_ex = db_api.create_workflow_execution(WF_EXECS[0])
+
+        values = copy.copy(TASK_EXECS[1])
+        values.update({'workflow_execution_id': wf_ex.id})
+
+        created = db_api.create_task_execution(values)
+
+        fetched = db_api.get_task_execution(created.id).to_dict()
+
+        self.assertEqual({'vm_id': '343123'}, fetched['result'])
+
+        listed = db_api.get_task_executions()[0].to_dict()
+
+        self.assertEqual('my_task2', listed['name'])
+        self.assertNotIn('result', listed)
+        self.assertNotIn('in_context', listed)
+
+        listed = db_api.get_task_executions(fields=['result'])[0].to_dict()
+
+        self.assertEqual({'vm_id': '343123'}, listed['result'])
+        self.assertNotIn('in_context', listed)
+
+    def test_task_executions_listed_in_one_query(self):
+        wf_ex = db_api.create_workflow_execution(WF_EXECS[0])
+
+        for name in ('task1', 'task2', 'task3'):
+            values = copy.copy(TASK_EXECS[1])
+            values.update({'name': name, 'workflow_execution_id': wf_ex.id})
+
+            db_api.create_task_execution(values)
+
+        statements = []
+
+        def _on_statement(conn, cursor, statement, *args):
+            if 'executions_v2' in statement:
+                statements.append(statement)
+
+        engine = db_sa_base.get_engine()
+
+        event.listen(engine, 'before_cursor_execute', _on_statement)
+
+        try:
+            with db_api.transaction():
+                task_exs = db_api.get_task_executions()
+
+                names = [t.name for t in task_exs]
+        finally:
+            event.remove(engine, 'before_cursor_execute', _on_statement)
+
+        self.assertEqual(['task1', 'task2', 'task3'], sorted(names))
+
+        # Loading objects must not load their deferred data columns.
+        self.assertEqual(1, len(statements), statements)
+
+    def test_task_executions_of_workflow_loaded_with_data(self):
+        wf_ex = db_api.create_workflow_execution(WF_EXECS[0])
+
+        for name in ('task1', 'task2', 'task3'):
+            values = copy.copy(TASK_EXECS[1])
+            values.update({'name': name, 'workflow_execution_id': wf_ex.id})
+
+            db_api.create_task_execution(values)
+
+        statements = []
+
+        def _on_statement(conn, cursor, statement, *args):
+            if 'executions_v2' in statement:
+                statements.append(statement)
+
+        engine = db_sa_base.get_engine()
+
+        event.listen(engine, 'before_cursor_execute', _on_statement)
+
+        try:
+            with db_api.transaction():
+                wf_ex = db_api.get_workflow_execution(wf_ex.id)
+
+                results = [t.result for t in wf_ex.task_executions]
+        finally:
+            event.remove(engine, 'before_cursor_execute', _on_statement)
+
+        self.assertEqual(3, len(results))
+
+        # One query loads the workflow execution and one more loads its
+        # tasks along with their data.
+        self.assertEqual(2, len(statements), statements)
+
+    def test_task_execution_iteritems(self):
+        wf_ex = db_api.create_workflow_execution(WF_EXECS[0])
+
+        values = copy.copy(TASK_EXECS[1])
+        values.update({'workflow_execution_id': wf_ex.id})
+
+        db_api.create_task_execution(values)
+
+        items = dict(db_api.get_task_executions()[0].iteritems())
+
+        self.assertEqual('my_task2', items['name'])
+        self.assertIsInstance(items['created_at'], datetime.datetime)
+        self.assertNotIn('result', items)
+
     def test_action_executions(self):
         # Store one task with two invocations.
         with db_api.transaction():
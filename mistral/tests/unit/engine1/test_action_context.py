@@ -66,7 +66,7 @@ class FakeResponse(object):
 class ActionContextTest(base.EngineTestCase):
 
     @mock.patch.object(
-        requests, 'request',
+        requests.Session, 'request',
         mock.MagicMock(return_value=FakeResponse('', 200, 'OK')))
     @mock.patch.object(
         std_actions.MistralHTTPAction, 'is_sync',
@@ -89,7 +89,7 @@ class ActionContextTest(base.EngineTestCase):
             'Mistral-Execution-Id': wf_ex.id
         }
 
-        requests.request.assert_called_with(
+        requests.Session.request.assert_called_with(
             'GET',
             'https://wiki.openstack.org/wiki/mistral',
             params=None,
@@ -114,7 +114,7 @@ class FakeResponse(object):
 class ActionDefaultTest(base.EngineTestCase):
 
     @mock.patch.object(
-        requests, 'request',
+        requests.Session, 'request',
         mock.MagicMock(return_value=FakeResponse('', 200, 'OK')))
     @mock.patch.object(
         std_actions.HTTPAction, 'is_sync',
@@ -131,7 +131,7 @@ class ActionDefaultTest(base.EngineTestCase):
         self.assertEqual(states.SUCCESS, wf_ex.state)
         self._assert_single_item(wf_ex.task_executions, name='task1')
 
-        requests.request.assert_called_with(
+        requests.Session.request.assert_called_with(
             'GET', 'https://api.library.org/books',
             params=None, data=None, headers=None, cookies=None,
             allow_redirects=None, proxies=None, verify=None,
@@ -139,7 +139,7 @@ class ActionDefaultTest(base.EngineTestCase):
             timeout=ENV['__actions']['std.http']['timeout'])
 
     @mock.patch.object(
-        requests, 'request',
+        requests.Session, 'request',
         mock.MagicMock(return_value=FakeResponse('', 200, 'OK')))
     @mock.patch.object(
         std_actions.HTTPAction, 'is_sync',
@@ -156,7 +156,7 @@ class ActionDefaultTest(base.EngineTestCase):
         self.assertEqual(states.SUCCESS, wf_ex.state)
         self._assert_single_item(wf_ex.task_executions, name='task1')
 
-        requests.request.assert_called_with(
+        requests.Session.request.assert_called_with(
             'GET', 'https://api.library.org/books',
             params=None, data=None, headers=None, cookies=None,
             allow_redirects=None, proxies=None, verify=None,
@@ -165,7 +165,7 @@ class ActionDefaultTest(base.EngineTestCase):
         )
 
     @mock.patch.object(
-        requests, 'request',
+        requests.Session, 'request',
         mock.MagicMock(return_value=FakeResponse('', 200, 'OK')))
     @mock.patch.object(
         std_actions.HTTPAction, 'is_sync',
@@ -200,10 +200,10 @@ class ActionDefaultTest(base.EngineTestCase):
                            timeout=ENV['__actions']['std.http']['timeout'])
                  for url in wf_input['links']]
 
-        requests.request.assert_has_calls(calls, any_order=True)
+        requests.Session.request.assert_has_calls(calls, any_order=True)
 
     @mock.patch.object(
-        requests, 'request',
+        requests.Session, 'request',
         mock.MagicMock(return_value=FakeResponse('', 200, 'OK')))
     @mock.patch.object(
         std_actions.HTTPAction, 'is_sync',
@@ -238,4 +238,4 @@ class ActionDefaultTest(base.EngineTestCase):
                            timeout=60)
                  for url in wf_input['links']]
 
-        requests.request.assert_has_calls(calls, any_order=True)
+        requests.Session.request.assert_has_calls(calls, any_order=True)
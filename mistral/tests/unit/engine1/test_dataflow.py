@@ -18,6 +18,7 @@ from oslo.config import cfg
 
 from mistral.db.v2 import api as db_api
 from mistral.db.v2.sqlalchemy import models
+from mistral import expressions as expr
 from mistral.openstack.common import log as logging
 from mistral.services import workflows as wf_service
 from mistral.tests import base as test_base
@@ -395,7 +396,9 @@ class DataFlowTest(test_base.BaseTest):
         task_ex = models.TaskExecution(name='task1')
 
         task_spec = mock.MagicMock()
-        task_spec.get_publish = mock.MagicMock(return_value=publish_dict)
+        task_spec.get_publish_template = mock.MagicMock(
+            return_value=expr.compile_template(publish_dict)
+        )
 
         res = data_flow.evaluate_task_result(
             task_ex,
@@ -430,7 +433,9 @@ class DataFlowTest(test_base.BaseTest):
         task_ex.in_context = in_context
 
         task_spec = mock.MagicMock()
-        task_spec.get_publish = mock.MagicMock(return_value=publish)
+        task_spec.get_publish_template = mock.MagicMock(
+            return_value=expr.compile_template(publish)
+        )
 
         res = data_flow.evaluate_task_result(
             task_ex,
@@ -462,7 +467,9 @@ class DataFlowTest(test_base.BaseTest):
         task_ex = models.TaskExecution(name='task1')
 
         task_spec = mock.MagicMock()
-        task_spec.get_publish = mock.MagicMock(return_value=publish)
+        task_spec.get_publish_template = mock.MagicMock(
+            return_value=expr.compile_template(publish)
+        )
 
         res = data_flow.evaluate_task_result(
             task_ex,
@@ -24,9 +24,11 @@ from mistral.db.v2 import api as db_api
 from mistral.db.v2.sqlalchemy import models
 from mistral.engine1 import default_engine as d_eng
 from mistral import exceptions as exc
+from mistral import expressions as expr
 from mistral.openstack.common import log as logging
 from mistral.services import workbooks as wb_service
 from mistral.tests import base
+from mistral.workbook import parser as spec_parser
 from mistral.workflow import states
 from mistral.workflow import utils as wf_utils
 
@@ -117,6 +119,13 @@ class DefaultEngineTest(base.DbTestCase):
         self.assertEqual(states.RUNNING, wf_ex.state)
         self._assert_dict_contains_subset(wf_input, wf_ex.context)
         self.assertIn('__execution', wf_ex.context)
+        self.assertNotIn('spec', wf_ex.context['__execution'])
+
+        # Specification is loaded by its hash when expressions need it.
+        self.assertEqual(
+            'wf1',
+            expr.evaluate('<% $.__execution.spec.name %>', wf_ex.context)
+        )
 
         # Note: We need to reread execution to access related tasks.
         wf_ex = db_api.get_workflow_execution(wf_ex.id)
@@ -128,7 +137,12 @@ class DefaultEngineTest(base.DbTestCase):
         self.assertEqual('wb.wf1', task_ex.workflow_name)
         self.assertEqual('task1', task_ex.name)
         self.assertEqual(states.RUNNING, task_ex.state)
-        self.assertIsNotNone(task_ex.spec)
+        self.assertIsNone(task_ex.spec)
+        self.assertEqual(wf_ex.spec_hash, task_ex.spec_hash)
+        self.assertEqual(
+            'task1',
+            spec_parser.get_task_spec_by_execution(task_ex).get_name()
+        )
         self.assertDictEqual({}, task_ex.runtime_context)
 
         # Data Flow properties.
@@ -234,7 +248,7 @@ class DefaultEngineTest(base.DbTestCase):
 
         self.assertEqual('task1', task_ex.name)
         self.assertEqual(states.RUNNING, task_ex.state)
-        self.assertIsNotNone(task_ex.spec)
+        self.assertIsNotNone(task_ex.spec_hash)
         self.assertDictEqual({}, task_ex.runtime_context)
         self._assert_dict_contains_subset(wf_input, task_ex.in_context)
         self.assertIn('__execution', task_ex.in_context)
@@ -298,6 +312,66 @@ class DefaultEngineTest(base.DbTestCase):
         self._assert_single_item(wf_ex.task_executions, name='task1')
         self._assert_single_item(wf_ex.task_executions, name='task2')
 
+    def test_on_task_results(self):
+        wf_input = {'param1': 'Hey', 'param2': 'Hi'}
+
+        wf_ex1 = self.engine.start_workflow(
+            'wb.wf1',
+            wf_input,
+            task_name='task1'
+        )
+        wf_ex2 = self.engine.start_workflow(
+            'wb.wf1',
+            wf_input,
+            task_name='task1'
+        )
+
+        task_ex1 = db_api.get_workflow_execution(wf_ex1.id).task_executions[0]
+        task_ex2 = db_api.get_workflow_execution(wf_ex2.id).task_executions[0]
+
+        task_exs = self.engine.on_task_results([
+            (task_ex1.id, wf_utils.TaskResult(data='Hey')),
+            (task_ex2.id, wf_utils.TaskResult(error='Failed'))
+        ])
+
+        self.assertEqual(2, len(task_exs))
+        self.assertEqual(states.SUCCESS, task_exs[0].state)
+        self.assertEqual(states.ERROR, task_exs[1].state)
+
+        wf_ex1 = db_api.get_workflow_execution(wf_ex1.id)
+        wf_ex2 = db_api.get_workflow_execution(wf_ex2.id)
+
+        self.assertEqual(states.SUCCESS, wf_ex1.state)
+        self.assertEqual(states.ERROR, wf_ex2.state)
+
+    def test_on_task_results_sent_again(self):
+        wf_ex = self.engine.start_workflow(
+            'wb.wf1',
+            {'param1': 'Hey', 'param2': 'Hi'},
+            task_name='task2'
+        )
+
+        task_ex = db_api.get_workflow_execution(wf_ex.id).task_executions[0]
+
+        results = [(task_ex.id, wf_utils.TaskResult(data='Hey'))]
+
+        self.engine.on_task_results(results)
+
+        # Executor sends results one by one if it's not sure the batch
+        # has reached the engine.
+        with mock.patch.object(
+                d_eng.DefaultEngine,
+                '_after_task_complete') as after_task_complete:
+            task_ex = self.engine.on_task_result(*results[0])
+
+        self.assertFalse(after_task_complete.called)
+        self.assertEqual(states.SUCCESS, task_ex.state)
+
+        wf_ex = db_api.get_workflow_execution(wf_ex.id)
+
+        self.assertEqual(states.RUNNING, wf_ex.state)
+        self.assertEqual(2, len(wf_ex.task_executions))
+
     def test_stop_workflow_fail(self):
         # Start workflow.
         wf_ex = self.engine.start_workflow(
@@ -0,0 +1,157 @@
+# Copyright 2015 - Mirantis, Inc.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+import eventlet
+import mock
+from oslo.config import cfg
+
+from mistral.engine1 import default_executor
+from mistral import exceptions as exc
+from mistral.tests import base
+from mistral.workflow import utils as wf_utils
+
+
+ECHO_ACTION = 'mistral.actions.std_actions.EchoAction'
+
+
+class TaskResultBufferTest(base.BaseTest):
+    def setUp(self):
+        super(TaskResultBufferTest, self).setUp()
+
+        self.engine_client = mock.MagicMock()
+
+    def test_flush_on_max_size(self):
+        buf = default_executor.TaskResultBuffer(self.engine_client, 2, 10)
+
+        res1 = wf_utils.TaskResult(data='1')
+        res2 = wf_utils.TaskResult(data='2')
+
+        buf.add('task1', res1)
+
+        self.assertFalse(self.engine_client.on_task_results.called)
+
+        buf.add('task2', res2)
+
+        self.engine_client.on_task_results.assert_called_once_with(
+            [('task1', res1), ('task2', res2)]
+        )
+
+    def test_flush_on_max_latency(self):
+        buf = default_executor.TaskResultBuffer(self.engine_client, 10, 0.01)
+
+        res = wf_utils.TaskResult(data='1')
+
+        buf.add('task1', res)
+
+        self.assertFalse(self.engine_client.on_task_results.called)
+
+        eventlet.sleep(0.1)
+
+        self.engine_client.on_task_results.assert_called_once_with(
+            [('task1', res)]
+        )
+
+    def test_flush_empty(self):
+        buf = default_executor.TaskResultBuffer(self.engine_client, 10, 10)
+
+        buf.flush()
+
+        self.assertFalse(self.engine_client.on_task_results.called)
+
+    def test_flush_falls_back_to_single_results(self):
+        self.engine_client.on_task_results.side_effect = Exception('Boom')
+        self.engine_client.on_task_result.side_effect = [
+            Exception('Boom'),
+            None
+        ]
+
+        buf = default_executor.TaskResultBuffer(self.engine_client, 10, 10)
+
+        res1 = wf_utils.TaskResult(data='1')
+        res2 = wf_utils.TaskResult(data='2')
+
+        buf.add('task1', res1)
+        buf.add('task2', res2)
+
+        buf.flush()
+
+        self.assertEqual(
+            [mock.call('task1', res1), mock.call('task2', res2)],
+            self.engine_client.on_task_result.call_args_list
+        )
+
+
+class DefaultExecutorTest(base.BaseTest):
+    def setUp(self):
+        super(DefaultExecutorTest, self).setUp()
+
+        self.engine_client = mock.MagicMock()
+        self.executor = default_executor.DefaultExecutor(self.engine_client)
+
+    def _run_echo_action(self, mode):
+        cfg.CONF.set_override(
+            'action_run_modes',
+            {ECHO_ACTION: mode},
+            group='executor'
+        )
+
+        self.addCleanup(
+            cfg.CONF.clear_override,
+            'action_run_modes',
+            group='executor'
+        )
+
+        self.executor.run_action('task1', ECHO_ACTION, {}, {'output': 'Hi'})
+
+        self.engine_client.on_task_result.assert_called_once_with(
+            'task1',
+            wf_utils.TaskResult(data='Hi')
+        )
+
+    def test_run_action_in_thread(self):
+        self._run_echo_action('thread')
+
+    def test_run_action_in_process(self):
+        self._run_echo_action('process')
+
+        self.addCleanup(self.executor._get_pool('process').stop)
+
+    def test_js_max_heap_size_requires_process_mode(self):
+        cfg.CONF.set_override('js_max_heap_size', 64, group='executor')
+
+        self.addCleanup(
+            cfg.CONF.clear_override,
+            'js_max_heap_size',
+            group='executor'
+        )
+
+        self.assertRaises(
+            exc.MistralException,
+            default_executor.DefaultExecutor,
+            self.engine_client
+        )
+
+        cfg.CONF.set_override(
+            'action_run_modes',
+            {default_executor.JAVASCRIPT_ACTION: 'process'},
+            group='executor'
+        )
+
+        self.addCleanup(
+            cfg.CONF.clear_override,
+            'action_run_modes',
+            group='executor'
+        )
+
+        default_executor.DefaultExecutor(self.engine_client)
@@ -106,7 +106,12 @@ class DirectWorkflowEngineTest(base.EngineTestCase):
               action: std.echo wrong_input="Hahaha"
         """
         wf_ex = wf_ex = self._run_workflow(WORKFLOW_WRONG_TASK_INPUT)
-        task_ex2 = wf_ex.task_executions[1]
+
+        # Tasks of the workflow execution come in no particular order.
+        task_ex2 = self._assert_single_item(
+            wf_ex.task_executions,
+            name='task2'
+        )
 
         self.assertIn(
             "Failed to initialize action",
@@ -0,0 +1,69 @@
+# Copyright 2015 - Mirantis, Inc.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+import os
+
+from mistral.engine1 import pools
+from mistral import exceptions as exc
+from mistral.tests import base
+
+
+def _get_pid():
+    return os.getpid()
+
+
+def _fail(msg):
+    raise exc.ActionException(msg)
+
+
+class ThreadPoolTest(base.BaseTest):
+    def test_execute(self):
+        pool = pools.ThreadPool(10)
+
+        self.assertEqual(3, pool.execute(sum, [1, 2]))
+
+    def test_execute_error(self):
+        pool = pools.ThreadPool(10)
+
+        self.assertRaises(exc.ActionException, pool.execute, _fail, 'Error')
+
+
+class ProcessPoolTest(base.BaseTest):
+    def setUp(self):
+        super(ProcessPoolTest, self).setUp()
+
+        self.pool = pools.ProcessPool(1, 2, 10)
+
+        self.addCleanup(self.pool.stop)
+
+    def test_execute(self):
+        pid = self.pool.execute(_get_pid)
+
+        self.assertNotEqual(os.getpid(), pid)
+        self.assertEqual(3, self.pool.execute(sum, [1, 2]))
+
+    def test_execute_error(self):
+        self.assertRaises(
+            exc.ActionException,
+            self.pool.execute,
+            _fail,
+            'Error'
+        )
+
+    def test_worker_recycled(self):
+        pids = [self.pool.execute(_get_pid) for _ in range(4)]
+
+        self.assertEqual(pids[0], pids[1])
+        self.assertEqual(pids[2], pids[3])
+        self.assertNotEqual(pids[0], pids[2])
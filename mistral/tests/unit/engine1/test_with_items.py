@@ -14,7 +14,9 @@
 
 import copy
 
+import mock
 from oslo.config import cfg
+import requests
 
 from mistral.db.v2 import api as db_api
 from mistral.engine import states
@@ -120,6 +122,56 @@ workflows:
 """
 
 
+WORKBOOK_WITH_CONCURRENCY = """
+---
+version: "2.0"
+
+name: wb1
+
+workflows:
+  with_items:
+    type: direct
+
+    input:
+     - names_info
+
+    tasks:
+      task1:
+        with-items: name_info in <% $.names_info %>
+        action: std.async_noop
+        policies:
+          concurrency: 2
+
+"""
+
+
+WORKBOOK_WITH_RETRY = """
+---
+version: "2.0"
+
+name: wb1
+
+workflows:
+  with_items:
+    type: direct
+
+    input:
+     - names_info
+
+    tasks:
+      task1:
+        with-items: name_info in <% $.names_info %>
+        action: std.async_noop
+        publish:
+          result: <% $.task1 %>
+        policies:
+          retry:
+            count: 2
+            delay: 0
+
+"""
+
+
 WORKFLOW_INPUT = {
     'names_info': [
         {'name': 'John'},
@@ -138,6 +190,18 @@ WF_INPUT_URLS = {
 }
 
 
+def _get_running_iterations(task_ex_id):
+    action_exs = db_api.get_action_executions(
+        task_execution_id=task_ex_id,
+        state=states.RUNNING
+    )
+
+    return [
+        a_ex.id
+        for a_ex in sorted(action_exs, key=lambda a: a.iteration_index)
+    ]
+
+
 class WithItemsEngineTest(base.EngineTestCase):
     def test_with_items_simple(self):
         wb_service.create_workbook_v2(WORKBOOK)
@@ -158,6 +222,15 @@ class WithItemsEngineTest(base.EngineTestCase):
 
         self.assertEqual(3, with_items_context['count'])
         self.assertEqual(3, with_items_context['index'])
+        self.assertEqual(3, with_items_context['cursor'])
+
+        # Every iteration is stored as an action execution.
+        action_exs = db_api.get_action_executions(task_execution_id=task1.id)
+
+        self.assertEqual(
+            [0, 1, 2],
+            sorted(a_ex.iteration_index for a_ex in action_exs)
+        )
 
         # Since we know that we can receive results in random order,
         # check is not depend on order of items.
@@ -231,6 +304,12 @@ class WithItemsEngineTest(base.EngineTestCase):
         self.assertEqual(1, len(tasks))
         self.assertEqual(states.SUCCESS, task1.state)
 
+    @mock.patch.object(
+        requests.Session, 'request',
+        mock.MagicMock(
+            return_value=mock.MagicMock(status_code=200, headers={})
+        )
+    )
     def test_with_items_action_context(self):
         wb_service.create_workbook_v2(WORKBOOK_ACTION_CONTEXT)
 
@@ -242,9 +321,33 @@ class WithItemsEngineTest(base.EngineTestCase):
         wf_ex = db_api.get_workflow_execution(wf_ex.id)
         task_ex = wf_ex.task_executions[0]
 
-        self.engine.on_task_result(task_ex.id, wf_utils.TaskResult("Ivan"))
-        self.engine.on_task_result(task_ex.id, wf_utils.TaskResult("John"))
-        self.engine.on_task_result(task_ex.id, wf_utils.TaskResult("Mistral"))
+        iteration_ids = _get_running_iterations(task_ex.id)
+
+        self._await(lambda: requests.Session.request.call_count == 3)
+
+        # Every iteration tells its action execution id to the receiver
+        # of the request.
+        self.assertEqual(
+            sorted(iteration_ids),
+            sorted(
+                call[1]['headers']['Mistral-Action-Execution-Id']
+                for call in requests.Session.request.call_args_list
+            )
+        )
+
+        # Results are sent in order different from order of iterations.
+        self.engine.on_task_result(
+            iteration_ids[1],
+            wf_utils.TaskResult("John")
+        )
+        self.engine.on_task_result(
+            iteration_ids[0],
+            wf_utils.TaskResult("Ivan")
+        )
+        self.engine.on_task_result(
+            iteration_ids[2],
+            wf_utils.TaskResult("Mistral")
+        )
 
         self._await(
             lambda: self.is_execution_success(wf_ex.id),
@@ -258,8 +361,170 @@ class WithItemsEngineTest(base.EngineTestCase):
 
         self.assertTrue(isinstance(result, list))
 
-        self.assertIn('John', result)
-        self.assertIn('Ivan', result)
-        self.assertIn('Mistral', result)
+        self.assertEqual(['Ivan', 'John', 'Mistral'], result)
+        self.assertEqual(states.SUCCESS, task_ex.state)
+
+    def test_with_items_concurrency(self):
+        wb_service.create_workbook_v2(WORKBOOK_WITH_CONCURRENCY)
+
+        # Start workflow.
+        wf_ex = self.engine.start_workflow('wb1.with_items', WORKFLOW_INPUT)
+
+        wf_ex = db_api.get_workflow_execution(wf_ex.id)
+        task_ex = wf_ex.task_executions[0]
+
+        # Only two iterations are dispatched at once.
+        with_items_context = task_ex.runtime_context['with_items']
+
+        self.assertEqual(2, with_items_context['cursor'])
+        self.assertEqual(0, with_items_context['index'])
+
+        iteration_ids = _get_running_iterations(task_ex.id)
+
+        self.engine.on_task_result(
+            iteration_ids[0],
+            wf_utils.TaskResult("John")
+        )
+
+        task_ex = db_api.get_task_execution(task_ex.id)
+        with_items_context = task_ex.runtime_context['with_items']
+
+        self.assertEqual(3, with_items_context['cursor'])
+        self.assertEqual(1, with_items_context['index'])
+
+        iteration_ids = _get_running_iterations(task_ex.id)
 
+        self.engine.on_task_result(
+            iteration_ids[1],
+            wf_utils.TaskResult("Mistral")
+        )
+
+        # The only running iteration can be told by task id.
+        self.engine.on_task_result(task_ex.id, wf_utils.TaskResult("Ivan"))
+
+        self._await(
+            lambda: self.is_execution_success(wf_ex.id),
+        )
+
+        task_ex = db_api.get_task_execution(task_ex.id)
+        with_items_context = task_ex.runtime_context['with_items']
+
+        self.assertEqual(3, with_items_context['cursor'])
+        self.assertEqual(3, with_items_context['index'])
+        self.assertEqual(states.SUCCESS, task_ex.state)
+
+    def test_with_items_retry(self):
+        wb_service.create_workbook_v2(WORKBOOK_WITH_RETRY)
+
+        wf_input = {'names_info': WORKFLOW_INPUT['names_info'][:2]}
+
+        # Start workflow.
+        wf_ex = self.engine.start_workflow('wb1.with_items', wf_input)
+
+        wf_ex = db_api.get_workflow_execution(wf_ex.id)
+        task_ex = wf_ex.task_executions[0]
+
+        iteration_ids = _get_running_iterations(task_ex.id)
+
+        self.engine.on_task_result(
+            iteration_ids[0],
+            wf_utils.TaskResult(error="Failed")
+        )
+
+        task_ex = db_api.get_task_execution(task_ex.id)
+
+        self.assertEqual(states.RUNNING, task_ex.state)
+        self.assertEqual(0, task_ex.runtime_context['with_items']['index'])
+
+        # The failed iteration runs again with a new action execution.
+        iteration_ids = _get_running_iterations(task_ex.id)
+
+        self.assertEqual(2, len(iteration_ids))
+
+        self.engine.on_task_result(
+            iteration_ids[1],
+            wf_utils.TaskResult("Ivan")
+        )
+        self.engine.on_task_result(
+            iteration_ids[0],
+            wf_utils.TaskResult("John")
+        )
+
+        self._await(
+            lambda: self.is_execution_success(wf_ex.id),
+        )
+
+        task_ex = db_api.get_task_execution(task_ex.id)
+
+        # Only the failed iteration has run again.
+        action_exs = db_api.get_action_executions(
+            task_execution_id=task_ex.id
+        )
+
+        self.assertEqual(
+            [0, 0, 1],
+            sorted(a_ex.iteration_index for a_ex in action_exs)
+        )
+
+        self.assertEqual(['John', 'Ivan'], task_ex.result['result'])
         self.assertEqual(states.SUCCESS, task_ex.state)
+
+    def test_with_items_result_sent_with_task_id(self):
+        wb_service.create_workbook_v2(WORKBOOK_WITH_CONCURRENCY)
+
+        # Start workflow.
+        wf_ex = self.engine.start_workflow('wb1.with_items', WORKFLOW_INPUT)
+
+        wf_ex = db_api.get_workflow_execution(wf_ex.id)
+        task_ex = wf_ex.task_executions[0]
+
+        iteration_ids = _get_running_iterations(task_ex.id)
+
+        # Two iterations are running, the result is taken as a result
+        # of the oldest one.
+        self.engine.on_task_result(task_ex.id, wf_utils.TaskResult("John"))
+
+        action_ex = db_api.get_action_execution(iteration_ids[0])
+
+        self.assertEqual(states.SUCCESS, action_ex.state)
+        self.assertEqual({'result': 'John'}, action_ex.output)
+
+        task_ex = db_api.get_task_execution(task_ex.id)
+
+        self.assertEqual(states.RUNNING, task_ex.state)
+        self.assertEqual(1, task_ex.runtime_context['with_items']['index'])
+        self.assertEqual(
+            iteration_ids[1],
+            _get_running_iterations(task_ex.id)[0]
+        )
+
+    def test_with_items_error(self):
+        wb_service.create_workbook_v2(WORKBOOK_WITH_CONCURRENCY)
+
+        # Start workflow.
+        wf_ex = self.engine.start_workflow('wb1.with_items', WORKFLOW_INPUT)
+
+        wf_ex = db_api.get_workflow_execution(wf_ex.id)
+        task_ex = wf_ex.task_executions[0]
+
+        self.engine.on_task_result(
+            task_ex.id,
+            wf_utils.TaskResult(error="Failed to greet John")
+        )
+        self.engine.on_task_result(task_ex.id, wf_utils.TaskResult("Ivan"))
+        self.engine.on_task_result(
+            task_ex.id,
+            wf_utils.TaskResult("Mistral")
+        )
+
+        self._await(
+            lambda: self.is_execution_error(wf_ex.id),
+        )
+
+        wf_ex = db_api.get_workflow_execution(wf_ex.id)
+        task_ex = db_api.get_task_execution(task_ex.id)
+
+        # Error of the failed iteration is the error of the task.
+        self.assertEqual(states.ERROR, task_ex.state)
+        self.assertEqual('Failed to greet John', task_ex.result['error'])
+        self.assertIn('Failed to greet John', wf_ex.state_info)
@@ -15,6 +15,7 @@
 import datetime
 import eventlet
 import mock
+from oslo.config import cfg
 
 from mistral.db.v2 import api as db_api
 from mistral.services import scheduler
@@ -35,10 +36,34 @@ def factory_method():
     )
 
 
+def _delete_delayed_calls():
+    # Delayed calls aren't deleted along with other DB objects between
+    # tests, calls left by other tests would run along with the calls
+    # of the test.
+    calls = db_api.get_delayed_calls_to_start(datetime.datetime.max)
+
+    db_api.delete_delayed_calls([call.id for call in calls])
+
+
 class SchedulerServiceTest(base.DbTestCase):
     def setUp(self):
         super(SchedulerServiceTest, self).setUp()
 
+        # Target methods are patched by tests so they mustn't be cached.
+        self.addCleanup(scheduler.clear_caches)
+
+        # The database is checked often so that the tests cover both
+        # timers and checks of the database.
+        cfg.CONF.set_override('reconcile_interval', 0.1, group='scheduler')
+
+        self.addCleanup(
+            cfg.CONF.clear_override,
+            'reconcile_interval',
+            group='scheduler'
+        )
+
+        _delete_delayed_calls()
+
         self.thread_group = scheduler.setup()
 
         self.addCleanup(self.thread_group.stop)
@@ -157,3 +182,265 @@ class SchedulerServiceTest(base.DbTestCase):
         )
 
         self.assertEqual(0, len(calls))
+
+
+class CallSchedulerTest(base.DbTestCase):
+    """Tests of the scheduler run by the test itself at given times."""
+
+    def setUp(self):
+        super(CallSchedulerTest, self).setUp()
+
+        self.addCleanup(scheduler.clear_caches)
+
+        _delete_delayed_calls()
+
+        self.call_scheduler = scheduler.CallScheduler()
+
+        patcher = mock.patch.object(
+            scheduler,
+            '_scheduler',
+            self.call_scheduler
+        )
+
+        patcher.start()
+
+        self.addCleanup(patcher.stop)
+
+        # The first run checks the database, the next check is due in
+        # [scheduler]/reconcile_interval seconds.
+        self.call_scheduler.run_due_calls(datetime.datetime.now())
+
+    def _get_delayed_call(self):
+        calls = db_api.get_delayed_calls_to_start(datetime.datetime.max)
+
+        self.assertEqual(1, len(calls))
+
+        return calls[0]
+
+    @mock.patch(TARGET_METHOD_NAME)
+    def test_call_runs_when_due(self, method):
+        scheduler.schedule_call(None, TARGET_METHOD_NAME, 0.1, name='task')
+
+        due_time = self._get_delayed_call().execution_time
+
+        wakeup_time = self.call_scheduler.run_due_calls(
+            due_time - datetime.timedelta(seconds=0.05)
+        )
+
+        self.assertFalse(method.called)
+
+        # Scheduler wakes up when the call is due rather than at the next
+        # check of the database.
+        self.assertEqual(due_time, wakeup_time)
+
+        self.call_scheduler.run_due_calls(
+            due_time + datetime.timedelta(milliseconds=1)
+        )
+
+        method.assert_called_once_with(name='task')
+
+        self.assertEqual(
+            [],
+            db_api.get_delayed_calls_to_start(datetime.datetime.max)
+        )
+
+    @mock.patch(TARGET_METHOD_NAME)
+    def test_call_runs_once(self, method):
+        scheduler.schedule_call(None, TARGET_METHOD_NAME, 0, name='task')
+
+        run_time = (
+            self._get_delayed_call().execution_time +
+            datetime.timedelta(milliseconds=1)
+        )
+
+        # Emulate another scheduler running the call first.
+        scheduler.CallScheduler().run_delayed_calls(run_time)
+
+        self.call_scheduler.run_due_calls(run_time)
+
+        method.assert_called_once_with(name='task')
+
+    def test_call_scheduled_in_transaction(self):
+        with db_api.transaction():
+            scheduler.schedule_call(None, TARGET_METHOD_NAME, 0, name='task')
+
+            # The call can't be run before it's committed.
+            self.assertEqual([], self.call_scheduler._timers)
+
+        call = self._get_delayed_call()
+
+        self.assertEqual(
+            [(call.execution_time, call.id)],
+            self.call_scheduler._timers
+        )
+
+
+class ClaimDelayedCallsTest(base.DbTestCase):
+    def setUp(self):
+        super(ClaimDelayedCallsTest, self).setUp()
+
+        _delete_delayed_calls()
+
+    def _create_delayed_call(self, **values):
+        call = {
+            'factory_method_path': None,
+            'target_method_name': TARGET_METHOD_NAME,
+            'execution_time': datetime.datetime.now(),
+            'method_arguments': {}
+        }
+
+        call.update(values)
+
+        call = db_api.create_delayed_call(call)
+
+        self.addCleanup(db_api.delete_delayed_calls, [call.id])
+
+        return call
+
+    def test_claim_batch(self):
+        for _ in range(3):
+            self._create_delayed_call()
+
+        now = datetime.datetime.now()
+        time_filter = now + datetime.timedelta(seconds=1)
+        lease = now + datetime.timedelta(seconds=60)
+
+        claimed1 = db_api.claim_delayed_calls('s1', time_filter, lease, 2)
+        claimed2 = db_api.claim_delayed_calls('s2', time_filter, lease, 2)
+
+        self.assertEqual(2, len(claimed1))
+        self.assertEqual(1, len(claimed2))
+        self.assertEqual(
+            0,
+            len(db_api.claim_delayed_calls('s3', time_filter, lease, 2))
+        )
+
+        db_api.delete_delayed_calls([c.id for c in claimed1 + claimed2])
+
+        self.assertEqual(0, len(db_api.get_delayed_calls_to_start(lease)))
+
+    @mock.patch(TARGET_METHOD_NAME)
+    def test_calls_deleted_as_they_run(self, method):
+        self.addCleanup(scheduler.clear_caches)
+
+        for _ in range(2):
+            self._create_delayed_call()
+
+        time_filter = datetime.datetime.now() + datetime.timedelta(seconds=1)
+        left = []
+
+        method.side_effect = lambda: left.append(
+            len(db_api.get_delayed_calls_to_start(time_filter))
+        )
+
+        scheduler.CallScheduler().run_delayed_calls()
+
+        self.assertEqual([2, 1], left)
+        self.assertEqual(
+            0,
+            len(db_api.get_delayed_calls_to_start(time_filter))
+        )
+
+    def test_reconcile_bounded_by_batch_size(self):
+        cfg.CONF.set_override('batch_size', 1, group='scheduler')
+
+        self.addCleanup(
+            cfg.CONF.clear_override,
+            'batch_size',
+            group='scheduler'
+        )
+
+        now = datetime.datetime.now()
+
+        for i in range(2):
+            self._create_delayed_call(
+                execution_time=now + datetime.timedelta(seconds=5 + i)
+            )
+
+        call_scheduler = scheduler.CallScheduler()
+
+        call_scheduler._reconcile(now, now + datetime.timedelta(seconds=10))
+
+        self.assertEqual(1, len(call_scheduler._timers))
+
+    def test_claim_expired_lease(self):
+        now = datetime.datetime.now()
+
+        call = self._create_delayed_call(
+            scheduler_id='crashed',
+            lease_expiration=now - datetime.timedelta(seconds=1)
+        )
+
+        claimed = db_api.claim_delayed_calls(
+            's1',
+            now + datetime.timedelta(seconds=1),
+            now + datetime.timedelta(seconds=60),
+            10
+        )
+
+        self.assertEqual([call.id], [c.id for c in claimed])
+        self.assertEqual('s1', claimed[0].scheduler_id)
+
+    def test_renew_lease(self):
+        now = datetime.datetime.now()
+
+        call = self._create_delayed_call(
+            scheduler_id='s1',
+            lease_expiration=now - datetime.timedelta(seconds=1)
+        )
+
+        lease = now + datetime.timedelta(seconds=60)
+
+        self.assertTrue(db_api.renew_delayed_call_lease(call.id, 's1', lease))
+        self.assertFalse(
+            db_api.renew_delayed_call_lease(call.id, 's2', lease)
+        )
+
+        call = db_api.get_delayed_calls_to_start(lease)[0]
+
+        self.assertEqual('s1', call.scheduler_id)
+        self.assertEqual(lease, call.lease_expiration)
+
+    @mock.patch(TARGET_METHOD_NAME)
+    def test_call_claimed_by_another_scheduler_skipped(self, method):
+        self.addCleanup(scheduler.clear_caches)
+
+        for _ in range(2):
+            self._create_delayed_call()
+
+        time_filter = datetime.datetime.now() + datetime.timedelta(seconds=1)
+
+        def take_over_next_call():
+            # Lease of the rest of the batch expires while the first
+            # call runs and another scheduler claims the calls.
+            db_api.claim_delayed_calls(
+                's2',
+                time_filter,
+                datetime.datetime.now() + datetime.timedelta(seconds=60),
+                10
+            )
+
+        claimed = db_api.claim_delayed_calls(
+            's1',
+            time_filter,
+            datetime.datetime.now() - datetime.timedelta(seconds=1),
+            10
+        )
+
+        method.side_effect = take_over_next_call
+
+        call_scheduler = scheduler.CallScheduler()
+        call_scheduler._id = 's1'
+
+        with mock.patch.object(
+                call_scheduler,
+                '_claim_delayed_calls',
+                side_effect=[claimed, []]):
+            call_scheduler.run_delayed_calls(time_filter)
+
+        self.assertEqual(1, method.call_count)
+
+        calls = db_api.get_delayed_calls_to_start(time_filter)
+
+        self.assertEqual(1, len(calls))
+        self.assertEqual('s2', calls[0].scheduler_id)
@@ -14,6 +14,7 @@
 
 from oslo.config import cfg
 
+from mistral.db.v2 import api as db_api
 from mistral import exceptions as exc
 from mistral.openstack.common import log as logging
 from mistral.services import workflows as wf_service
@@ -143,3 +144,29 @@ class WorkflowServiceTest(base.DbTestCase):
         )
 
         self.assertIn("Invalid workflow definition", exception.message)
+
+    def test_workflow_spec_cache(self):
+        db_wfs = wf_service.create_workflows(WORKFLOW_LIST)
+
+        wf1_db = self._assert_single_item(db_wfs, name='wf1')
+
+        wf1_spec = spec_parser.get_workflow_spec_by_definition(wf1_db)
+
+        self.assertIs(
+            wf1_spec,
+            spec_parser.get_workflow_spec_by_definition(
+                db_api.get_workflow_definition('wf1')
+            )
+        )
+
+        wf_service.update_workflows(UPDATED_WORKFLOW_LIST)
+
+        updated_wf1_spec = spec_parser.get_workflow_spec_by_definition(
+            db_api.get_workflow_definition('wf1')
+        )
+
+        self.assertIsNot(wf1_spec, updated_wf1_spec)
+        self.assertListEqual(
+            ['param1', 'param2'],
+            updated_wf1_spec.get_input()
+        )
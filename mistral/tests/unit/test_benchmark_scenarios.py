@@ -0,0 +1,45 @@
+# Copyright 2015 - Mirantis, Inc.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+from mistral.tests.benchmark import scenarios
+from mistral.tests import base
+from mistral.workbook import parser as spec_parser
+
+
+class BenchmarkScenariosTest(base.BaseTest):
+    def test_scenarios_valid(self):
+        for name in scenarios.SCENARIOS:
+            scenario = scenarios.get_scenario(name, 5)
+
+            wb_spec = spec_parser.get_workbook_spec_from_yaml(
+                scenario.workbook
+            )
+
+            wf_name = scenario.workflow_name.split('.')[1]
+
+            self.assertIsNotNone(wb_spec.get_workflows()[wf_name])
+
+    def test_scenario_size(self):
+        scenario = scenarios.get_scenario('parallel', 10)
+
+        wf_spec = spec_parser.get_workbook_spec_from_yaml(
+            scenario.workbook
+        ).get_workflows()['wf']
+
+        # Start and join tasks besides the branches.
+        self.assertEqual(12, len(wf_spec.get_tasks()))
+
+    def test_unknown_scenario(self):
+        self.assertRaises(ValueError, scenarios.get_scenario, 'unknown', 1)
+        self.assertRaises(ValueError, scenarios.get_scenario, 'linear', 0)
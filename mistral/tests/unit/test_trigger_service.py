@@ -16,6 +16,8 @@ import datetime
 import mock
 from oslo.config import cfg
 
+from mistral.db.v2 import api as db_api
+from mistral.services import periodic
 from mistral.services import security
 from mistral.services import triggers as t_s
 from mistral.services import workflows
@@ -168,3 +170,85 @@ class TriggerServiceV2Test(base.DbTestCase):
         trigger_names = [t.name for t in t_s.get_next_cron_triggers()]
 
         self.assertEqual(trigger_names, ['test2', 'test1', 'test3'])
+
+    def test_get_due_execution_times(self):
+        due_times = t_s.get_due_execution_times(
+            '*/5 * * * *',
+            datetime.datetime(2010, 8, 25, 0, 5),
+            datetime.datetime(2010, 8, 25, 0, 15)
+        )
+
+        self.assertEqual(
+            [
+                datetime.datetime(2010, 8, 25, 0, 5),
+                datetime.datetime(2010, 8, 25, 0, 10)
+            ],
+            due_times
+        )
+
+        due_times = t_s.get_due_execution_times(
+            '*/5 * * * *',
+            datetime.datetime(2010, 8, 25, 0, 5),
+            datetime.datetime(2010, 8, 25, 0, 15),
+            limit=1
+        )
+
+        self.assertEqual([datetime.datetime(2010, 8, 25, 0, 5)], due_times)
+
+    def test_claim_cron_trigger(self):
+        trigger = t_s.create_cron_trigger(
+            'test',
+            '*/5 * * * *',
+            self.wf.name,
+            {},
+            datetime.datetime(2010, 8, 25)
+        )
+
+        claimed = periodic.MistralPeriodicTasks._claim_cron_triggers(
+            [trigger, trigger],
+            datetime.datetime(2010, 8, 25, 0, 7)
+        )
+
+        # The second attempt must fail since the trigger has moved on.
+        self.assertEqual([trigger], claimed)
+
+        trigger = db_api.get_cron_trigger('test')
+
+        self.assertEqual(
+            datetime.datetime(2010, 8, 25, 0, 10),
+            trigger.next_execution_time
+        )
+
+    def _get_fire_count(self, policy):
+        cfg.CONF.set_override('misfire_policy', policy, group='cron_trigger')
+
+        self.addCleanup(
+            cfg.CONF.clear_override,
+            'misfire_policy',
+            group='cron_trigger'
+        )
+
+        now = datetime.datetime.now().replace(second=0, microsecond=0)
+
+        # Three executions have been missed, one is on time.
+        trigger = t_s.create_cron_trigger(
+            'test',
+            '* * * * *',
+            self.wf.name,
+            {},
+            now - datetime.timedelta(minutes=4)
+        )
+
+        return periodic._get_fire_count(
+            trigger,
+            now + datetime.timedelta(seconds=2)
+        )
+
+    def test_misfire_policy_fire_once(self):
+        self.assertEqual(1, self._get_fire_count('fire-once'))
+
+    def test_misfire_policy_fire_all(self):
+        self.assertEqual(4, self._get_fire_count('fire-all'))
+
+    def test_misfire_policy_skip(self):
+        self.assertEqual(1, self._get_fire_count('skip'))
@@ -0,0 +1,90 @@
+# Copyright 2015 - Mirantis, Inc.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+import mock
+
+from mistral.tests import base
+from mistral.utils import cache
+
+
+class LRUCacheTest(base.BaseTest):
+    def test_get_put(self):
+        c = cache.LRUCache(2)
+
+        self.assertIsNone(c.get('a'))
+
+        c.put('a', 1)
+
+        self.assertEqual(1, c.get('a'))
+        self.assertEqual(
+            {
+                'size': 1,
+                'max_size': 2,
+                'hits': 1,
+                'misses': 1,
+                'evictions': 0,
+                'expirations': 0
+            },
+            c.get_stats()
+        )
+
+    def test_eviction(self):
+        c = cache.LRUCache(2)
+
+        c.put('a', 1)
+        c.put('b', 2)
+
+        # Makes 'a' the most recently used entry.
+        c.get('a')
+
+        c.put('c', 3)
+
+        self.assertIn('a', c)
+        self.assertNotIn('b', c)
+        self.assertIn('c', c)
+        self.assertEqual(1, c.get_stats()['evictions'])
+
+    def test_get_or_create(self):
+        c = cache.LRUCache(10)
+        calls = []
+
+        def factory(key):
+            calls.append(key)
+
+            return key * 2
+
+        self.assertEqual(4, c.get_or_create(2, factory))
+        self.assertEqual(4, c.get_or_create(2, factory))
+        self.assertEqual([2], calls)
+
+    def test_invalid_size(self):
+        self.assertRaises(ValueError, cache.LRUCache, 0)
+
+    @mock.patch('time.time')
+    def test_expiration(self, time_mock):
+        c = cache.LRUCache(2, ttl=10)
+
+        time_mock.return_value = 100
+
+        c.put('a', 1)
+
+        time_mock.return_value = 109
+
+        self.assertEqual(1, c.get('a'))
+
+        time_mock.return_value = 110
+
+        self.assertIsNone(c.get('a'))
+        self.assertNotIn('a', c)
+        self.assertEqual(1, c.get_stats()['expirations'])
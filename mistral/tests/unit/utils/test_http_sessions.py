@@ -0,0 +1,98 @@
+# Copyright 2015 - Mirantis, Inc.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+import mock
+import requests
+
+from mistral.tests import base
+from mistral.utils import http_sessions
+
+
+URL1 = 'http://host1/path'
+URL2 = 'http://host2/path'
+
+
+class SessionPoolTest(base.BaseTest):
+    def setUp(self):
+        super(SessionPoolTest, self).setUp()
+
+        self.pool = http_sessions.SessionPool(2, 60)
+
+        self.addCleanup(self.pool.close)
+
+    def test_session_reused(self):
+        with self.pool.session(URL1) as s1:
+            s1.cookies.set('name', 'value')
+
+        with self.pool.session(URL1 + '/other') as s2:
+            self.assertIs(s1, s2)
+            self.assertEqual(0, len(s2.cookies))
+
+        with self.pool.session(URL2) as s3:
+            self.assertIsNot(s1, s3)
+
+        with self.pool.session(URL1, verify=False) as s4:
+            self.assertIsNot(s1, s4)
+
+    def test_concurrent_sessions(self):
+        with self.pool.session(URL1) as s1:
+            with self.pool.session(URL1) as s2:
+                self.assertIsNot(s1, s2)
+
+    def test_reuse_disabled(self):
+        pool = http_sessions.SessionPool(0, 60)
+
+        with pool.session(URL1) as s1:
+            pass
+
+        with pool.session(URL1) as s2:
+            self.assertIsNot(s1, s2)
+
+    def test_session_not_reused_after_error(self):
+        def _fail():
+            with self.pool.session(URL1) as s:
+                raise ValueError(s)
+
+        self.assertRaises(ValueError, _fail)
+
+        self.assertEqual({}, dict(self.pool._idle))
+
+    @mock.patch.object(http_sessions.time, 'time')
+    def test_idle_sessions_evicted(self, time):
+        time.return_value = 0
+
+        pool = http_sessions.SessionPool(2, 10)
+
+        with pool.session(URL1) as s1:
+            pass
+
+        time.return_value = 20
+
+        with pool.session(URL2):
+            pass
+
+        with pool.session(URL1) as s2:
+            self.assertIsNot(s1, s2)
+
+    @mock.patch.object(requests.Session, 'request')
+    def test_stats(self, request):
+        self.pool.request('GET', URL1)
+        self.pool.request('GET', URL1)
+        self.pool.request('GET', URL2)
+
+        stats = self.pool.get_stats()
+
+        self.assertEqual(2, stats['host1']['requests'])
+        self.assertEqual(1, stats['host1']['idle_sessions'])
+        self.assertEqual(1, stats['host2']['requests'])
@@ -0,0 +1,114 @@
+# Copyright 2015 - Mirantis, Inc.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+import mock
+import testtools
+
+from mistral.tests import base
+from mistral.utils import javascript
+
+
+@mock.patch.object(javascript, '_V8Context', mock.MagicMock)
+class V8ContextPoolTest(base.BaseTest):
+    def test_context_reused(self):
+        pool = javascript._V8ContextPool(1)
+
+        ctx1 = pool.acquire()
+        ctx2 = pool.acquire()
+
+        self.assertIsNot(ctx1, ctx2)
+
+        pool.release(ctx1)
+        pool.release(ctx2)
+
+        self.assertIs(ctx1, pool.acquire())
+        self.assertIsNot(ctx2, pool.acquire())
+
+    def test_dirty_context_discarded(self):
+        pool = javascript._V8ContextPool(1)
+
+        ctx = pool.acquire()
+        ctx.reset.return_value = False
+
+        pool.release(ctx)
+
+        self.assertIsNot(ctx, pool.acquire())
+
+    def test_context_discarded_on_reset_error(self):
+        pool = javascript._V8ContextPool(1)
+
+        ctx = pool.acquire()
+        ctx.reset.side_effect = Exception('Terminated')
+
+        pool.release(ctx)
+
+        self.assertIsNot(ctx, pool.acquire())
+
+
+@mock.patch.object(javascript, '_PYV8')
+class TerminatorTest(base.BaseTest):
+    def test_not_terminated_after_finish(self, pyv8):
+        terminator = javascript._Terminator(10)
+
+        # Emulate the timer firing while the script is finishing.
+        terminator._timer = mock.MagicMock()
+        terminator._timer.cancel.side_effect = terminator._terminate
+
+        terminator.start()
+        terminator.finish()
+
+        self.assertFalse(terminator.terminated)
+        self.assertFalse(pyv8.JSEngine.terminateAllThreads.called)
+
+    def test_termination_consumed(self, pyv8):
+        terminator = javascript._Terminator(10)
+
+        terminator._terminate()
+        terminator.finish()
+
+        self.assertTrue(terminator.terminated)
+        self.assertTrue(pyv8.JSContext().eval.called)
+
+
+@testtools.skipIf(not javascript._PYV8, 'It requires installed PyV8.')
+class V8EvaluatorTest(base.BaseTest):
+    def setUp(self):
+        super(V8EvaluatorTest, self).setUp()
+
+        def _reset_pool():
+            javascript._CONTEXT_POOL = None
+
+        _reset_pool()
+
+        self.addCleanup(_reset_pool)
+
+    def test_globals_not_leaked(self):
+        javascript.evaluate('leaked = $.value; 1', {'value': 1})
+
+        self.assertEqual(
+            'undefined',
+            javascript.evaluate('typeof leaked', {})
+        )
+
+    def test_builtin_changes_not_leaked(self):
+        javascript.evaluate(
+            'Array.prototype.join = function () { return "x"; }; 1',
+            {}
+        )
+
+        self.assertEqual('1,2', javascript.evaluate('[1, 2].join(",")', {}))
+
+        javascript.evaluate('JSON.parse = function () { return 0; }; 1', {})
+
+        self.assertEqual(2, javascript.evaluate('$.value', {'value': 2}))
@@ -12,16 +12,37 @@
 #    See the License for the specific language governing permissions and
 #    limitations under the License.
 
+import eventlet
+import mock
+
 from mistral.tests import base
 from mistral.utils.openstack import keystone
 
 
+def _get_keystone_client(expiring=False):
+    cl = mock.MagicMock()
+
+    cl.auth_ref.will_expire_soon.return_value = expiring
+
+    nova = mock.MagicMock(id='nova_id', type='compute')
+    nova.name = 'nova'
+
+    cl.services.list.return_value = [nova]
+    cl.endpoints.list.return_value = [
+        mock.MagicMock(url='http://nova', region='RegionOne')
+    ]
+
+    return cl
+
+
 class KeystoneUtilsTest(base.BaseTest):
     def setUp(self):
         super(KeystoneUtilsTest, self).setUp()
 
         self.values = {'id': 'my_id'}
 
+        self.addCleanup(keystone.clear_caches)
+
     def test_format_url_dollar_sign(self):
         url_template = "http://host:port/v1/$(id)s"
 
@@ -41,3 +62,151 @@ class KeystoneUtilsTest(base.BaseTest):
             expected,
             keystone.format_url(url_template, self.values)
         )
+
+    @mock.patch.object(keystone, '_admin_client')
+    def test_get_endpoint_cached(self, admin_client):
+        cl = _get_keystone_client()
+        admin_client.return_value = cl
+
+        endpoint = keystone.get_endpoint_for_project('nova')
+
+        self.assertEqual('http://nova', endpoint.url)
+        self.assertIs(
+            endpoint,
+            keystone.get_endpoint_for_project('nova')
+        )
+        self.assertIs(
+            endpoint,
+            keystone.get_endpoint_for_project(service_type='compute')
+        )
+
+        self.assertEqual(1, admin_client.call_count)
+        self.assertEqual(2, cl.endpoints.list.call_count)
+
+        cl.endpoints.list.assert_called_with(
+            service='nova_id',
+            interface='public',
+            region=None
+        )
+
+        stats = keystone.get_endpoint_cache_stats()
+
+        self.assertEqual(1, stats['hits'])
+        self.assertEqual(2, stats['misses'])
+
+    @mock.patch.object(keystone, '_admin_client')
+    def test_get_endpoint_not_found(self, admin_client):
+        admin_client.return_value = _get_keystone_client()
+
+        self.assertRaises(
+            Exception,
+            keystone.get_endpoint_for_project,
+            'glance'
+        )
+
+        # Failed lookups aren't cached.
+        self.assertNotIn(
+            ('glance', None, None, 'public'),
+            keystone._get_endpoint_cache()
+        )
+
+    @mock.patch.object(keystone, '_admin_client')
+    def test_admin_client_reused_until_token_expiry(self, admin_client):
+        admin_client.return_value = _get_keystone_client()
+
+        cl = keystone.client_for_admin('admin')
+
+        self.assertIs(cl, keystone.client_for_admin('admin'))
+        self.assertEqual(1, admin_client.call_count)
+
+        cl.auth_ref.will_expire_soon.return_value = True
+        admin_client.return_value = _get_keystone_client()
+
+        self.assertIsNot(cl, keystone.client_for_admin('admin'))
+        self.assertEqual(2, admin_client.call_count)
+
+    @mock.patch.object(keystone, 'client_for_trusts')
+    def test_get_trust_token_cached(self, client_for_trusts):
+        client_for_trusts.return_value = _get_keystone_client()
+
+        token = keystone.get_trust_token('trust_id')
+
+        self.assertIs(token, keystone.get_trust_token('trust_id'))
+        self.assertEqual(1, client_for_trusts.call_count)
+
+        keystone.forget_trust_token('trust_id')
+        keystone.get_trust_token('trust_id')
+
+        self.assertEqual(2, client_for_trusts.call_count)
+
+    @mock.patch.object(keystone.eventlet, 'spawn_n')
+    @mock.patch.object(keystone, 'client_for_trusts')
+    def test_get_trust_token_refreshed(self, client_for_trusts, spawn_n):
+        cl = _get_keystone_client()
+        client_for_trusts.return_value = cl
+
+        token = keystone.get_trust_token('trust_id')
+
+        # Token expires within refresh time but not within expiry margin.
+        cl.auth_ref.will_expire_soon.side_effect = (
+            lambda stale_duration: stale_duration > 60
+        )
+
+        self.assertIs(token, keystone.get_trust_token('trust_id'))
+        self.assertIs(token, keystone.get_trust_token('trust_id'))
+
+        # Only one refresh is scheduled at a time.
+        spawn_n.assert_called_once_with(
+            keystone._refresh_trust_token,
+            'trust_id'
+        )
+
+        keystone._refresh_trust_token('trust_id')
+
+        self.assertEqual(2, client_for_trusts.call_count)
+        self.assertNotIn('trust_id', keystone._TRUST_REFRESHES)
+
+    @mock.patch.object(keystone, 'client_for_trusts')
+    def test_get_trust_token_expired(self, client_for_trusts):
+        client_for_trusts.return_value = _get_keystone_client(expiring=True)
+
+        keystone.get_trust_token('trust_id')
+        keystone.get_trust_token('trust_id')
+
+        self.assertEqual(2, client_for_trusts.call_count)
+
+    @mock.patch.object(keystone, 'client_for_trusts')
+    def test_trust_authenticated_by_one_call_at_once(self,
+                                                     client_for_trusts):
+        active = []
+        max_active = []
+
+        def _client_for_trusts(trust_id):
+            active.append(trust_id)
+            max_active.append(len(active))
+
+            eventlet.sleep(0.05)
+
+            active.remove(trust_id)
+
+            # Expiring tokens make every call authenticate the trust.
+            return _get_keystone_client(expiring=True)
+
+        client_for_trusts.side_effect = _client_for_trusts
+
+        pool = eventlet.GreenPool()
+
+        pool.spawn(keystone.get_trust_token, 'trust_id')
+        pool.spawn(keystone.get_trust_token, 'trust_id')
+
+        # Comes while the second call authenticates the trust after
+        # the first one has released the lock.
+        eventlet.sleep(0.07)
+
+        pool.spawn(keystone.get_trust_token, 'trust_id')
+
+        pool.waitall()
+
+        self.assertEqual(3, client_for_trusts.call_count)
+        self.assertEqual(1, max(max_active))
+        self.assertNotIn('trust_id', keystone._TRUST_AUTH_LOCKS)
@@ -0,0 +1,96 @@
+# Copyright 2015 - Mirantis, Inc.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+import socket
+
+import mock
+
+from mistral.tests import base
+from mistral.utils import metrics
+
+
+class MetricsTest(base.BaseTest):
+    def setUp(self):
+        super(MetricsTest, self).setUp()
+
+        self.sink = metrics.AggregatingSink()
+
+        metrics.set_sink(self.sink)
+
+        self.addCleanup(metrics.set_sink, None)
+
+    def test_no_sink(self):
+        metrics.set_sink(None)
+
+        self.assertIs(metrics._NOOP_TIMER, metrics.timer('phase'))
+
+        with metrics.timer('phase'):
+            pass
+
+        self.assertEqual({}, self.sink.get_histograms())
+
+    @mock.patch('time.time', mock.MagicMock(side_effect=[10, 10.02]))
+    def test_timer(self):
+        with metrics.timer('phase'):
+            pass
+
+        hist = self.sink.get_histograms()['phase']
+
+        self.assertEqual(1, hist.count)
+        self.assertAlmostEqual(0.02, hist.sum)
+
+        # Value falls into the bucket with bound 0.025.
+        self.assertEqual(1, hist.counts[metrics.BUCKETS.index(0.025)])
+
+    def test_timed(self):
+        @metrics.timed('func')
+        def func(a, b):
+            return a + b
+
+        self.assertEqual(3, func(1, 2))
+        self.assertRaises(TypeError, func, 1, 'a')
+
+        self.assertEqual(2, self.sink.get_histograms()['func'].count)
+
+    def test_prometheus_format(self):
+        sink = metrics.PrometheusSink()
+
+        sink.add('engine.db_load', 0.003)
+        sink.add('engine.db_load', 20)
+
+        text = sink.render()
+
+        self.assertIn(
+            'mistral_engine_db_load_seconds_bucket{le="0.005"} 1',
+            text
+        )
+        self.assertIn(
+            'mistral_engine_db_load_seconds_bucket{le="10.0"} 1',
+            text
+        )
+        self.assertIn(
+            'mistral_engine_db_load_seconds_bucket{le="+Inf"} 2',
+            text
+        )
+        self.assertIn('mistral_engine_db_load_seconds_count 2', text)
+
+    @mock.patch('eventlet.spawn_n')
+    @mock.patch(
+        'wsgiref.simple_server.make_server',
+        mock.MagicMock(side_effect=socket.error('Address already in use'))
+    )
+    def test_prometheus_port_taken(self, spawn_n):
+        metrics.PrometheusSink().start()
+
+        self.assertFalse(spawn_n.called)
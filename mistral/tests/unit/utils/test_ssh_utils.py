@@ -0,0 +1,222 @@
+# Copyright 2015 - Mirantis, Inc.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+
+import eventlet
+import mock
+from oslo.config import cfg
+
+from mistral.actions import std_actions
+from mistral.tests import base
+from mistral.utils import ssh_utils
+
+
+def _create_channel():
+    chan = mock.MagicMock()
+
+    chan.recv.side_effect = ['output', '']
+    chan.recv_stderr.return_value = ''
+    chan.recv_exit_status.return_value = 0
+
+    return chan
+
+
+def _create_ssh_client():
+    client = mock.MagicMock()
+
+    # Every command runs in its own channel.
+    client.get_transport.return_value.open_session.side_effect = (
+        lambda: _create_channel()
+    )
+
+    return client
+
+
+class SSHConnectionCacheTest(base.BaseTest):
+    def setUp(self):
+        super(SSHConnectionCacheTest, self).setUp()
+
+        self.addCleanup(ssh_utils.clear_connection_cache)
+
+    @mock.patch.object(ssh_utils, '_connect')
+    def test_connection_reused(self, connect):
+        connect.side_effect = lambda *args: _create_ssh_client()
+
+        for _ in range(2):
+            self.assertEqual(
+                (0, 'output'),
+                ssh_utils.execute_command('ls', 'host1', 'user', 'pwd')
+            )
+
+        self.assertEqual(1, connect.call_count)
+
+        ssh_utils.execute_command('ls', 'host2', 'user', 'pwd')
+
+        self.assertEqual(2, connect.call_count)
+
+    @mock.patch.object(ssh_utils, '_connect')
+    def test_connection_reuse_disabled(self, connect):
+        cfg.CONF.set_override('ssh_idle_timeout', 0, group='executor')
+
+        self.addCleanup(
+            cfg.CONF.clear_override,
+            'ssh_idle_timeout',
+            group='executor'
+        )
+
+        clients = [_create_ssh_client(), _create_ssh_client()]
+
+        connect.side_effect = clients
+
+        ssh_utils.execute_command('ls', 'host1', 'user', 'pwd')
+        ssh_utils.execute_command('ls', 'host1', 'user', 'pwd')
+
+        self.assertEqual(2, connect.call_count)
+        self.assertTrue(all(c.close.called for c in clients))
+
+    @mock.patch.object(ssh_utils.time, 'time')
+    @mock.patch.object(ssh_utils, '_connect')
+    def test_idle_connection_closed(self, connect, time):
+        client = _create_ssh_client()
+
+        connect.return_value = client
+        time.return_value = 0
+
+        ssh_utils.execute_command('ls', 'host1', 'user', 'pwd')
+
+        self.assertFalse(client.close.called)
+
+        time.return_value = 1000
+
+        connect.return_value = _create_ssh_client()
+
+        ssh_utils.execute_command('ls', 'host1', 'user', 'pwd')
+
+        self.assertTrue(client.close.called)
+        self.assertEqual(2, connect.call_count)
+
+    @mock.patch.object(ssh_utils.time, 'time')
+    @mock.patch.object(ssh_utils, '_connect')
+    def test_connection_in_use_not_evicted(self, connect, time):
+        connect.side_effect = lambda *args: _create_ssh_client()
+        time.return_value = 0
+
+        conn = ssh_utils._get_connection('host1', 'user', 'pwd')
+
+        # A long running command is still using the connection.
+        time.return_value = 1000
+
+        ssh_utils._release_connection(
+            ssh_utils._get_connection('host2', 'user', 'pwd')
+        )
+
+        self.assertFalse(conn.ssh.close.called)
+
+        ssh_utils._release_connection(conn)
+
+        self.assertFalse(conn.ssh.close.called)
+
+        time.return_value = 2000
+
+        ssh_utils._release_connection(
+            ssh_utils._get_connection('host2', 'user', 'pwd')
+        )
+
+        self.assertTrue(conn.ssh.close.called)
+
+
+class OutputBufferTest(base.BaseTest):
+    def test_no_limit(self):
+        output = ssh_utils.OutputBuffer()
+
+        output.write('abc')
+        output.write('def')
+
+        self.assertEqual('abcdef', output.getvalue())
+
+    def test_truncated(self):
+        output = ssh_utils.OutputBuffer(4)
+
+        output.write('abc')
+        output.write('def')
+        output.write('ghi')
+
+        self.assertEqual(
+            'abcd\n[Output truncated: 4 of 9 bytes captured]',
+            output.getvalue()
+        )
+
+    @mock.patch.object(ssh_utils, '_connect')
+    def test_stdout_and_stderr_read_concurrently(self, connect):
+        chan = _create_channel()
+
+        client = _create_ssh_client()
+        client.get_transport.return_value.open_session.side_effect = [chan]
+
+        stderr_read = []
+
+        def _recv(size):
+            # Emulates a command that doesn't write to stdout until its
+            # stderr is read.
+            while not stderr_read:
+                eventlet.sleep(0.01)
+
+            return ''
+
+        def _recv_stderr(size):
+            if stderr_read:
+                return ''
+
+            stderr_read.append(True)
+
+            return 'error'
+
+        chan.recv.side_effect = _recv
+        chan.recv_stderr.side_effect = _recv_stderr
+
+        connect.return_value = client
+
+        self.assertEqual(
+            (0, '', 'error'),
+            ssh_utils.execute_command(
+                'ls',
+                'host1',
+                'user',
+                'pwd',
+                get_stderr=True
+            )
+        )
+
+        ssh_utils.clear_connection_cache()
+
+
+class SSHActionTest(base.BaseTest):
+    @mock.patch.object(ssh_utils, 'execute_command')
+    def test_results_in_host_order(self, execute_command):
+        def _execute(cmd, host, username, password):
+            # The first host is the slowest one.
+            eventlet.sleep(0.1 if host == 'host1' else 0)
+
+            return 0, host
+
+        execute_command.side_effect = _execute
+
+        action = std_actions.SSHAction(
+            'ls',
+            ['host1', 'host2', 'host3'],
+            'user',
+            'pwd'
+        )
+
+        self.assertEqual(['host1', 'host2', 'host3'], action.run())
@@ -0,0 +1,73 @@
+# Copyright 2015 - Mirantis, Inc.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+import copy
+import json
+
+from mistral import expressions as expr
+from mistral.tests import base
+from mistral.workflow import data_flow
+
+
+class FrozenContextTest(base.BaseTest):
+    def test_merge_contexts(self):
+        left = {'a': {'b': 1, 'c': {'d': 2}}, 'e': [1, 2]}
+        right = {'a': {'b': 3}, 'f': 4}
+
+        ctx = data_flow.merge_contexts(left, None, right)
+
+        self.assertDictEqual(
+            {'a': {'b': 3, 'c': {'d': 2}}, 'e': [1, 2], 'f': 4},
+            ctx
+        )
+
+        # Merged contexts don't change.
+        self.assertDictEqual({'a': {'b': 1, 'c': {'d': 2}}, 'e': [1, 2]}, left)
+        self.assertDictEqual({'a': {'b': 3}, 'f': 4}, right)
+
+        # Values that haven't changed are shared.
+        self.assertIs(left['a']['c'], ctx['a']['c'])
+        self.assertIs(left['e'], ctx['e'])
+
+    def test_context_is_immutable(self):
+        ctx = data_flow.merge_contexts({'a': 1})
+
+        self.assertRaises(TypeError, ctx.__setitem__, 'a', 2)
+        self.assertRaises(TypeError, ctx.update, {'a': 2})
+        self.assertRaises(TypeError, ctx.pop, 'a')
+
+        new_ctx = ctx.set('a', 2)
+
+        self.assertEqual(1, ctx['a'])
+        self.assertEqual(2, new_ctx['a'])
+
+    def test_copy_context(self):
+        ctx = data_flow.merge_contexts({'a': {'b': 1}})
+
+        self.assertIs(ctx, copy.copy(ctx))
+
+        ctx_copy = copy.deepcopy(ctx)
+
+        ctx_copy['a']['b'] = 2
+
+        self.assertEqual(1, ctx['a']['b'])
+
+    def test_context_as_dict(self):
+        ctx = data_flow.merge_contexts({'a': {'b': 1}}, {'c': 2})
+
+        self.assertEqual(1, expr.evaluate('<% $.a.b %>', ctx))
+        self.assertDictEqual(
+            {'a': {'b': 1}, 'c': 2},
+            json.loads(json.dumps(ctx))
+        )
@@ -0,0 +1,100 @@
+# Copyright 2015 - Mirantis, Inc.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+from mistral.db.v2.sqlalchemy import models
+from mistral.tests import base
+from mistral.workflow import states
+from mistral.workflow import utils as wf_utils
+
+
+class TaskExecutionIndexTest(base.BaseTest):
+    def setUp(self):
+        super(TaskExecutionIndexTest, self).setUp()
+
+        self.wf_ex = models.WorkflowExecution()
+        self.wf_ex.update({'id': '1-2-3-4', 'state': states.RUNNING})
+
+    def _add_task(self, id, name, state=states.RUNNING):
+        task_ex = models.TaskExecution()
+        task_ex.update({'id': id, 'name': name, 'state': state})
+
+        self.wf_ex.task_executions.append(task_ex)
+
+        return task_ex
+
+    def test_find(self):
+        task1 = self._add_task('1', 'task1')
+        self._add_task('2', 'task1')
+        task3 = self._add_task('3', 'task3')
+
+        index = wf_utils.get_task_index(self.wf_ex)
+
+        self.assertIs(task1, index.find('task1'))
+        self.assertIs(task3, index.find('task3'))
+        self.assertIsNone(index.find('task4'))
+
+    def test_index_reused(self):
+        self._add_task('1', 'task1')
+
+        index = wf_utils.get_task_index(self.wf_ex)
+
+        self.assertIs(index, wf_utils.get_task_index(self.wf_ex))
+
+    def test_index_rebuilt_on_new_task(self):
+        self._add_task('1', 'task1')
+
+        index = wf_utils.get_task_index(self.wf_ex)
+
+        self.assertIsNone(index.find('task2'))
+
+        task2 = self._add_task('2', 'task2')
+
+        self.assertIs(task2, wf_utils.get_task_index(self.wf_ex).find('task2'))
+
+    def test_find_by_state(self):
+        task1 = self._add_task('1', 'task1')
+        task2 = self._add_task('2', 'task2', states.SUCCESS)
+        task3 = self._add_task('3', 'task3')
+
+        self.assertEqual(
+            [task1, task3],
+            wf_utils.find_running_tasks(self.wf_ex)
+        )
+        self.assertEqual([task2], wf_utils.find_successful_tasks(self.wf_ex))
+
+        task3.state = states.ERROR
+        task1.state = states.SUCCESS
+
+        self.assertEqual([], wf_utils.find_running_tasks(self.wf_ex))
+        self.assertEqual([], wf_utils.find_incomplete_tasks(self.wf_ex))
+        self.assertEqual(
+            [task1, task2],
+            wf_utils.find_successful_tasks(self.wf_ex)
+        )
+        self.assertEqual(
+            [task1, task2, task3],
+            wf_utils.find_completed_tasks(self.wf_ex)
+        )
+
+    def test_index_updated_on_removed_task(self):
+        task1 = self._add_task('1', 'task1')
+        task2 = self._add_task('2', 'task2')
+
+        index = wf_utils.get_task_index(self.wf_ex)
+
+        self.wf_ex.task_executions.remove(task1)
+
+        self.assertIs(index, wf_utils.get_task_index(self.wf_ex))
+        self.assertIsNone(index.find('task1'))
+        self.assertEqual([task2], wf_utils.find_running_tasks(self.wf_ex))
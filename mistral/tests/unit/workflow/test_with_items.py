@@ -18,7 +18,7 @@ from mistral.db.v2.sqlalchemy import models
 from mistral import exceptions as exc
 from mistral.tests import base
 from mistral.workbook.v2 import tasks
-from mistral.workflow import utils
+from mistral.workflow import states
 from mistral.workflow import with_items
 
 
@@ -42,6 +42,14 @@ task_ex = models.TaskExecution(
 )
 
 
+def _action_ex(index, state, output):
+    return models.ActionExecution(
+        iteration_index=index,
+        state=state,
+        output=output
+    )
+
+
 class WithItemsCalculationsTest(base.BaseTest):
     def test_calculate_output_with_key(self):
         task_dict = TASK_DICT.copy()
@@ -52,16 +60,48 @@ class WithItemsCalculationsTest(base.BaseTest):
         output = with_items.get_result(
             task_ex,
             task_spec,
-            utils.TaskResult(data='output!')
+            [_action_ex(0, states.SUCCESS, {'result': 'output!'})]
         )
 
         self.assertDictEqual({'result': ['output!']}, output)
 
+    def test_calculate_output_of_retried_iterations(self):
+        task_dict = TASK_DICT.copy()
+        task_dict['publish'] = {'result': '<% $.task1 %>'}
+
+        task_spec = tasks.TaskSpec(task_dict)
+
+        action_exs = [
+            _action_ex(1, states.ERROR, {'error': 'error1'}),
+            _action_ex(0, states.SUCCESS, {'result': 'output0'}),
+            _action_ex(1, states.SUCCESS, {'result': 'output1'}),
+            _action_ex(2, states.ERROR, {'error': 'error2'})
+        ]
+
+        output = with_items.get_result(task_ex, task_spec, action_exs)
+
+        # Results are ordered by iteration index, failed attempts of
+        # retried iterations are ignored.
+        self.assertDictEqual(
+            {
+                'result': ['output0', 'output1', 'error2'],
+                'error': 'error2',
+                'task': {'task1': 'error2'}
+            },
+            output
+        )
+
+        self.assertEqual(states.ERROR, with_items.get_state(action_exs))
+        self.assertEqual(
+            states.SUCCESS,
+            with_items.get_state(action_exs[:3])
+        )
+
     def test_calculate_output_without_key(self):
         output = with_items.get_result(
             task_ex,
             TASK_SPEC,
-            utils.TaskResult(data='output!')
+            [_action_ex(0, states.SUCCESS, {'result': 'output!'})]
         )
 
         # TODO(rakhmerov): Fix during result/output refactoring.
@@ -147,3 +187,65 @@ class WithItemsCalculationsTest(base.BaseTest):
         )
 
         self.assertIn('List type', exception.message)
+
+    def test_iterate_input_range(self):
+        with_items_input = {
+            'itemX': [1, 2, 3],
+            'itemY': ['a', 'b', 'c']
+        }
+
+        self.assertListEqual(
+            [
+                {'itemX': 2, 'itemY': 'b'},
+                {'itemX': 3, 'itemY': 'c'}
+            ],
+            list(with_items.iterate_input(with_items_input, 1, 5))
+        )
+
+    def test_get_indexes_for_loop_with_concurrency(self):
+        task_dict = TASK_DICT.copy()
+        task_dict['policies'] = {'concurrency': 2}
+
+        task_spec = tasks.TaskSpec(task_dict)
+
+        t_ex = models.TaskExecution(
+            name='task1',
+            runtime_context={
+                'with_items': {
+                    'capacity': 2,
+                    'index': 0,
+                    'cursor': 0,
+                    'count': 5
+                }
+            }
+        )
+
+        self.assertEqual((0, 2), with_items.get_indexes_for_loop(
+            t_ex, task_spec
+        ))
+
+        with_items.move_cursor(t_ex, 2)
+        with_items.do_step(t_ex)
+
+        # One iteration has completed so one more can be dispatched.
+        self.assertEqual((2, 3), with_items.get_indexes_for_loop(
+            t_ex, task_spec
+        ))
+
+        with_items.move_cursor(t_ex, 5)
+
+        self.assertEqual((5, 5), with_items.get_indexes_for_loop(
+            t_ex, task_spec
+        ))
+
+    def test_get_indexes_for_loop_without_concurrency(self):
+        t_ex = models.TaskExecution(
+            name='task1',
+            runtime_context={
+                'with_items': {'index': 0, 'cursor': 0, 'count': 5}
+            }
+        )
+
+        self.assertEqual((0, 5), with_items.get_indexes_for_loop(
+            t_ex, TASK_SPEC
+        ))
@@ -15,6 +15,7 @@
 #    See the License for the specific language governing permissions and
 #    limitations under the License.
 
+import hashlib
 import logging
 import os
 from os import path
@@ -23,6 +24,7 @@ import threading
 from eventlet import corolocal
 import pkg_resources as pkg
 
+from mistral.openstack.common import jsonutils
 from mistral import version
 
 # Thread local storage.
@@ -130,6 +132,17 @@ def merge_dicts(left, right, overwrite=True):
     return left
 
 
+def get_json_hash(data):
+    """Calculates SHA-256 hash of the JSON representation of the given data.
+
+    Dictionary keys are sorted so equal data structures always have
+    equal hashes.
+    """
+    json_data = jsonutils.dumps(data, sort_keys=True)
+
+    return hashlib.sha256(json_data.encode('utf-8')).hexdigest()
+
+
 def get_file_list(directory):
     base_path = pkg.resource_filename(
         version.version_info.package,
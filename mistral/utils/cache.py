@@ -0,0 +1,130 @@
+# Copyright 2015 - Mirantis, Inc.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+import collections
+import threading
+import time
+
+
+class LRUCache(object):
+    """Bounded cache evicting least recently used entries.
+
+    Besides regular get/put operations the cache keeps hit, miss, eviction
+    and expiration counters so that its efficiency can be monitored.
+    """
+
+    def __init__(self, max_size, ttl=None):
+        """Creates cache.
+
+        :param max_size: Maximum number of entries.
+        :param ttl: Time in seconds an entry stays valid after it has been
+            put. Entries never expire if it's not specified.
+        """
+        if max_size < 1:
+            raise ValueError("Cache size must be positive: %s" % max_size)
+
+        self.max_size = max_size
+        self.ttl = ttl
+
+        # Key -> (value, expiration time) tuples.
+        self._data = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                val, expires_at = self._data.pop(key)
+            except KeyError:
+                self.misses += 1
+
+                return default
+
+            if expires_at is not None and expires_at <= time.time():
+                self.misses += 1
+                self.expirations += 1
+
+                return default
+
+            # Re-insert the value to mark it as the most recently used.
+            self._data[key] = (val, expires_at)
+            self.hits += 1
+
+            return val
+
+    def put(self, key, val):
+        expires_at = time.time() + self.ttl if self.ttl else None
+
+        with self._lock:
+            self._data.pop(key, None)
+            self._data[key] = (val, expires_at)
+
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_create(self, key, factory):
+        """Returns cached value or creates and caches it using factory.
+
+        :param key: Cache key.
+        :param factory: Callable taking the key and returning the value.
+        :return: Cached or newly created value.
+        """
+        val = self.get(key, _MISSING)
+
+        if val is _MISSING:
+            val = factory(key)
+
+            self.put(key, val)
+
+        return val
+
+    def pop(self, key, default=None):
+        with self._lock:
+            item = self._data.pop(key, None)
+
+        return item[0] if item else default
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+            self.expirations = 0
+
+    def get_stats(self):
+        with self._lock:
+            return {
+                'size': len(self._data),
+                'max_size': self.max_size,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations
+            }
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def __len__(self):
+        return len(self._data)
+
+
+_MISSING = object()
@@ -0,0 +1,217 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2015 - Mirantis, Inc.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+"""Pool of HTTP sessions keeping connections to remote hosts alive.
+
+A session is used by one request at a time and is returned to the pool
+with its cookies cleared so nothing leaks between requests made on behalf
+of different workflows.
+"""
+
+import collections
+import contextlib
+import threading
+import time
+
+from oslo.config import cfg
+import requests
+from six.moves.urllib import parse as urlparse
+
+from mistral.openstack.common import log as logging
+
+
+LOG = logging.getLogger(__name__)
+
+_POOL = None
+
+
+def _get_connection_count(session, url):
+    try:
+        pool = session.get_adapter(url).poolmanager.connection_from_url(url)
+
+        return pool.num_connections
+    except Exception:
+        return None
+
+
+class SessionPool(object):
+    def __init__(self, max_idle_sessions, idle_timeout):
+        """Creates session pool.
+
+        :param max_idle_sessions: Maximum number of idle sessions kept
+            per scheme, host and verify/proxy settings. 0 disables reuse.
+        :param idle_timeout: Time in seconds after which an idle session
+            is closed.
+        """
+        self.max_idle_sessions = max_idle_sessions
+        self.idle_timeout = idle_timeout
+
+        # Key -> list of (session, release time) tuples.
+        self._idle = collections.defaultdict(list)
+        self._lock = threading.Lock()
+        self._last_eviction = time.time()
+
+        # Host -> request counters.
+        self._stats = collections.defaultdict(
+            lambda: {'requests': 0, 'new_connections': 0}
+        )
+
+    @staticmethod
+    def _get_key(url, verify, proxies):
+        parts = urlparse.urlsplit(url)
+
+        return (
+            parts.scheme,
+            parts.netloc,
+            verify,
+            tuple(sorted((proxies or {}).items()))
+        )
+
+    def _checkout(self, key):
+        with self._lock:
+            sessions = self._idle.get(key)
+
+            if sessions:
+                return sessions.pop()[0]
+
+        return requests.Session()
+
+    def _checkin(self, key, session):
+        session.cookies.clear()
+
+        now = time.time()
+
+        with self._lock:
+            sessions = self._idle[key]
+
+            if len(sessions) < self.max_idle_sessions:
+                sessions.append((session, now))
+
+                session = None
+
+            expired = self._evict_expired(now)
+
+        if session:
+            expired.append(session)
+
+        for s in expired:
+            s.close()
+
+    def _evict_expired(self, now):
+        if now - self._last_eviction < self.idle_timeout:
+            return []
+
+        self._last_eviction = now
+
+        expired = []
+
+        for key, sessions in list(self._idle.items()):
+            alive = []
+
+            for session, released_at in sessions:
+                if now - released_at > self.idle_timeout:
+                    expired.append(session)
+                else:
+                    alive.append((session, released_at))
+
+            if alive:
+                self._idle[key] = alive
+            else:
+                del self._idle[key]
+
+        return expired
+
+    @contextlib.contextmanager
+    def session(self, url, verify=None, proxies=None):
+        key = self._get_key(url, verify, proxies)
+
+        session = self._checkout(key)
+
+        try:
+            yield session
+        except Exception:
+            # Connection state is unknown so the session isn't reused.
+            session.close()
+
+            raise
+
+        self._checkin(key, session)
+
+    def request(self, method, url, **kwargs):
+        proxies = kwargs.get('proxies')
+
+        with self.session(url, kwargs.get('verify'), proxies) as session:
+            # Connections through proxies aren't tracked.
+            conn_count = (
+                _get_connection_count(session, url) if not proxies else None
+            )
+
+            resp = session.request(method, url, **kwargs)
+
+            self._update_stats(session, url, conn_count)
+
+        return resp
+
+    def _update_stats(self, session, url, conn_count):
+        new_conn_count = (
+            _get_connection_count(session, url)
+            if conn_count is not None else None
+        )
+
+        host = urlparse.urlsplit(url).netloc
+
+        with self._lock:
+            stats = self._stats[host]
+
+            stats['requests'] += 1
+
+            if new_conn_count is not None:
+                stats['new_connections'] += new_conn_count - conn_count
+
+    def get_stats(self):
+        """Returns request and connection counters per host."""
+        with self._lock:
+            return dict(
+                (host, dict(s, idle_sessions=self._count_idle(host)))
+                for host, s in self._stats.items()
+            )
+
+    def _count_idle(self, host):
+        return sum(
+            len(sessions) for key, sessions in self._idle.items()
+            if key[1] == host
+        )
+
+    def close(self):
+        with self._lock:
+            idle = self._idle
+            self._idle = collections.defaultdict(list)
+
+        for sessions in idle.values():
+            for session, _ in sessions:
+                session.close()
+
+
+def get_session_pool():
+    global _POOL
+
+    if not _POOL:
+        _POOL = SessionPool(
+            cfg.CONF.executor.http_max_idle_sessions,
+            cfg.CONF.executor.http_idle_timeout
+        )
+
+    return _POOL
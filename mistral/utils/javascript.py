@@ -13,14 +13,108 @@
 #    limitations under the License.
 
 import abc
+import hashlib
 import json
 
+from eventlet import patcher
+from oslo.config import cfg
+import six
+
 from mistral import exceptions as exc
 from mistral.openstack.common import importutils
+from mistral.openstack.common import log as logging
+from mistral.utils import cache
+
 
+LOG = logging.getLogger(__name__)
 
 _PYV8 = importutils.try_import('PyV8')
 
+# Evaluation time limit must be enforced by a native thread since
+# a running script doesn't let green threads run.
+_threading = patcher.original('threading')
+
+SCRIPT_CACHE_SIZE = 128
+
+# Defines a function removing global variables that scripts might have
+# created so that a context can be reused. The function returns False if
+# some of them can't be removed or if built-in objects (global variables
+# existing from the start and their prototypes) have been changed in a way
+# that can't be undone, e.g. a method of Array.prototype was replaced.
+_RESET_FUNCTION = """
+(function (global) {
+    function sameValue(a, b) {
+        // NaN is the only value not equal to itself.
+        return a === b || (a !== a && b !== b);
+    }
+
+    function sameDescriptor(a, b) {
+        return sameValue(a.value, b.value) && a.get === b.get &&
+            a.set === b.set && a.writable === b.writable &&
+            a.enumerable === b.enumerable &&
+            a.configurable === b.configurable;
+    }
+
+    function snapshot(obj) {
+        var names = Object.getOwnPropertyNames(obj);
+
+        return {
+            obj: obj,
+            names: names,
+            descriptors: names.map(function (name) {
+                return Object.getOwnPropertyDescriptor(obj, name);
+            })
+        };
+    }
+
+    function isUnchanged(snap) {
+        var names = Object.getOwnPropertyNames(snap.obj);
+
+        return names.length === snap.names.length &&
+            names.every(function (name, i) {
+                return name === snap.names[i] && sameDescriptor(
+                    Object.getOwnPropertyDescriptor(snap.obj, name),
+                    snap.descriptors[i]
+                );
+            });
+    }
+
+    var baseline = {};
+    var builtins = [global];
+
+    function addBuiltin(obj) {
+        var isObject = obj !== null &&
+            (typeof obj === 'object' || typeof obj === 'function');
+
+        if (isObject && builtins.indexOf(obj) < 0) {
+            builtins.push(obj);
+        }
+    }
+
+    Object.getOwnPropertyNames(global).forEach(function (name) {
+        baseline[name] = true;
+
+        var value = Object.getOwnPropertyDescriptor(global, name).value;
+
+        addBuiltin(value);
+
+        if (value && typeof value === 'function') {
+            addBuiltin(value.prototype);
+        }
+    });
+
+    var snapshots = builtins.map(snapshot);
+
+    return function () {
+        var clean = Object.getOwnPropertyNames(global).every(function (name) {
+            return baseline.hasOwnProperty(name) || delete global[name];
+        });
+
+        return clean && snapshots.every(isUnchanged);
+    };
+})(this)
+"""
+
 
 class JSEvaluator(object):
     @classmethod
@@ -31,6 +125,152 @@ class JSEvaluator(object):
         pass
 
 
+class _V8Context(object):
+    """V8 context that can be used for multiple evaluations."""
+
+    def __init__(self):
+        self.ctx = _PYV8.JSContext()
+        self.engine = _PYV8.JSEngine()
+
+        # Scripts are compiled within a context so the cache is per context.
+        self._scripts = cache.LRUCache(SCRIPT_CACHE_SIZE)
+
+        with self.ctx:
+            self._json_parse = self.ctx.eval('JSON.parse')
+            self._reset = self.ctx.eval(_RESET_FUNCTION)
+
+    def _compile(self, script):
+        data = (script.encode('utf-8') if isinstance(script, six.text_type)
+                else script)
+
+        return self._scripts.get_or_create(
+            hashlib.sha1(data).hexdigest(),
+            lambda key: self.engine.compile(script)
+        )
+
+    def evaluate(self, script, context):
+        with self.ctx:
+            # Data is converted by the native JSON parser instead of being
+            # evaluated as a part of script source.
+            setattr(
+                self.ctx.locals,
+                '$',
+                self._json_parse(json.dumps(context))
+            )
+
+            return self._compile(script).run()
+
+    def reset(self):
+        with self.ctx:
+            return self._reset()
+
+
+class _V8ContextPool(object):
+    def __init__(self, size):
+        self.size = size
+
+        self._idle = []
+        self._lock = _threading.Lock()
+
+    def acquire(self):
+        with self._lock:
+            if self._idle:
+                return self._idle.pop()
+
+        return _V8Context()
+
+    def release(self, ctx):
+        try:
+            clean = ctx.reset()
+        except Exception as e:
+            LOG.debug("Failed to reset JavaScript context: %s" % e)
+
+            clean = False
+
+        if not clean:
+            return
+
+        with self._lock:
+            if len(self._idle) < self.size:
+                self._idle.append(ctx)
+
+
+_CONTEXT_POOL = None
+_POOL_LOCK = _threading.Lock()
+
+
+def _get_context_pool():
+    global _CONTEXT_POOL
+
+    with _POOL_LOCK:
+        if not _CONTEXT_POOL:
+            # The limit applies to the whole V8 heap and can only be set
+            # before the first context is created. V8 aborts the process
+            # when the heap is exhausted so executor allows the limit only
+            # if JavaScript actions run in the "process" mode.
+            heap_size = cfg.CONF.executor.js_max_heap_size
+
+            if heap_size:
+                _PYV8.JSEngine.setMemoryLimit(
+                    max_old_space_size=heap_size * 1024 * 1024
+                )
+
+            _CONTEXT_POOL = _V8ContextPool(
+                cfg.CONF.executor.js_context_pool_size
+            )
+
+    return _CONTEXT_POOL
+
+
+def _consume_termination():
+    # Termination requested right before a script completed stays pending
+    # and would terminate the next script. Running a script consumes it.
+    ctx = _PYV8.JSContext()
+
+    with ctx:
+        try:
+            ctx.eval('for (var i = 0; i < 2; i++) {}')
+        except Exception:
+            pass
+
+
+class _Terminator(object):
+    """Terminates a script running for longer than the time limit."""
+
+    def __init__(self, time_limit):
+        self.terminated = False
+
+        self._finished = False
+        self._lock = _threading.Lock()
+        self._timer = _threading.Timer(time_limit, self._terminate)
+
+    def _terminate(self):
+        with self._lock:
+            if self._finished:
+                return
+
+            self.terminated = True
+
+            _PYV8.JSEngine.terminateAllThreads()
+
+    def start(self):
+        self._timer.start()
+
+    def finish(self):
+        """Makes sure the script is not terminated after it has finished.
+
+        Must be called while still holding JSLocker so that termination
+        doesn't affect scripts run by other threads.
+        """
+        with self._lock:
+            self._finished = True
+
+        self._timer.cancel()
+
+        if self.terminated:
+            _consume_termination()
+
+
 class V8Evaluator(JSEvaluator):
     @classmethod
     def evaluate(cls, script, context):
@@ -39,15 +279,43 @@ class V8Evaluator(JSEvaluator):
                 "PyV8 module is not available. Please install PyV8."
             )
 
-        with _PYV8.JSContext() as ctx:
-            # Prepare data context and way for interaction with it.
-            ctx.eval('$ = %s' % json.dumps(context))
+        pool = _get_context_pool()
+        time_limit = cfg.CONF.executor.js_time_limit
+
+        terminator = _Terminator(time_limit) if time_limit else None
+
+        # V8 can be used by one thread at a time.
+        with _PYV8.JSLocker():
+            ctx = pool.acquire()
+
+            if terminator:
+                terminator.start()
+
+            try:
+                result = ctx.evaluate(script, context)
+            except Exception:
+                if terminator and terminator.terminated:
+                    raise exc.MistralException(
+                        "JavaScript evaluation exceeded time limit of %s"
+                        " seconds." % time_limit
+                    )
+
+                # State of the context is unknown so it's not reused.
+                raise
+            finally:
+                if terminator:
+                    terminator.finish()
+
+            # If the script has completed right before termination the
+            # context is not reused either.
+            if not (terminator and terminator.terminated):
+                pool.release(ctx)
 
-            return ctx.eval(script)
+            return result
 
 # TODO(nmakhotkin) Make it configurable.
 EVALUATOR = V8Evaluator
 
 
 def evaluate(script, context):
-    return EVALUATOR.evaluate(script, context)
\ No newline at end of file
+    return EVALUATOR.evaluate(script, context)
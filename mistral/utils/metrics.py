@@ -0,0 +1,308 @@
+# Copyright 2015 - Mirantis, Inc.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+"""Timing metrics of processing phases.
+
+Code measures its phases with timer() or timed() and the measured times
+are passed to the sink configured by 'metrics.sink'. Sinks are loaded
+from 'mistral.metrics.sinks' entry points. If no sink is configured
+timers do nothing.
+"""
+
+import abc
+import functools
+import socket
+import threading
+import time
+from wsgiref import simple_server
+
+import eventlet
+from oslo.config import cfg
+import six
+from stevedore import driver
+
+from mistral.openstack.common import log as logging
+
+
+LOG = logging.getLogger(__name__)
+
+CONF = cfg.CONF
+
+# Upper bounds of histogram buckets in seconds.
+BUCKETS = (
+    0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+    float('inf')
+)
+
+_SINK = None
+
+
+class Histogram(object):
+    """Distribution of measured values among buckets."""
+
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def add(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+
+                break
+
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def to_dict(self):
+        return {
+            'count': self.count,
+            'sum': self.sum,
+            'max': self.max,
+            'avg': self.sum / self.count if self.count else 0.0
+        }
+
+
+@six.add_metaclass(abc.ABCMeta)
+class Sink(object):
+    """Receives measured times."""
+
+    @abc.abstractmethod
+    def add(self, name, value):
+        """Adds measured time.
+
+        :param name: Metric name.
+        :param value: Time in seconds.
+        """
+        pass
+
+    def start(self):
+        pass
+
+
+class AggregatingSink(Sink):
+    """Aggregates measured times into histograms per metric."""
+
+    def __init__(self):
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def add(self, name, value):
+        with self._lock:
+            hist = self._histograms.get(name)
+
+            if not hist:
+                hist = self._histograms[name] = Histogram()
+
+            hist.add(value)
+
+    def get_histograms(self):
+        with self._lock:
+            return dict(
+                (name, _copy_histogram(hist))
+                for name, hist in self._histograms.items()
+            )
+
+
+def _copy_histogram(hist):
+    copy = Histogram(hist.buckets)
+
+    copy.counts = list(hist.counts)
+    copy.count = hist.count
+    copy.sum = hist.sum
+    copy.max = hist.max
+
+    return copy
+
+
+class LogSink(AggregatingSink):
+    """Logs aggregated times every 'metrics.log_interval' seconds."""
+
+    def __init__(self):
+        super(LogSink, self).__init__()
+
+        self.interval = CONF.metrics.log_interval
+
+        self._last_log_time = time.time()
+
+    def add(self, name, value):
+        super(LogSink, self).add(name, value)
+
+        now = time.time()
+
+        if now - self._last_log_time < self.interval:
+            return
+
+        self._last_log_time = now
+
+        for name, hist in sorted(self.get_histograms().items()):
+            LOG.info("Timing %s: %s" % (name, hist.to_dict()))
+
+
+class StatsdSink(Sink):
+    """Sends times to statsd over UDP as they are measured."""
+
+    def __init__(self):
+        self.address = (CONF.metrics.statsd_host, CONF.metrics.statsd_port)
+        self.prefix = CONF.metrics.statsd_prefix
+
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+
+    def add(self, name, value):
+        msg = '%s%s:%d|ms' % (self.prefix, name, value * 1000)
+
+        try:
+            self._socket.sendto(msg.encode('utf-8'), self.address)
+        except socket.error as e:
+            LOG.debug("Failed to send metric to statsd: %s" % e)
+
+
+class PrometheusSink(AggregatingSink):
+    """Serves aggregated times in Prometheus text format over HTTP."""
+
+    def start(self):
+        try:
+            server = simple_server.make_server(
+                CONF.metrics.prometheus_host,
+                CONF.metrics.prometheus_port,
+                self._app
+            )
+        except socket.error as e:
+            # Metrics are optional so a process that can't serve them,
+            # e.g. because another process has taken the port, still runs.
+            LOG.error(
+                "Failed to serve metrics on %s:%s: %s"
+                % (CONF.metrics.prometheus_host,
+                   CONF.metrics.prometheus_port, e)
+            )
+
+            return
+
+        eventlet.spawn_n(server.serve_forever)
+
+    def _app(self, environ, start_response):
+        start_response(
+            '200 OK',
+            [('Content-Type', 'text/plain; version=0.0.4')]
+        )
+
+        return [self.render().encode('utf-8')]
+
+    def render(self):
+        lines = []
+
+        for name, hist in sorted(self.get_histograms().items()):
+            metric = 'mistral_%s_seconds' % name.replace('.', '_')
+
+            lines.append('# TYPE %s histogram' % metric)
+
+            count = 0
+
+            for bound, bucket_count in zip(hist.buckets, hist.counts):
+                count += bucket_count
+
+                lines.append(
+                    '%s_bucket{le="%s"} %d'
+                    % (metric, '+Inf' if bound == float('inf') else bound,
+                       count)
+                )
+
+            lines.append('%s_sum %s' % (metric, hist.sum))
+            lines.append('%s_count %d' % (metric, hist.count))
+
+        return '\n'.join(lines) + '\n'
+
+
+class _Timer(object):
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self._started_at = time.time()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        sink = _SINK
+
+        if sink:
+            sink.add(self.name, time.time() - self._started_at)
+
+
+class _NoopTimer(object):
+    def __enter__(self):
+        pass
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        pass
+
+
+_NOOP_TIMER = _NoopTimer()
+
+
+def timer(name):
+    """Returns context manager measuring time of the code it wraps.
+
+    :param name: Metric name.
+    """
+    return _Timer(name) if _SINK else _NOOP_TIMER
+
+
+def timed(name):
+    """Decorator measuring time of function calls."""
+
+    def _decorator(func):
+        @functools.wraps(func)
+        def _timed(*args, **kwargs):
+            if not _SINK:
+                return func(*args, **kwargs)
+
+            with _Timer(name):
+                return func(*args, **kwargs)
+
+        return _timed
+
+    return _decorator
+
+
+def get_sink():
+    return _SINK
+
+
+def set_sink(sink):
+    global _SINK
+
+    _SINK = sink
+
+
+def setup():
+    """Creates and starts sink configured by 'metrics.sink'."""
+    name = CONF.metrics.sink
+
+    if not name:
+        set_sink(None)
+
+        return
+
+    sink = driver.DriverManager(
+        namespace='mistral.metrics.sinks',
+        name=name,
+        invoke_on_load=True
+    ).driver
+
+    sink.start()
+
+    set_sink(sink)
@@ -13,13 +13,41 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import collections
+import threading
+
+import eventlet
 from keystoneclient.v3 import client as ks_client
 from oslo.config import cfg
 
 from mistral import context
+from mistral.openstack.common import log as logging
+from mistral.utils import cache
+
+LOG = logging.getLogger(__name__)
 
 CONF = cfg.CONF
 
+# Project name -> admin client.
+_ADMIN_CLIENTS = {}
+_ADMIN_CLIENTS_LOCK = threading.Lock()
+
+_ENDPOINT_CACHE = None
+
+TrustToken = collections.namedtuple(
+    'TrustToken',
+    ['user_id', 'auth_token', 'auth_ref']
+)
+
+_TRUST_TOKEN_CACHE = None
+_TRUST_TOKEN_LOCK = threading.Lock()
+
+# Trust id -> _AuthLock held while the trust is being authenticated.
+_TRUST_AUTH_LOCKS = {}
+
+# Ids of trusts whose tokens are being refreshed in background.
+_TRUST_REFRESHES = set()
+
 
 def client():
     ctx = context.ctx()
@@ -53,44 +81,234 @@ def _admin_client(trust_id=None, project_name=None):
     return cl
 
 
+def _is_token_expiring(auth_ref, margin=None):
+    if not auth_ref:
+        return True
+
+    if margin is None:
+        margin = CONF.openstack_actions.token_expiry_margin
+
+    return auth_ref.will_expire_soon(stale_duration=margin)
+
+
 def client_for_admin(project_name):
-    return _admin_client(project_name=project_name)
+    """Returns admin client scoped to given project.
+
+    Clients are reused until their tokens are about to expire so that
+    Keystone doesn't authenticate the admin user on every call.
+    """
+    with _ADMIN_CLIENTS_LOCK:
+        cl = _ADMIN_CLIENTS.get(project_name)
+
+        if not cl or _is_token_expiring(getattr(cl, 'auth_ref', None)):
+            cl = _admin_client(project_name=project_name)
+
+            _ADMIN_CLIENTS[project_name] = cl
+
+    return cl
 
 
 def client_for_trusts(trust_id):
     return _admin_client(trust_id=trust_id)
 
 
-def get_endpoint_for_project(service_name=None, service_type=None):
+def _get_endpoint_cache():
+    global _ENDPOINT_CACHE
+
+    if not _ENDPOINT_CACHE:
+        _ENDPOINT_CACHE = cache.LRUCache(
+            CONF.openstack_actions.endpoint_cache_size,
+            ttl=CONF.openstack_actions.endpoint_cache_ttl
+        )
+
+    return _ENDPOINT_CACHE
+
+
+def _find_endpoint(service_name, service_type, region_name, interface):
     admin_project_name = CONF.keystone_authtoken.admin_tenant_name
-    keystone_client = _admin_client(project_name=admin_project_name)
+    keystone_client = client_for_admin(admin_project_name)
     service_list = keystone_client.services.list()
 
     if service_name:
-        service_id = [s.id for s in service_list if s.name == service_name][0]
-    elif service_type:
-        service_id = [s.id for s in service_list if s.type == service_type][0]
+        service_ids = [s.id for s in service_list if s.name == service_name]
     else:
-        raise Exception(
-            "Either 'service_name' or 'service_type' must be provided."
-        )
+        service_ids = [s.id for s in service_list if s.type == service_type]
 
     endpoints = keystone_client.endpoints.list(
-        service=service_id,
-        interface='public'
-    )
+        service=service_ids[0],
+        interface=interface,
+        region=region_name
+    ) if service_ids else []
 
     if not endpoints:
         raise Exception(
-            "No endpoints found [service_name=%s, service_type=%s]"
-            % (service_name, service_type)
+            "No endpoints found [service_name=%s, service_type=%s,"
+            " region_name=%s]" % (service_name, service_type, region_name)
         )
 
-    # TODO(rakhmerov): We may have more than one endpoint because of regions
-    # TODO(rakhmerov): and ideally we need a config option for region
     return endpoints[0]
 
 
+def get_endpoint_for_project(service_name=None, service_type=None,
+                             region_name=None, interface='public'):
+    """Returns service endpoint.
+
+    Endpoints are cached for the time configured by
+    'openstack_actions.endpoint_cache_ttl'.
+
+    :param service_name: Service name.
+    :param service_type: Service type, used if service name is not given.
+    :param region_name: Endpoint region. Defaults to
+        'openstack_actions.region_name'.
+    :param interface: Endpoint interface.
+    """
+    if not service_name and not service_type:
+        raise Exception(
+            "Either 'service_name' or 'service_type' must be provided."
+        )
+
+    key = (
+        service_name,
+        service_type if not service_name else None,
+        region_name or CONF.openstack_actions.region_name,
+        interface
+    )
+
+    if CONF.openstack_actions.endpoint_cache_ttl <= 0:
+        return _find_endpoint(*key)
+
+    return _get_endpoint_cache().get_or_create(
+        key,
+        lambda k: _find_endpoint(*k)
+    )
+
+
+def _get_trust_token_cache():
+    global _TRUST_TOKEN_CACHE
+
+    if not _TRUST_TOKEN_CACHE:
+        _TRUST_TOKEN_CACHE = cache.LRUCache(
+            CONF.openstack_actions.trust_token_cache_size
+        )
+
+    return _TRUST_TOKEN_CACHE
+
+
+def _authenticate_trust(trust_id):
+    cl = client_for_trusts(trust_id)
+
+    token = TrustToken(
+        user_id=cl.user_id,
+        auth_token=cl.auth_token,
+        auth_ref=getattr(cl, 'auth_ref', None)
+    )
+
+    _get_trust_token_cache().put(trust_id, token)
+
+    return token
+
+
+def _refresh_trust_token(trust_id):
+    try:
+        _authenticate_trust(trust_id)
+    except Exception as e:
+        # The cached token is still valid, next call will try again.
+        LOG.warn("Failed to refresh token of trust %s: %s" % (trust_id, e))
+    finally:
+        with _TRUST_TOKEN_LOCK:
+            _TRUST_REFRESHES.discard(trust_id)
+
+
+def _schedule_trust_token_refresh(trust_id):
+    with _TRUST_TOKEN_LOCK:
+        if trust_id in _TRUST_REFRESHES:
+            return
+
+        _TRUST_REFRESHES.add(trust_id)
+
+    eventlet.spawn_n(_refresh_trust_token, trust_id)
+
+
+class _AuthLock(object):
+    """Lock of a trust with number of calls holding or waiting for it."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.users = 0
+
+
+def get_trust_token(trust_id):
+    """Returns trust-scoped token.
+
+    Tokens are cached and reused until they're about to expire. A token
+    that will expire within 'openstack_actions.trust_token_refresh_time'
+    seconds is returned as is while a new one is obtained in background.
+    Concurrent calls for the same trust authenticate it only once.
+
+    :param trust_id: Trust id.
+    :return: TrustToken instance.
+    """
+    token = _get_trust_token_cache().get(trust_id)
+
+    if token and not _is_token_expiring(token.auth_ref):
+        if _is_token_expiring(
+                token.auth_ref,
+                CONF.openstack_actions.trust_token_refresh_time):
+            _schedule_trust_token_refresh(trust_id)
+
+        return token
+
+    with _TRUST_TOKEN_LOCK:
+        auth_lock = _TRUST_AUTH_LOCKS.setdefault(trust_id, _AuthLock())
+        auth_lock.users += 1
+
+    try:
+        with auth_lock.lock:
+            # The trust might have been authenticated while waiting.
+            token = _get_trust_token_cache().get(trust_id)
+
+            if token and not _is_token_expiring(token.auth_ref):
+                return token
+
+            return _authenticate_trust(trust_id)
+    finally:
+        with _TRUST_TOKEN_LOCK:
+            auth_lock.users -= 1
+
+            # Other calls may still be waiting for the lock.
+            if (not auth_lock.users and
+                    _TRUST_AUTH_LOCKS.get(trust_id) is auth_lock):
+                del _TRUST_AUTH_LOCKS[trust_id]
+
+
+def forget_trust_token(trust_id):
+    _get_trust_token_cache().pop(trust_id)
+
+
+def get_trust_token_cache_stats():
+    """Returns trust token cache size, hit and miss counters."""
+    return _get_trust_token_cache().get_stats()
+
+
+def get_endpoint_cache_stats():
+    """Returns endpoint cache size, hit and miss counters."""
+    return _get_endpoint_cache().get_stats()
+
+
+def clear_caches():
+    with _ADMIN_CLIENTS_LOCK:
+        _ADMIN_CLIENTS.clear()
+
+    if _ENDPOINT_CACHE:
+        _ENDPOINT_CACHE.clear()
+
+    if _TRUST_TOKEN_CACHE:
+        _TRUST_TOKEN_CACHE.clear()
+
+    with _TRUST_TOKEN_LOCK:
+        _TRUST_REFRESHES.clear()
+
+
 def get_keystone_endpoint_v2():
     return get_endpoint_for_project('keystone')
 
@@ -108,7 +326,7 @@ def format_url(url_template, values):
 
 def is_token_trust_scoped(auth_token):
     admin_project_name = CONF.keystone_authtoken.admin_tenant_name
-    keystone_client = _admin_client(project_name=admin_project_name)
+    keystone_client = client_for_admin(admin_project_name)
 
     token_info = keystone_client.tokens.validate(auth_token)
 
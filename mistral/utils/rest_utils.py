@@ -50,3 +50,43 @@ def wrap_pecan_controller_exception(func):
             pecan.response.translatable_error = excp
             pecan.abort(excp.http_code, six.text_type(excp))
     return wrapped
+
+
+def parse_list(value):
+    """Parses comma separated list passed as a query parameter.
+
+    :param value: String like 'input,output' or None.
+    :return: List of values.
+    """
+    if not value:
+        return []
+
+    return [v.strip() for v in value.split(',') if v.strip()]
+
+
+def get_list_params(marker=None, limit=None, sort_keys=None,
+                    sort_dirs=None, fields=None, **filters):
+    """Converts query parameters of a list endpoint into DB API arguments.
+
+    :param marker: Id of the last resource of the previous page.
+    :param limit: Maximum number of resources to return.
+    :param sort_keys: Comma separated list of fields to sort by.
+    :param sort_dirs: Comma separated list of sort directions.
+    :param fields: Comma separated list of fields to return.
+    :param filters: Field values to filter by. None values are ignored.
+    :return: Dictionary of keyword arguments for DB API list methods.
+    """
+    if limit is not None and limit < 1:
+        raise ex.InputException("Limit must be positive: %s" % limit)
+
+    params = dict((k, v) for k, v in filters.items() if v is not None)
+
+    params.update({
+        'marker': marker,
+        'limit': limit,
+        'sort_keys': parse_list(sort_keys),
+        'sort_dirs': parse_list(sort_dirs),
+        'fields': parse_list(fields)
+    })
+
+    return params
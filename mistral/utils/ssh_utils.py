@@ -14,6 +14,12 @@
 #    See the License for the specific language governing permissions and
 #    limitations under the License.
 
+import hashlib
+import threading
+import time
+
+import eventlet
+from oslo.config import cfg
 import paramiko
 
 from mistral.openstack.common import log as logging
@@ -21,15 +27,62 @@ from mistral.openstack.common import log as logging
 
 LOG = logging.getLogger(__name__)
 
+# (host, username, password hash) -> _Connection.
+_CONNECTIONS = {}
+_CONNECTIONS_LOCK = threading.Lock()
+
+READ_CHUNK_SIZE = 32 * 1024
+
+
+class OutputBuffer(object):
+    """Collects command output up to the given size.
+
+    Output beyond max_size is dropped and the value ends with a marker
+    telling that the output has been truncated.
+    """
+
+    def __init__(self, max_size=0):
+        self.max_size = max_size
+
+        self._chunks = []
+        self._size = 0
+        self._total_size = 0
+
+    def write(self, data):
+        self._total_size += len(data)
+
+        head = data
+
+        if self.max_size:
+            head = data[:max(self.max_size - self._size, 0)]
+
+        if head:
+            self._chunks.append(head)
+            self._size += len(head)
 
-def _read_paramimko_stream(recv_func):
-    result = ''
-    buf = recv_func(1024)
-    while buf != '':
-        result += buf
-        buf = recv_func(1024)
+    def getvalue(self):
+        value = ''.join(self._chunks)
 
-    return result
+        if self._total_size == self._size:
+            return value
+
+        return value + (
+            "\n[Output truncated: %s of %s bytes captured]"
+            % (self._size, self._total_size)
+        )
+
+
+def _create_output_buffer():
+    return OutputBuffer(cfg.CONF.executor.ssh_max_output_size)
+
+
+def _read_paramiko_stream(recv_func, output):
+    buf = recv_func(READ_CHUNK_SIZE)
+
+    while buf:
+        output.write(buf)
+
+        buf = recv_func(READ_CHUNK_SIZE)
 
 
 def _connect(host, username, password):
@@ -44,19 +97,185 @@ def _cleanup(ssh):
     ssh.close()
 
 
+def _is_active(ssh):
+    transport = ssh.get_transport()
+
+    return transport is not None and transport.is_active()
+
+
+class _Connection(object):
+    """Cached SSH connection along with the number of its users."""
+
+    def __init__(self, ssh, now):
+        self.ssh = ssh
+        self.last_used = now
+        self.in_use = 0
+        self.cached = True
+
+
+def _evict_idle_connections(now, idle_timeout):
+    """Removes idle connections from the cache and returns them.
+
+    Connections running commands are never evicted however long ago
+    they were checked out.
+    """
+    idle = []
+
+    for key, conn in list(_CONNECTIONS.items()):
+        if conn.in_use:
+            continue
+
+        if now - conn.last_used > idle_timeout or not _is_active(conn.ssh):
+            idle.append(conn.ssh)
+
+            conn.cached = False
+
+            del _CONNECTIONS[key]
+
+    return idle
+
+
+def _get_connection(host, username, password):
+    """Returns cached SSH connection or creates a new one.
+
+    Connections are shared since a single SSH transport can run several
+    commands in separate channels at the same time. Returned connection
+    must be released with _release_connection().
+    """
+    idle_timeout = cfg.CONF.executor.ssh_idle_timeout
+
+    if idle_timeout <= 0:
+        conn = _Connection(_connect(host, username, password), time.time())
+
+        conn.in_use = 1
+        conn.cached = False
+
+        return conn
+
+    key = (host, username, hashlib.sha256(password or '').hexdigest())
+    now = time.time()
+
+    with _CONNECTIONS_LOCK:
+        idle = _evict_idle_connections(now, idle_timeout)
+
+        conn = _CONNECTIONS.get(key)
+
+        if conn:
+            conn.in_use += 1
+
+    for ssh in idle:
+        _cleanup(ssh)
+
+    if conn:
+        return conn
+
+    ssh = _connect(host, username, password)
+
+    with _CONNECTIONS_LOCK:
+        conn = _CONNECTIONS.get(key)
+
+        if not conn:
+            conn = _CONNECTIONS[key] = _Connection(ssh, now)
+
+            ssh = None
+
+        conn.in_use += 1
+
+    if ssh:
+        # Another thread has connected to the same host meanwhile.
+        _cleanup(ssh)
+
+    return conn
+
+
+def _release_connection(conn, broken=False):
+    with _CONNECTIONS_LOCK:
+        conn.in_use -= 1
+        conn.last_used = time.time()
+
+        if broken and conn.cached:
+            # New commands mustn't get the broken connection.
+            conn.cached = False
+
+            for key, c in list(_CONNECTIONS.items()):
+                if c is conn:
+                    del _CONNECTIONS[key]
+
+        # Connections that are not cached anymore are closed once the
+        # last command using them completes.
+        close = not conn.cached and not conn.in_use
+
+    if close:
+        _cleanup(conn.ssh)
+
+
+def _open_session(host, username, password):
+    conn = _get_connection(host, username, password)
+
+    try:
+        return conn, conn.ssh.get_transport().open_session()
+    except (paramiko.SSHException, EOFError) as e:
+        # Cached connection might have been closed by the remote side.
+        LOG.debug("Failed to open SSH session, reconnecting [host=%s]: %s"
+                  % (host, e))
+
+        _release_connection(conn, broken=True)
+
+        conn = _get_connection(host, username, password)
+
+        try:
+            return conn, conn.ssh.get_transport().open_session()
+        except Exception:
+            _release_connection(conn, broken=True)
+
+            raise
+
+
+def clear_connection_cache():
+    with _CONNECTIONS_LOCK:
+        connections = list(_CONNECTIONS.values())
+
+        _CONNECTIONS.clear()
+
+        for conn in connections:
+            conn.cached = False
+
+        # Connections in use are closed once released.
+        idle = [conn.ssh for conn in connections if not conn.in_use]
+
+    for ssh in idle:
+        _cleanup(ssh)
+
+
 def execute_command(cmd, host, username, password,
                     get_stderr=False, raise_when_error=True):
-    ssh = _connect(host, username, password)
+    conn, chan = _open_session(host, username, password)
 
-    LOG.debug("Executing command %s")
+    LOG.debug("Executing command %s" % cmd)
+
+    broken = False
 
     try:
-        chan = ssh.get_transport().open_session()
         chan.exec_command(cmd)
 
-        # TODO(nmakhotkin): that could hang if stderr buffer overflows
-        stdout = _read_paramimko_stream(chan.recv)
-        stderr = _read_paramimko_stream(chan.recv_stderr)
+        stdout = _create_output_buffer()
+        stderr = _create_output_buffer()
+
+        # Both streams are read at once so that the command doesn't block
+        # on one of them while the other is being read.
+        stderr_reader = eventlet.spawn(
+            _read_paramiko_stream,
+            chan.recv_stderr,
+            stderr
+        )
+
+        try:
+            _read_paramiko_stream(chan.recv, stdout)
+        finally:
+            stderr_reader.wait()
+
+        stdout = stdout.getvalue()
+        stderr = stderr.getvalue()
 
         ret_code = chan.recv_exit_status()
 
@@ -67,5 +286,11 @@ def execute_command(cmd, host, username, password,
             return ret_code, stdout, stderr
         else:
             return ret_code, stdout
+    except (paramiko.SSHException, EOFError, IOError):
+        broken = True
+
+        raise
     finally:
-        _cleanup(ssh)
+        chan.close()
+
+        _release_connection(conn, broken)
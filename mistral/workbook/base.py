@@ -68,6 +68,23 @@ class BaseSpec(object):
         except jsonschema.ValidationError as e:
             raise exc.InvalidModelException("Invalid DSL: %s" % e)
 
+    def _get_template(self, name, data):
+        """Returns compiled expression template for the given data.
+
+        Templates are compiled lazily and kept within the specification
+        object so that each of them is compiled only once.
+
+        :param name: Template name unique within the specification.
+        :param data: Data structure the template is compiled from.
+        :return: Compiled expression template.
+        """
+        templates = self.__dict__.setdefault('_templates', {})
+
+        if name not in templates:
+            templates[name] = expr.compile_template(data)
+
+        return templates[name]
+
     def _spec_property(self, prop_name, spec_cls):
         prop_val = self._data.get(prop_name)
 
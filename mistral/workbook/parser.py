@@ -15,7 +15,11 @@
 import yaml
 from yaml import error
 
+from mistral.db.v2 import api as db_api
 from mistral import exceptions as exc
+from mistral import expressions as expr
+from mistral import utils
+from mistral.utils import cache
 from mistral.workbook.v1 import actions as actions_v1
 from mistral.workbook.v1 import namespaces as ns_v1
 from mistral.workbook.v1 import tasks as tasks_v1
@@ -31,6 +35,13 @@ V2_0 = '2.0'
 
 ALL_VERSIONS = [V1_0, V2_0]
 
+SPEC_CACHE_SIZE = 1024
+
+# Specifications that have already been validated and stored in DB don't
+# change anymore so parsed specification objects can be shared instead of
+# being parsed and validated against JSON schema each time they're needed.
+_SPEC_CACHE = cache.LRUCache(SPEC_CACHE_SIZE)
+
 
 def parse_yaml(text):
     """Loads a text in YAML format as dictionary object.
@@ -142,3 +153,106 @@ def get_task_spec(spec_dict):
 def get_trigger_spec(spec_dict):
     # TODO(rakhmerov): Implement.
     pass
+
+
+# Cached factory methods. They must only be used for specifications that
+# have already been validated (i.e. stored in DB). Returned specification
+# objects are shared so they must not be modified by callers.
+
+def _get_cached_spec(key, spec_factory):
+    return _SPEC_CACHE.get_or_create(key, lambda k: spec_factory())
+
+
+def get_workflow_spec_by_definition(wf_def):
+    """Gets workflow specification of the given workflow definition.
+
+    :param wf_def: Workflow definition DB model.
+    :return: Workflow specification.
+    """
+    key = ('wf_def', wf_def.id, wf_def.updated_at or wf_def.created_at)
+
+    return _get_cached_spec(key, lambda: get_workflow_spec(wf_def.spec))
+
+
+def get_action_spec_by_definition(action_def):
+    """Gets action specification of the given ad-hoc action definition.
+
+    :param action_def: Action definition DB model.
+    :return: Action specification.
+    """
+    key = (
+        'action_def',
+        action_def.id,
+        action_def.updated_at or action_def.created_at
+    )
+
+    return _get_cached_spec(key, lambda: get_action_spec(action_def.spec))
+
+
+def get_workflow_spec_by_hash(spec_hash):
+    """Gets workflow specification stored in DB under the given hash.
+
+    :param spec_hash: Specification hash.
+    :return: Workflow specification.
+    """
+    return _get_cached_spec(
+        ('wf', spec_hash),
+        lambda: get_workflow_spec(db_api.get_specification(spec_hash).spec)
+    )
+
+
+# Expressions referring to '__execution.spec' get it from the cache too.
+expr.set_execution_spec_loader(
+    lambda spec_hash: get_workflow_spec_by_hash(spec_hash).to_dict()
+)
+
+
+def get_workflow_spec_by_execution(wf_ex):
+    """Gets workflow specification of the given workflow execution.
+
+    :param wf_ex: Workflow execution DB model.
+    :return: Workflow specification.
+    """
+    if wf_ex.spec_hash:
+        return get_workflow_spec_by_hash(wf_ex.spec_hash)
+
+    # Execution stores its own copy of specification.
+    return _get_cached_spec(
+        ('wf', utils.get_json_hash(wf_ex.spec)),
+        lambda: get_workflow_spec(wf_ex.spec)
+    )
+
+
+def get_task_spec_by_execution(task_ex):
+    """Gets task specification of the given task execution.
+
+    :param task_ex: Task execution DB model.
+    :return: Task specification.
+    """
+    if task_ex.spec_hash:
+        # Task refers to the specification of its workflow.
+        wf_spec = get_workflow_spec_by_hash(task_ex.spec_hash)
+
+        return wf_spec.get_tasks()[task_ex.name]
+
+    # Task execution stores its own copy of specification.
+    return _get_cached_spec(
+        ('task', utils.get_json_hash(task_ex.spec)),
+        lambda: get_task_spec(task_ex.spec)
+    )
+
+
+def cache_workflow_spec(wf_spec):
+    """Puts already validated workflow specification into cache.
+
+    :param wf_spec: Workflow specification.
+    """
+    _SPEC_CACHE.put(('wf', utils.get_json_hash(wf_spec.to_dict())), wf_spec)
+
+
+def get_spec_cache_stats():
+    return _SPEC_CACHE.get_stats()
+
+
+def clear_caches():
+    _SPEC_CACHE.clear()
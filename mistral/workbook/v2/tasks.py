@@ -144,6 +144,25 @@ class TaskSpec(base.BaseSpec):
     def get_publish(self):
         return self._publish
 
+    def get_input_template(self):
+        return self._get_template('input', self._input)
+
+    def get_with_items_template(self):
+        return self._get_template('with-items', self._with_items)
+
+    def get_target_template(self):
+        return self._get_template('target', self._target)
+
+    def get_publish_template(self):
+        return self._get_template('publish', self._publish)
+
+    def compile_templates(self):
+        """Compiles all expression templates of the task in advance."""
+        self.get_input_template()
+        self.get_with_items_template()
+        self.get_target_template()
+        self.get_publish_template()
+
 
 class DirectWorkflowTaskSpec(TaskSpec):
     _direct_props = {
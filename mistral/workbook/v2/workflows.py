@@ -84,6 +84,20 @@ class WorkflowSpec(base.BaseSpec):
     def get_tasks(self):
         return self._tasks
 
+    def get_output_template(self):
+        return self._get_template('output', self._output)
+
+    def compile_templates(self):
+        """Compiles all expression templates of the workflow in advance.
+
+        Doing it once when workflow is uploaded makes sure that
+        evaluation at runtime only needs to calculate expressions.
+        """
+        self.get_output_template()
+
+        for t_s in self._tasks:
+            t_s.compile_templates()
+
 
 class WorkflowSpecList(base.BaseSpecList):
     item_class = WorkflowSpec
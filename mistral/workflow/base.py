@@ -39,13 +39,17 @@ class WorkflowHandler(object):
     by Mistral.
     """
 
-    def __init__(self, wf_ex):
+    def __init__(self, wf_ex, wf_spec=None):
         """Creates new workflow handler.
 
         :param wf_ex: Execution.
+        :param wf_spec: Workflow specification. If not given it's taken
+            from the execution.
         """
         self.wf_ex = wf_ex
-        self.wf_spec = spec_parser.get_workflow_spec(wf_ex.spec)
+        self.wf_spec = (
+            wf_spec or spec_parser.get_workflow_spec_by_execution(wf_ex)
+        )
 
     @abc.abstractmethod
     def start_workflow(self, **params):
@@ -96,6 +100,9 @@ class WorkflowHandler(object):
 
         cmds = self._find_next_commands(task_ex)
 
+        if task_spec.get_with_items() and task_ex.state == states.RUNNING:
+            cmds.append(commands.RunNextIterations(task_spec, task_ex))
+
         if (task_ex.state == states.ERROR and
                 not self._is_error_handled(task_ex)):
             if not self.is_paused_or_completed():
@@ -140,14 +147,20 @@ class WorkflowHandler(object):
     def _determine_task_result(task_spec, task_ex, result):
         # TODO(rakhmerov): Think how 'with-items' can be better encapsulated.
         if task_spec.get_with_items():
-            return with_items.get_result(task_ex, task_spec, result)
+            # Result is built only once all iterations have completed.
+            if not states.is_completed(task_ex.state):
+                return task_ex.result or {}
+
+            return with_items.get_result(
+                task_ex,
+                task_spec,
+                with_items.get_iterations(task_ex)
+            )
         else:
             return data_flow.evaluate_task_result(task_ex, task_spec, result)
 
     @staticmethod
     def _determine_task_state(task_ex, task_spec, result):
-        state = states.ERROR if result.is_error() else states.SUCCESS
-
         # TODO(rakhmerov): Think how 'with-items' can be better encapsulated.
         if task_spec.get_with_items():
             # Change the index.
@@ -155,9 +168,11 @@ class WorkflowHandler(object):
 
             # Check if all iterations are completed.
             if with_items.is_iterations_incomplete(task_ex):
-                state = states.RUNNING
+                return states.RUNNING
 
-        return state
+            return with_items.get_state(with_items.get_iterations(task_ex))
+
+        return states.ERROR if result.is_error() else states.SUCCESS
 
     @abc.abstractmethod
     def _evaluate_workflow_final_context(self, cause_task_ex):
@@ -288,10 +303,19 @@ class WorkflowHandler(object):
 
         tasks = self.wf_ex.task_executions
 
+        # Iterations of 'with-items' tasks aren't dispatched while
+        # workflow is paused.
+        cmds = [
+            commands.RunNextIterations(self.wf_spec.get_tasks()[t.name], t)
+            for t in tasks
+            if t.state == states.RUNNING and
+            self.wf_spec.get_tasks()[t.name].get_with_items()
+        ]
+
         if not all([t.state == states.RUNNING for t in tasks]):
-            return self._find_commands_to_resume(tasks)
+            cmds += self._find_commands_to_resume(tasks)
 
-        return []
+        return cmds
 
     @abc.abstractmethod
     def get_upstream_tasks(self, task_spec):
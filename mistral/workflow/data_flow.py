@@ -14,13 +14,15 @@
 #    limitations under the License.
 
 import copy
+
 from oslo.config import cfg
+import six
 
 from mistral import context as auth_ctx
 from mistral import expressions as expr
 from mistral.openstack.common import log as logging
-from mistral import utils
 from mistral.utils import inspect_utils
+from mistral.utils import metrics
 from mistral.workflow import utils as wf_utils
 from mistral.workflow import with_items
 
@@ -29,6 +31,71 @@ LOG = logging.getLogger(__name__)
 CONF = cfg.CONF
 
 
+class FrozenContext(dict):
+    """Immutable Data Flow context.
+
+    Contexts are built on top of other contexts sharing their values.
+    Only top level keys and nested dictionaries containing changed values
+    are copied (see merge_contexts()). Nothing reachable from a context
+    is supposed to be modified in place so contexts never need to be
+    copied deeply. Being a dictionary, a context is seen by expressions
+    as a regular one and is stored as a flat JSON object.
+    """
+
+    def _immutable(self, *args, **kwargs):
+        raise TypeError("Data Flow context can't be modified.")
+
+    __setitem__ = __delitem__ = _immutable
+    clear = pop = popitem = setdefault = update = _immutable
+
+    def set(self, key, value):
+        """Returns a new context with the given key set to the value."""
+        ctx = FrozenContext(self)
+
+        dict.__setitem__(ctx, key, value)
+
+        return ctx
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        # Callers of deepcopy() expect to get a copy they can modify.
+        return copy.deepcopy(dict(self), memo)
+
+    def __reduce__(self):
+        return FrozenContext, (dict(self),)
+
+
+def _merge(left, right):
+    merged = dict(left)
+
+    for k, v in six.iteritems(right):
+        left_v = merged.get(k)
+
+        if isinstance(left_v, dict) and isinstance(v, dict):
+            merged[k] = _merge(left_v, v)
+        else:
+            merged[k] = v
+
+    return merged
+
+
+def merge_contexts(*contexts):
+    """Merges the given contexts into a new frozen context.
+
+    Contexts are merged the same way utils.merge_dicts() does but none
+    of them is modified. Values of the latter contexts take precedence.
+    """
+    merged = {}
+
+    for ctx in contexts:
+        if ctx:
+            merged = _merge(merged, ctx)
+
+    return FrozenContext(merged)
+
+
 def prepare_db_task(task_ex, task_spec, upstream_task_specs, wf_ex,
                     cause_task_ex=None):
     """Prepare Data Flow properties ('in_context' and 'input')
@@ -47,8 +114,8 @@ def prepare_db_task(task_ex, task_spec, upstream_task_specs, wf_ex,
         cause_task_ex=cause_task_ex
     )
 
-    task_ex.in_context = utils.merge_dicts(
-        copy.copy(wf_ex.context),
+    task_ex.in_context = merge_contexts(
+        wf_ex.context,
         _evaluate_upstream_context(upstream_task_execs)
     )
 
@@ -66,15 +133,14 @@ def _prepare_runtime_context(task_ex, task_spec):
     with_items.prepare_runtime_context(task_ex, task_spec)
 
 
+@metrics.timed('data_flow.evaluate')
 def evaluate_task_input(task_spec, context):
-    with_items = task_spec.get_with_items()
-
     # Do not evaluate input in case of with-items task.
     # Instead of it, input is considered as data defined in with-items.
-    if with_items:
-        return expr.evaluate_recursively(with_items, context or {})
+    if task_spec.get_with_items():
+        return task_spec.get_with_items_template().evaluate(context or {})
     else:
-        return expr.evaluate_recursively(task_spec.get_input(), context)
+        return task_spec.get_input_template().evaluate(context)
 
 
 def _evaluate_upstream_context(upstream_task_execs):
@@ -82,10 +148,10 @@ def _evaluate_upstream_context(upstream_task_execs):
     ctx = {}
 
     for t_ex in upstream_task_execs:
-        task_result_ctx = utils.merge_dicts(task_result_ctx, t_ex.result)
-        utils.merge_dicts(ctx, evaluate_task_outbound_context(t_ex))
+        task_result_ctx = merge_contexts(task_result_ctx, t_ex.result)
+        ctx = merge_contexts(ctx, evaluate_task_outbound_context(t_ex))
 
-    return utils.merge_dicts(ctx, task_result_ctx)
+    return merge_contexts(ctx, task_result_ctx)
 
 
 # TODO(rakhmerov): This method should utilize task invocations and calculate
@@ -93,6 +159,7 @@ def _evaluate_upstream_context(upstream_task_execs):
 # TODO(rakhmerov): Now this method doesn't make a lot of sense because we
 # treat action/workflow as a task result so we need to calculate only
 # what could be called "effective task result"
+@metrics.timed('data_flow.evaluate')
 def evaluate_task_result(task_ex, task_spec, result):
     """Evaluates task result given a result from action/workflow.
 
@@ -111,7 +178,7 @@ def evaluate_task_result(task_ex, task_spec, result):
 
     # Expression context is task inbound context + action/workflow result
     # accessible under key task name key.
-    expr_ctx = copy.deepcopy(task_ex.in_context) or {}
+    expr_ctx = FrozenContext(task_ex.in_context or {})
 
     if task_ex.name in expr_ctx:
         LOG.warning(
@@ -119,9 +186,9 @@ def evaluate_task_result(task_ex, task_spec, result):
             task_ex.name
         )
 
-    expr_ctx[task_ex.name] = copy.deepcopy(result.data) or {}
+    expr_ctx = expr_ctx.set(task_ex.name, result.data or {})
 
-    return expr.evaluate_recursively(task_spec.get_publish(), expr_ctx)
+    return task_spec.get_publish_template().evaluate(expr_ctx)
 
 
 def evaluate_effective_task_result(task_ex, task_spec):
@@ -146,30 +213,23 @@ def evaluate_task_outbound_context(task_ex):
     :return: Outbound task Data Flow context.
     """
 
-    in_context = (copy.deepcopy(dict(task_ex.in_context))
-                  if task_ex.in_context is not None else {})
-
-    out_ctx = utils.merge_dicts(in_context, task_ex.result)
-
-    # Add task output under key 'taskName'.
-    out_ctx = utils.merge_dicts(
-        out_ctx,
-        {task_ex.name: copy.deepcopy(task_ex.result) or None}
+    return merge_contexts(
+        task_ex.in_context,
+        task_ex.result,
+        # Add task output under key 'taskName'.
+        {task_ex.name: task_ex.result or None}
     )
 
-    return out_ctx
-
 
+@metrics.timed('data_flow.evaluate')
 def evaluate_workflow_output(wf_spec, context):
     """Evaluates workflow output.
 
     :param wf_spec: Workflow specification.
     :param context: Final Data Flow context (cause task's outbound context).
     """
-    output_dict = wf_spec.get_output()
-
     # Evaluate workflow 'publish' clause using the final workflow context.
-    output = expr.evaluate_recursively(output_dict, context)
+    output = wf_spec.get_output_template().evaluate(context)
 
     # TODO(rakhmerov): Many don't like that we return the whole context
     # TODO(rakhmerov): if 'output' is not explicitly defined.
@@ -195,9 +255,12 @@ def add_execution_to_context(wf_ex, context):
     if context is None:
         context = {}
 
+    # Only the hash of the specification is kept in the context,
+    # expressions referring to '__execution.spec' get the specification
+    # loaded by the hash when they're evaluated.
     context['__execution'] = {
         'id': wf_ex.id,
-        'spec': wf_ex.spec,
+        'spec_hash': wf_ex.spec_hash,
         'start_params': wf_ex.start_params,
         'input': wf_ex.input
     }
@@ -211,13 +274,15 @@ def add_environment_to_context(wf_ex, context):
 
     # If env variables are provided, add an evaluated copy into the context.
     if 'env' in wf_ex.start_params:
-        env = copy.deepcopy(wf_ex.start_params['env'])
+        # Evaluation doesn't change the given data so it's not copied.
+        env = wf_ex.start_params['env']
         # An env variable can be an expression of other env variables.
         context['__env'] = expr.evaluate_recursively(env, {'__env': env})
 
     return context
 
 
+@metrics.timed('data_flow.evaluate')
 def evaluate_policy_params(policy, context):
     policy_params = inspect_utils.get_public_fields(policy)
     evaluated_params = expr.evaluate_recursively(
@@ -15,7 +15,6 @@
 from mistral.engine1 import commands
 from mistral import expressions as expr
 from mistral.openstack.common import log as logging
-from mistral import utils
 from mistral.workflow import base
 from mistral.workflow import data_flow
 from mistral.workflow import states
@@ -95,7 +94,7 @@ class DirectWorkflowHandler(base.WorkflowHandler):
         ctx = {}
 
         for t_db in self._find_end_tasks():
-            ctx = utils.merge_dicts(
+            ctx = data_flow.merge_contexts(
                 ctx,
                 data_flow.evaluate_task_outbound_context(t_db)
             )
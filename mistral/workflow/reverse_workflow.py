@@ -20,6 +20,7 @@ from mistral import exceptions as exc
 from mistral.workflow import base
 from mistral.workflow import data_flow
 from mistral.workflow import states
+from mistral.workflow import utils as wf_utils
 
 
 class ReverseWorkflowHandler(base.WorkflowHandler):
@@ -145,8 +146,4 @@ class ReverseWorkflowHandler(base.WorkflowHandler):
         return dep_t_specs
 
     def _find_db_task(self, name):
-        task_execs = filter(
-            lambda t: t.name == name, self.wf_ex.task_executions
-        )
-
-        return task_execs[0] if task_execs else None
+        return wf_utils.get_task_index(self.wf_ex).find(name)
@@ -12,6 +12,9 @@
 #    See the License for the specific language governing permissions and
 #    limitations under the License.
 
+from sqlalchemy import event
+
+from mistral.db.v2.sqlalchemy import models
 from mistral.utils import serializer
 from mistral.workbook.v2 import tasks as v2_tasks_spec
 from mistral.workflow import states
@@ -46,13 +49,169 @@ class TaskResultSerializer(serializer.Serializer):
         return TaskResult(entity['data'], entity['error'])
 
 
-def find_db_task(wf_ex, task_spec):
-    task_execs = [
-        t for t in wf_ex.task_executions
-        if t.name == task_spec.get_name()
-    ]
+class TaskExecutionIndex(object):
+    """Index of task executions of a workflow execution by name and state.
+
+    The index is built in one pass over the loaded task executions so
+    that lookups don't require scanning all of them every time. It's kept
+    up to date by listeners of task state changes and of changes of the
+    task execution collection registered below.
+    """
+
+    def __init__(self, task_execs):
+        self.task_execs = task_execs
+
+        self._by_name = {}
+        # State -> {id(task execution): (position, task execution)}.
+        self._by_state = {}
+        # id(task execution) -> (position, indexed state).
+        self._positions = {}
+        self._next_position = 0
+
+        for t in task_execs:
+            self.add(t)
+
+    def add(self, task_ex):
+        key = id(task_ex)
+
+        if key in self._positions:
+            return
+
+        position = self._next_position
+        self._next_position += 1
+
+        self._positions[key] = (position, task_ex.state)
+
+        self._by_name.setdefault(task_ex.name, []).append(task_ex)
+        self._by_state.setdefault(task_ex.state, {})[key] = (
+            position,
+            task_ex
+        )
+
+        task_ex._task_index = self
+
+    def remove(self, task_ex):
+        key = id(task_ex)
+
+        if key not in self._positions:
+            return
+
+        _, state = self._positions.pop(key)
+
+        self._by_name[task_ex.name].remove(task_ex)
+        del self._by_state[state][key]
+
+        task_ex._task_index = None
+
+    def update_state(self, task_ex, state):
+        key = id(task_ex)
+
+        if key not in self._positions:
+            return
+
+        position, old_state = self._positions[key]
+
+        del self._by_state[old_state][key]
+
+        self._positions[key] = (position, state)
+        self._by_state.setdefault(state, {})[key] = (position, task_ex)
+
+    def find(self, name):
+        task_execs = self._by_name.get(name)
+
+        return task_execs[0] if task_execs else None
+
+    def get_states(self):
+        """Returns states that indexed task executions are in."""
+        return [state for state, tasks in self._by_state.items() if tasks]
+
+    def find_by_states(self, *states):
+        """Returns task executions in the given states.
+
+        Task executions are returned in the order of the collection.
+        """
+        entries = []
+
+        for state in states:
+            entries.extend(self._by_state.get(state, {}).values())
 
-    return task_execs[0] if len(task_execs) > 0 else None
+        return [t for _, t in sorted(entries, key=lambda e: e[0])]
+
+
+def get_task_index(wf_ex):
+    """Returns task execution index of the given workflow execution.
+
+    The index is kept on the workflow execution object itself so it
+    lives as long as the object, i.e. within one DB session. It gets
+    rebuilt if task executions have been loaded again.
+    """
+    task_execs = wf_ex.task_executions
+
+    index = getattr(wf_ex, '_task_index', None)
+
+    if index is None or index.task_execs is not task_execs:
+        index = TaskExecutionIndex(task_execs)
+
+        wf_ex._task_index = index
+
+    return index
+
+
+def _get_collection_index(wf_ex):
+    index = getattr(wf_ex, '_task_index', None)
+
+    if index and index.task_execs is wf_ex.__dict__.get('task_executions'):
+        return index
+
+    return None
+
+
+def _on_task_added(wf_ex, task_ex, initiator):
+    index = _get_collection_index(wf_ex)
+
+    if index:
+        index.add(task_ex)
+
+    return task_ex
+
+
+def _on_task_removed(wf_ex, task_ex, initiator):
+    index = _get_collection_index(wf_ex)
+
+    if index:
+        index.remove(task_ex)
+
+
+def _on_task_state_set(task_ex, value, oldvalue, initiator):
+    index = getattr(task_ex, '_task_index', None)
+
+    if index:
+        index.update_state(task_ex, value)
+
+    return value
+
+
+event.listen(
+    models.WorkflowExecution.task_executions,
+    'append',
+    _on_task_added,
+    retval=True
+)
+event.listen(
+    models.WorkflowExecution.task_executions,
+    'remove',
+    _on_task_removed
+)
+event.listen(
+    models.TaskExecution.state,
+    'set',
+    _on_task_state_set,
+    retval=True
+)
+
+
+def find_db_task(wf_ex, task_spec):
+    return get_task_index(wf_ex).find(task_spec.get_name())
 
 
 def find_upstream_task_executions(wf_ex, task_spec, upstream_task_specs,
@@ -74,23 +233,24 @@ def find_task_executions(wf_ex, task_specs):
 
 
 def find_running_tasks(wf_ex):
-    return [t for t in wf_ex.task_executions if t.state == states.RUNNING]
+    return get_task_index(wf_ex).find_by_states(states.RUNNING)
 
 
 def find_completed_tasks(wf_ex):
-    return [
-        t for t in wf_ex.task_executions if states.is_completed(t.state)
-    ]
+    return get_task_index(wf_ex).find_by_states(states.SUCCESS, states.ERROR)
 
 
 def find_successful_tasks(wf_ex):
-    return [t for t in wf_ex.task_executions if t.state == states.SUCCESS]
+    return get_task_index(wf_ex).find_by_states(states.SUCCESS)
 
 
 def find_incomplete_tasks(wf_ex):
-    return [t for t in wf_ex.task_executions
-            if not states.is_completed(t.state)]
+    index = get_task_index(wf_ex)
+
+    return index.find_by_states(
+        *[s for s in index.get_states() if not states.is_completed(s)]
+    )
 
 
 def find_error_tasks(wf_ex):
-    return [t for t in wf_ex.task_executions if t.state == states.ERROR]
+    return get_task_index(wf_ex).find_by_states(states.ERROR)
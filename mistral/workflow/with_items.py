@@ -14,84 +14,136 @@
 
 import copy
 
+import six
+
+from mistral.db.v2 import api as db_api
 from mistral import exceptions as exc
-from mistral import expressions as expr
+from mistral.workflow import states
 
 
 # TODO(rakhmerov): Partially duplicates data_flow.evaluate_task_result
-# TODO(rakhmerov): Method now looks confusing because it's called 'get_result'
-# and has 'result' parameter, but it's temporary, needs to be refactored.
-def get_result(task_ex, task_spec, result):
-    """Returns result from task markered as with-items
+def get_result(task_ex, task_spec, action_exs):
+    """Returns result of task markered as with-items.
+
+     The result is built once all iterations have completed from results
+     of their action executions ordered by iteration index.
 
      Examples of result:
        1. Without publish clause:
-          {
-            "task": {
-              "task1": [None]
-            }
-          }
+          {}
        Note: In this case we don't create any specific
        result to prevent generating large data in DB.
 
-       Note: None here used for calculating number of
-       finished iterations.
-
        2. With publish clause and specific result key:
           {
             "result": [
               "result1",
               "result2"
-            ],
-            "task": {
-              "task1": {
-                "result": [
-                  "result1",
-                  "result2"
-                ]
-              }
-            }
+            ]
           }
+
+     If an iteration has failed the result also contains its error under
+     'error' key like results of failed tasks without 'with-items'.
+
+    :param task_ex: Task execution.
+    :param task_spec: Task specification.
+    :param action_exs: Action executions of task iterations.
     """
-    e_data = result.error
+    final_action_exs = get_final_iterations(action_exs)
 
-    expr_ctx = copy.deepcopy(task_ex.in_context) or {}
+    task_result = _get_error_result(task_ex, final_action_exs)
 
-    expr_ctx[task_ex.name] = copy.deepcopy(result.data) or {}
+    res_key = _get_result_key(task_spec)
 
-    # Calc result for with-items (only list form is used).
-    result = expr.evaluate_recursively(task_spec.get_publish(), expr_ctx)
+    if not res_key:
+        return task_result
 
-    if not task_ex.result:
-        task_ex.result = {}
+    publish_template = task_spec.get_publish_template()
 
-    task_result = copy.copy(task_ex.result)
+    # Evaluating expressions doesn't change the context so it's shared
+    # by all iterations.
+    expr_ctx = copy.copy(task_ex.in_context) or {}
 
-    res_key = _get_result_key(task_spec)
+    result = []
+
+    for action_ex in final_action_exs:
+        output = action_ex.output or {}
 
-    if res_key:
-        if res_key in task_result:
-            task_result[res_key].append(
-                result.get(res_key) or e_data
-            )
-        else:
-            task_result[res_key] = [result.get(res_key) or e_data]
-
-        # Add same result to task result under key 'task'.
-        # TODO(rakhmerov): Fix this during task result refactoring.
-        # task_result[t_name] =
-        #     {
-        #         res_key: task_result[res_key]
-        #     }
-    # else:
-    #     if 'task' not in task_result:
-    #         task_result.update({'task': {t_name: [None or e_data]}})
-    #     else:
-    #         task_result['task'][t_name].append(None or e_data)
+        expr_ctx[task_ex.name] = output.get('result') or {}
+
+        result.append(
+            publish_template.evaluate(expr_ctx).get(res_key)
+            or output.get('error')
+        )
+
+    task_result[res_key] = result
 
     return task_result
 
 
+def _get_error_result(task_ex, action_exs):
+    """Returns error of the first failed iteration the way it's stored
+    in results of tasks without 'with-items'.
+    """
+    for action_ex in action_exs:
+        if action_ex.state == states.ERROR:
+            error = (action_ex.output or {}).get('error')
+
+            return {'error': error, 'task': {task_ex.name: error}}
+
+    return {}
+
+
+def get_final_iterations(action_exs):
+    """Returns the last attempt of every iteration ordered by index."""
+    iterations = {}
+
+    for action_ex in action_exs:
+        index = action_ex.iteration_index
+
+        if index is None:
+            continue
+
+        prev_action_ex = iterations.get(index)
+
+        if not prev_action_ex or prev_action_ex.state != states.SUCCESS:
+            iterations[index] = action_ex
+
+    return [iterations[index] for index in sorted(iterations)]
+
+
+def get_state(action_exs):
+    """Returns state of task whose iterations have all completed."""
+    if any(a_ex.state == states.ERROR
+           for a_ex in get_final_iterations(action_exs)):
+        return states.ERROR
+
+    return states.SUCCESS
+
+
+def get_iterations(task_ex):
+    """Returns action executions of task iterations along with results."""
+    return db_api.get_action_executions(
+        task_execution_id=task_ex.id,
+        fields=['iteration_index', 'state', 'output']
+    )
+
+
+def get_iteration_output(result):
+    if result.is_error():
+        return {'error': result.error}
+
+    return {'result': result.data}
+
+
+def get_retry_count(task_spec):
+    """Returns number of times a failed iteration is run."""
+    policies = task_spec.get_policies()
+    retry = policies.get_retry() if policies else None
+
+    return retry.get_count() if retry else 0
+
+
 def _get_context(task_ex):
     return task_ex.runtime_context['with_items']
 
@@ -110,15 +162,59 @@ def get_concurrency_spec(task_spec):
     return policies.get_concurrency() if policies else None
 
 
+def get_cursor(task_ex):
+    # Tasks started before the cursor was introduced had all their
+    # iterations dispatched at once.
+    return _get_context(task_ex).get('cursor', get_count(task_ex))
+
+
 def get_indexes_for_loop(task_ex, task_spec):
-    concurrency_spec = get_concurrency_spec(task_spec)
-    concurrency = task_ex.runtime_context['concurrency']
-    index = get_index(task_ex)
+    """Returns range of iterations that can be dispatched now.
 
-    number_to_execute = (get_count(task_ex) - index
-                         if not concurrency_spec else concurrency)
+    If 'concurrency' policy is defined the number of iterations dispatched
+    but not completed yet never exceeds it. Otherwise all remaining
+    iterations are returned.
+    """
+    concurrency = get_concurrency_spec(task_spec)
+    cursor = get_cursor(task_ex)
+    count = get_count(task_ex)
+
+    if not concurrency:
+        return cursor, count
+
+    running = cursor - get_index(task_ex)
+
+    return cursor, min(cursor + max(concurrency - running, 0), count)
+
+
+def move_cursor(task_ex, cursor):
+    with_items_context = _get_context(task_ex)
+
+    with_items_context['cursor'] = cursor
+
+    task_ex.runtime_context.update({'with_items': with_items_context})
 
-    return index, index + number_to_execute
+
+def add_retry(task_ex, index):
+    """Makes failed iteration to be dispatched again."""
+    with_items_context = _get_context(task_ex)
+
+    with_items_context['retries'] = (
+        with_items_context.get('retries', []) + [index]
+    )
+
+    task_ex.runtime_context.update({'with_items': with_items_context})
+
+
+def pop_retries(task_ex):
+    """Returns indexes of iterations to run again and forgets them."""
+    with_items_context = _get_context(task_ex)
+
+    retries = with_items_context.pop('retries', [])
+
+    task_ex.runtime_context.update({'with_items': with_items_context})
+
+    return retries
 
 
 def do_step(task_ex):
@@ -141,10 +237,43 @@ def prepare_runtime_context(task_ex, task_spec):
         runtime_context['with_items'] = {
             'capacity': get_concurrency_spec(task_spec),
             'index': 0,
+            'cursor': 0,
             'count': len(task_ex.input[with_items_spec.keys()[0]])
         }
 
 
+def get_iteration_input(with_items_input, index):
+    """Returns action input of the iteration with the given index."""
+    return dict(
+        (key, value[index]) for key, value in with_items_input.items()
+    )
+
+
+def iterate_input(with_items_input, start=0, end=None):
+    """Generates action input for each of the given iterations.
+
+    Unlike calc_input() it doesn't build action input for all iterations
+    at once so that a task with many items can be processed in portions.
+
+    :param with_items_input: Dict containing mapped variables to their arrays.
+    :param start: Index of the first iteration.
+    :param end: Index of the iteration to stop at (not included).
+        All remaining iterations are generated if it's not specified.
+    :return: Iterator over dicts containing action input of each iteration.
+    """
+    validate_input(with_items_input)
+
+    count = len(with_items_input.values()[0])
+
+    if end is None or end > count:
+        end = count
+
+    return (
+        get_iteration_input(with_items_input, index)
+        for index in six.moves.range(start, end)
+    )
+
+
 def calc_input(with_items_input):
     """Calculate action input collection for separating each action input.
 
@@ -169,20 +298,7 @@ def calc_input(with_items_input):
     :param with_items_input: Dict containing mapped variables to their arrays.
     :return: list containing dicts of each action input.
     """
-    validate_input(with_items_input)
-
-    action_input_collection = []
-
-    for key, value in with_items_input.items():
-        for index, item in enumerate(value):
-            iter_context = {key: item}
-
-            if index >= len(action_input_collection):
-                action_input_collection.append(iter_context)
-            else:
-                action_input_collection[index].update(iter_context)
-
-    return action_input_collection
+    return list(iterate_input(with_items_input))
 
 
 def validate_input(with_items_input):
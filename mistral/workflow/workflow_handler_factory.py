@@ -22,7 +22,7 @@ from mistral.workflow import reverse_workflow
 
 def create_workflow_handler(wf_ex, wf_spec=None):
     if not wf_spec:
-        wf_spec = spec_parser.get_workflow_spec(wf_ex.spec)
+        wf_spec = spec_parser.get_workflow_spec_by_execution(wf_ex)
 
     handler_cls = _select_workflow_handler(wf_spec)
 
@@ -30,7 +30,7 @@ def create_workflow_handler(wf_ex, wf_spec=None):
         msg = 'Failed to find a workflow handler [wf_spec=%s]' % wf_spec
         raise exc.WorkflowException(msg)
 
-    return handler_cls(wf_ex)
+    return handler_cls(wf_ex, wf_spec)
 
 
 def _select_workflow_handler(wf_spec):